@@ -59,6 +59,15 @@ try:
 except ImportError:
     pass
 
+try:
+    from .writer_document import (
+        simplify_document_incremental,
+        load_fingerprints,
+        save_fingerprints,
+    )
+except ImportError:
+    pass
+
 try:
     from .backends import (
         NvidiaNimBackend,
@@ -67,6 +76,7 @@ try:
         list_backends,
         simplify,
         process_paragraphs,
+        process_paragraphs_batch,
     )
 except ImportError:
     pass
@@ -87,6 +97,8 @@ __all__ = [
     "PokazInformacje",
     "SprawdzKonfiguracje",
     "TestPolaczenia",
+    # writer_document
+    "simplify_document_incremental",
     # backends
     "NvidiaNimBackend",
     "get_backend",
@@ -18,13 +18,16 @@ from .nvidia_nim_backend import (
     get_backend,
     simplify,
     process_paragraphs,
+    process_paragraphs_batch,
 )
+from .nvidia_nim_async import AsyncNvidiaNimBackend
 
 # Rejestr backendow
 AVAILABLE_BACKENDS = {
     "nvidia_nim": NvidiaNimBackend,
     "bielik": NvidiaNimBackend,  # Alias
     "polonista": NvidiaNimBackend,  # Alias dla POLONISTA
+    "nvidia_nim_async": AsyncNvidiaNimBackend,  # API asyncio
 }
 
 # Domyslny backend
@@ -82,12 +85,14 @@ def list_backends():
 
 __all__ = [
     "NvidiaNimBackend",
+    "AsyncNvidiaNimBackend",
     "get_backend",
     "get_backend_class",
     "create_backend",
     "list_backends",
     "simplify",
     "process_paragraphs",
+    "process_paragraphs_batch",
     "AVAILABLE_BACKENDS",
     "DEFAULT_BACKEND",
 ]
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+chunking.py - Dzielenie dlugich tekstow na czesci dla API
+=========================================================
+
+Wspolny silnik dla NvidiaNimBackend._smart_chunk_text i
+localwriter.smart_chunk_text.
+
+Priorytet podzialu (w oknie max_size znakow od biezacej pozycji):
+1. Podwojny enter (akapit) - dalej niz 30% okna
+2. Pojedynczy enter - dalej niz 50% okna
+3. Koniec zdania (backends/sentences.py: bez "np. ", "art. ", dat
+   i inicjalow) - dalej niz 50%
+4. Przecinek lub srednik (", ", "; ") - dalej niz 50%
+5. Ostatnia spacja w oknie
+6. Twardy podzial po max_size znakach
+
+WYSZUKIWANIE GRANIC:
+Granica to ostatnie wystapienie wzorca w oknie - text.rfind(wzorzec,
+start, end) na calym tekscie, bez kopiowania okna (jak dawne
+chunk_text.rfind na wycinku, ale bez kopii max_size znakow na kazda
+probe). rfind konczy na pierwszym trafieniu od konca, wiec zwykle
+oglada tylko koncowke okna. Konce zdan szuka od konca okna
+sentences.last_sentence_end. Tablica pozycji wszystkich granic (bisect)
+byla w CPythonie 2-5x wolniejsza - bench/chunking_benchmark.py.
+
+TRYB TOKENOWY (chunk_text_by_tokens):
+Limit czesci podany w tokenach wejscia zamiast znakow - granice wybierane
+jak wyzej, a limit znakow wynika z gestosci tokenow tekstu.
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import absolute_import
+
+from typing import List, Tuple
+
+try:
+    from .sentences import last_sentence_end
+except ImportError:
+    try:
+        from sentences import last_sentence_end
+    except ImportError:
+        from backends.sentences import last_sentence_end
+
+
+# Wzorzec zastepczy: koniec zdania wg sentences.last_sentence_end
+SENTENCE_END = "<koniec zdania>"
+
+# Reguly podzialu w kolejnosci priorytetu:
+# (wzorce, prog jako ulamek max_size, znaki wzorca w chunku, znaki pomijane)
+_RULES: Tuple[Tuple[Tuple[str, ...], float, int, int], ...] = (
+    (("\n\n",), 0.3, 0, 2),
+    (("\n",), 0.5, 0, 1),
+    ((SENTENCE_END,), 0.5, 1, 1),
+    ((", ", "; "), 0.5, 1, 1),
+)
+
+
+def last_boundary(text: str, pattern: str, start: int, end: int) -> int:
+    """
+    Ostatnie wystapienie wzorca mieszczace sie w text[start:end] lub -1.
+
+    Dla zwyklego wzorca to samo co start + text[start:end].rfind(wzorzec),
+    bez kopiowania okna; SENTENCE_END to konce zdan z backends/sentences.py.
+    """
+    if pattern == SENTENCE_END:
+        return last_sentence_end(text, start, end)
+    return text.rfind(pattern, start, end)
+
+
+def chunk_text(text: str, max_size: int) -> List[str]:
+    """
+    Dzieli tekst na czesci nie dluzsze niz max_size znakow.
+
+    Args:
+        text: Tekst do podzialu
+        max_size: Maksymalna dlugosc czesci w znakach
+
+    Returns:
+        Lista niepustych czesci (przycietych strip())
+    """
+    if max_size < 1:
+        raise ValueError("max_size musi byc dodatnie")
+
+    length = len(text)
+    chunks = []
+    current_pos = 0
+
+    while current_pos < length:
+        end_pos = current_pos + max_size
+
+        # Ostatnia czesc
+        if end_pos >= length:
+            chunks.append(text[current_pos:].strip())
+            break
+
+        cut = None
+        for patterns, ratio, keep, skip in _RULES:
+            threshold = max_size * ratio
+            for pattern in patterns:
+                pos = last_boundary(text, pattern, current_pos, end_pos)
+                if pos >= 0 and pos - current_pos > threshold:
+                    cut = (pos + keep, pos + keep + skip)
+                    break
+            if cut is not None:
+                break
+
+        if cut is None:
+            pos = text.rfind(" ", current_pos, end_pos)
+            if pos > current_pos:
+                cut = (pos, pos + 1)
+            else:
+                # Ostatecznosc: twardy podzial
+                cut = (end_pos, end_pos)
+
+        chunks.append(text[current_pos:cut[0]].strip())
+        current_pos = cut[1]
+
+    return [c for c in chunks if c]
+
+
+def chunk_text_by_tokens(text: str, token_budget: int, estimator) -> List[str]:
+    """
+    Dzieli tekst na czesci mieszczace sie w budzecie tokenow.
+
+    Granice wybiera chunk_text (te same priorytety); limit znakow wynika
+    z gestosci tokenow tekstu. Czesc gestsza niz srednia (liczby,
+    skroty) i ponad budzet jest dzielona ponownie z mniejszym limitem.
+
+    Args:
+        text: Tekst do podzialu
+        token_budget: Maksymalna liczba tokenow wejscia na czesc
+        estimator: Obiekt z metodami count(text) i chars_per_token(text)
+                   (backends.tokens.TokenEstimator)
+
+    Returns:
+        Lista niepustych czesci
+    """
+    if token_budget < 1:
+        raise ValueError("token_budget musi byc dodatni")
+
+    max_chars = max(1, int(token_budget * estimator.chars_per_token(text)))
+    chunks = []
+    for chunk in chunk_text(text, max_chars):
+        chunks.extend(_fit_to_budget(chunk, token_budget, estimator, max_chars))
+    return chunks
+
+
+def _fit_to_budget(chunk: str, token_budget: int, estimator, max_chars: int) -> List[str]:
+    tokens = estimator.count(chunk)
+    if tokens <= token_budget or len(chunk) <= 1:
+        return [chunk]
+
+    # Limit znakow proporcjonalnie do przekroczenia (z zapasem 5%)
+    smaller = min(max_chars - 1, int(len(chunk) * token_budget / tokens * 0.95))
+    smaller = max(1, smaller)
+    parts = []
+    for part in chunk_text(chunk, smaller):
+        parts.extend(_fit_to_budget(part, token_budget, estimator, smaller))
+    return parts
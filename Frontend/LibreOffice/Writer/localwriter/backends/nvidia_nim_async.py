@@ -0,0 +1,883 @@
+# -*- coding: utf-8 -*-
+"""
+nvidia_nim_async.py - Asynchroniczny (asyncio) backend NVIDIA NIM
+=================================================================
+
+Wersja NvidiaNimBackend dla integratorow osadzajacych POLONISTA
+w serwisach asyncio. Zapytania ida przez wlasnego klienta HTTP/1.1 na
+asyncio.open_connection (keep-alive, bez watku na zapytanie), wiec
+tysiace zapytan w locie nie wymagaja tysiecy watkow.
+
+Wspolne z wersja synchroniczna:
+- konfiguracja, klucz API (.env) i walidacja klucza
+- mapowanie bledow HTTP na komunikaty [BLAD ...]
+- limiter RPM/TPM (ten sam budzet co wywolania synchroniczne)
+- cache wynikow (odczyt/zapis SQLite w puli watkow, nie w petli zdarzen)
+  i dzielenie tekstu na czesci
+
+UZYCIE:
+    backend = AsyncNvidiaNimBackend()
+    success, result = await backend.asimplify_text("Tekst urzedowy...")
+
+    async for fragment in backend.astream_text("Tekst urzedowy..."):
+        print(fragment, end="")
+
+Anulowanie: anuluj zadanie (task.cancel()) - otwarte polaczenie jest
+zamykane, a pozostale czesci asimplify_long_text nie sa wysylane.
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+import inspect
+import json
+import ssl
+import time
+from typing import Optional, Tuple, Dict, Any, List
+from urllib.parse import urlsplit
+
+from .nvidia_nim_backend import (
+    NvidiaNimBackend,
+    SYSTEM_PROMPT_PLAIN_LANGUAGE,
+    SSE_DONE,
+    HttpTransportError,
+    RateLimiter,
+    RetryBudget,
+    estimate_tokens,
+    http_error_message,
+    parse_completion,
+    parse_sse_line,
+    stream_delta,
+    _FATAL_ERROR_PREFIXES,
+    _PackedPrefix,
+    _pack_messages,
+)
+
+
+class NimApiError(Exception):
+    """Blad zapytania zglaszany przez astream_text (tresc jak [BLAD ...])."""
+
+
+# =============================================================================
+# KLIENT HTTP/1.1 NA ASYNCIO
+# =============================================================================
+
+class _AsyncConnection:
+    """Polaczenie (reader, writer) z czasem ostatniego uzycia."""
+
+    def __init__(self, key, reader, writer):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.time()
+        self.reused = False
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class AsyncHttpResponse:
+    """Odpowiedz HTTP czytana asynchronicznie (Content-Length, chunked lub do EOF)."""
+
+    def __init__(self, pool, conn, status, headers, timeout):
+        self._pool = pool
+        self._conn = conn
+        self._timeout = timeout
+        self._complete = False
+        self._closed = False
+        self.status = status
+        self.headers = headers
+
+    async def _read(self, coro):
+        try:
+            return await asyncio.wait_for(coro, self._timeout)
+        except asyncio.CancelledError:
+            self.close()
+            raise
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, OSError, ValueError) as e:
+            self.close()
+            raise HttpTransportError(e if str(e) else type(e).__name__)
+
+    async def iter_chunks(self):
+        """Zwraca kolejne fragmenty body (bytes)."""
+        reader = self._conn.reader
+
+        if self.headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size_line = await self._read(reader.readline())
+                size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # Trailery do pustej linii
+                    while (await self._read(reader.readline())) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                data = await self._read(reader.readexactly(size))
+                await self._read(reader.readexactly(2))
+                yield data
+
+        elif "content-length" in self.headers:
+            remaining = int(self.headers["content-length"])
+            while remaining > 0:
+                data = await self._read(reader.read(min(remaining, 65536)))
+                if not data:
+                    self.close()
+                    raise HttpTransportError("Polaczenie zamkniete przed koncem odpowiedzi")
+                remaining -= len(data)
+                yield data
+
+        else:
+            # Bez dlugosci - do zamkniecia polaczenia (nie do ponownego uzycia)
+            self.headers["connection"] = "close"
+            while True:
+                data = await self._read(reader.read(65536))
+                if not data:
+                    break
+                yield data
+
+        self._complete = True
+
+    async def iter_lines(self):
+        """Zwraca kolejne linie body (bytes, z koncem linii)."""
+        buffer = b""
+        async for data in self.iter_chunks():
+            buffer += data
+            while True:
+                newline = buffer.find(b"\n")
+                if newline < 0:
+                    break
+                yield buffer[:newline + 1]
+                buffer = buffer[newline + 1:]
+        if buffer:
+            yield buffer
+
+    async def read(self) -> bytes:
+        """Czyta cale (pozostale) body."""
+        parts = []
+        async for data in self.iter_chunks():
+            parts.append(data)
+        return b"".join(parts)
+
+    def close(self):
+        """Zwalnia polaczenie (do puli tylko gdy odpowiedz przeczytano do konca)."""
+        if self._closed:
+            return
+        self._closed = True
+        reusable = (self._complete
+                    and self.headers.get("connection", "").lower() != "close")
+        self._pool._release(self._conn, reusable)
+
+
+class AsyncHttpConnectionPool:
+    """
+    Pula polaczen keep-alive dla asyncio (HTTP i HTTPS).
+
+    Polaczenia naleza do petli zdarzen, w ktorej powstaly - po zmianie
+    petli (np. kolejne asyncio.run) stare polaczenia sa zamykane i porzucane.
+    Proxy (HTTPS_PROXY) i kompresja gzip nie sa obslugiwane.
+    """
+
+    def __init__(self, maxsize: int = 4, idle_timeout: float = 30):
+        self.maxsize = max(1, int(maxsize))
+        self.idle_timeout = float(idle_timeout)
+        self._idle: Dict[Tuple[str, str, int], List[_AsyncConnection]] = {}
+        self._loop = None
+        self.created = 0
+        self.reused = 0
+
+    def _check_loop(self):
+        loop = asyncio.get_event_loop()
+        if loop is not self._loop:
+            self.close()
+            self._loop = loop
+
+    async def _connect(self, key, timeout) -> _AsyncConnection:
+        scheme, host, port = key
+        ssl_context = ssl.create_default_context() if scheme == "https" else None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=ssl_context),
+                timeout
+            )
+        except (asyncio.TimeoutError, OSError) as e:
+            raise HttpTransportError(e if str(e) else type(e).__name__)
+        self.created += 1
+        return _AsyncConnection(key, reader, writer)
+
+    async def _acquire(self, key, timeout) -> _AsyncConnection:
+        self._check_loop()
+        now = time.time()
+        idle = self._idle.get(key, [])
+        while idle:
+            conn = idle.pop()
+            if now - conn.last_used > self.idle_timeout or conn.reader.at_eof():
+                conn.close()
+                continue
+            conn.reused = True
+            self.reused += 1
+            return conn
+        return await self._connect(key, timeout)
+
+    def _release(self, conn: _AsyncConnection, reusable: bool) -> None:
+        if not reusable or self._loop is None:
+            conn.close()
+            return
+        conn.last_used = time.time()
+        conn.reused = False
+        idle = self._idle.setdefault(conn.key, [])
+        if len(idle) < self.maxsize:
+            idle.append(conn)
+        else:
+            conn.close()
+
+    def close(self) -> None:
+        """Zamyka wszystkie bezczynne polaczenia."""
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+    async def open(
+        self,
+        url: str,
+        body: bytes,
+        headers: Dict[str, str],
+        timeout: float
+    ) -> AsyncHttpResponse:
+        """
+        Wysyla POST i zwraca odpowiedz z przeczytanym naglowkiem.
+
+        Raises:
+            HttpTransportError: Blad sieci lub timeout
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        head_lines = [
+            f"POST {path} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            f"Content-Length: {len(body)}",
+        ]
+        head_lines += [f"{name}: {value}" for name, value in headers.items()]
+        request = ("\r\n".join(head_lines) + "\r\n\r\n").encode("latin-1") + body
+
+        # Maksymalnie 2 proby: druga tylko gdy polaczenie z puli bylo martwe
+        for attempt in range(2):
+            conn = await self._acquire(key, timeout)
+            try:
+                conn.writer.write(request)
+                await asyncio.wait_for(conn.writer.drain(), timeout)
+                status_line = await asyncio.wait_for(conn.reader.readline(), timeout)
+                if not status_line:
+                    raise ConnectionResetError("Serwer zamknal polaczenie")
+
+                response_headers = {}
+                while True:
+                    line = await asyncio.wait_for(conn.reader.readline(), timeout)
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    response_headers[name.strip().lower()] = value.strip()
+
+            except asyncio.CancelledError:
+                conn.close()
+                raise
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                conn.close()
+                if conn.reused and attempt == 0:
+                    continue
+                raise HttpTransportError(e)
+            except (asyncio.TimeoutError, OSError) as e:
+                conn.close()
+                raise HttpTransportError(e if str(e) else type(e).__name__)
+
+            try:
+                version, status = status_line.decode("latin-1").split()[:2]
+                status = int(status)
+            except ValueError:
+                conn.close()
+                raise HttpTransportError(f"Nieprawidlowa odpowiedz HTTP: {status_line[:80]!r}")
+
+            if version == "HTTP/1.0":
+                response_headers.setdefault("connection", "close")
+
+            return AsyncHttpResponse(self, conn, status, response_headers, timeout)
+
+        raise HttpTransportError("Nie udalo sie nawiazac polaczenia")
+
+    async def request(
+        self,
+        url: str,
+        body: bytes,
+        headers: Dict[str, str],
+        timeout: float
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Wysyla POST i zwraca (status, naglowki, body)."""
+        response = await self.open(url, body, headers, timeout)
+        try:
+            data = await response.read()
+        finally:
+            response.close()
+        return response.status, response.headers, data
+
+
+# =============================================================================
+# LIMITER DLA ASYNCIO
+# =============================================================================
+
+class AsyncRateLimiter:
+    """
+    Asynchroniczna nakladka na wspoldzielony RateLimiter.
+
+    Korzysta z tego samego budzetu RPM/TPM co wywolania synchroniczne
+    w tym procesie. Korutyny czekaja w kolejce FIFO (asyncio.Lock),
+    a oczekiwanie nie blokuje petli zdarzen.
+    """
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+        self._locks = {}
+
+    def _lock(self):
+        # asyncio.Lock musi nalezec do biezacej petli zdarzen
+        loop = asyncio.get_event_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            self._locks = {loop: asyncio.Lock()}
+            lock = self._locks[loop]
+        return lock
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """Czeka na wolne miejsce; zwraca czas oczekiwania w sekundach."""
+        start = time.monotonic()
+        async with self._lock():
+            while True:
+                wait = self.limiter.try_acquire(tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+        waited = time.monotonic() - start
+        self.limiter.add_wait(waited)
+        return waited
+
+
+# =============================================================================
+# KLASA GLOWNA: AsyncNvidiaNimBackend
+# =============================================================================
+
+class AsyncNvidiaNimBackend(NvidiaNimBackend):
+    """
+    Backend NVIDIA NIM z API asyncio.
+
+    Metody synchroniczne klasy bazowej nadal dzialaja; metody z prefiksem
+    "a" sa korutynami i nie blokuja petli zdarzen.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        super().__init__(config)
+        self._apool = AsyncHttpConnectionPool(
+            self.config['pool_maxsize'],
+            self.config['pool_idle_timeout']
+        )
+        self._async_limiters: Dict[int, AsyncRateLimiter] = {}
+        # Zapytania w toku wg klucza cache (singleflight w asimplify_text)
+        self._async_in_flight: Dict[str, asyncio.Future] = {}
+
+    async def _in_executor(self, function, *args):
+        """Wywoluje blokujaca funkcje (cache SQLite) w puli watkow petli."""
+        return await asyncio.get_event_loop().run_in_executor(None, function, *args)
+
+    def _async_limiter_for(self, limiter: RateLimiter) -> AsyncRateLimiter:
+        """Nakladka asyncio na limiter endpointu (tworzona raz na limiter)."""
+        async_limiter = self._async_limiters.get(id(limiter))
+        if async_limiter is None or async_limiter.limiter is not limiter:
+            async_limiter = AsyncRateLimiter(limiter)
+            self._async_limiters[id(limiter)] = async_limiter
+        return async_limiter
+
+    # -------------------------------------------------------------------------
+    # WYWOLANIE API
+    # -------------------------------------------------------------------------
+
+    async def _amake_request(
+        self,
+        messages: List[Dict[str, str]],
+        on_token: Optional[callable] = None,
+        retry_budget: Optional[RetryBudget] = None
+    ) -> Tuple[bool, str]:
+        """
+        Asynchroniczny odpowiednik _make_request.
+
+        Args:
+            messages: Lista wiadomosci [{role, content}, ...]
+            on_token: Funkcja lub korutyna wywolywana dla kazdego fragmentu
+                      (wlacza strumieniowanie SSE)
+            retry_budget: Wspolny limit ponowien zadania (opcjonalny)
+
+        Returns:
+            Tuple (success: bool, result: str)
+        """
+        balancer = self._get_balancer()
+
+        payload = {
+            "model": self.config['model'],
+            "messages": messages,
+            "temperature": self.config['temperature'],
+            "max_tokens": self.config['max_tokens'],
+            "stream": on_token is not None
+        }
+
+        retry_count = 0
+        delay = 0.0
+        tried = set()
+
+        while True:
+            endpoint = balancer.pick(tried)
+            ok = False
+            try:
+                key_error, headers = self._request_headers(endpoint)
+                if key_error:
+                    ok = True  # Blad klucza nie swiadczy o stanie serwera
+                    return False, key_error
+                headers["User-Agent"] = "POLONISTA/2.1 localwriter-nvidia-backend-async"
+                headers["Accept-Encoding"] = "identity"
+
+                data = json.dumps(
+                    dict(payload, model=endpoint.model or self.config['model'])
+                ).encode('utf-8')
+
+                reserved_tokens = 0
+                if self.config['rate_limit_tpm']:
+                    reserved_tokens = estimate_tokens(
+                        messages, self.config['max_tokens'], self._token_estimator
+                    )
+                await self._async_limiter_for(endpoint.limiter).acquire(reserved_tokens)
+                with self._stats_lock:
+                    self._request_count += 1
+
+                start = time.monotonic()
+                response = await self._apool.open(
+                    endpoint.url, data, headers, self.config['timeout']
+                )
+
+                try:
+                    if response.status < 400:
+                        if on_token is not None:
+                            emitted = []
+
+                            def forward(piece):
+                                emitted.append(len(piece))
+                                return on_token(piece)
+
+                            try:
+                                result = await self._aread_stream(
+                                    response, forward, start, reserved_tokens, endpoint.limiter
+                                )
+                            except HttpTransportError as e:
+                                if emitted:
+                                    # Fragmenty sa juz u odbiorcy - bez ponowienia (jak _make_request)
+                                    return False, f"[BLAD] Przerwany strumien: {str(e.reason)}"
+                                raise
+                            ok = True
+                            return result
+                        ok = True
+                        result = json.loads((await response.read()).decode('utf-8'))
+                        usage = result.get('usage') or {}
+                        if reserved_tokens:
+                            endpoint.limiter.reconcile(
+                                reserved_tokens, usage.get('total_tokens', 0)
+                            )
+                        self._observe_usage(messages, usage)
+                        return parse_completion(result)
+
+                    status, response_headers = response.status, response.headers
+                    body = await response.read()
+                    ok = status < 500
+                finally:
+                    response.close()
+
+            except asyncio.CancelledError:
+                ok = True
+                raise
+
+            except HttpTransportError as e:
+                status, response_headers, body = None, {}, b""
+                error = f"[BLAD] Brak polaczenia z internetem: {str(e.reason)}"
+
+            except json.JSONDecodeError as e:
+                return False, f"[BLAD] Nieprawidlowa odpowiedz JSON: {str(e)}"
+
+            except Exception as e:
+                return False, f"[BLAD] {type(e).__name__}: {str(e)}"
+
+            finally:
+                balancer.release(endpoint, ok)
+
+            next_delay = self._plan_retry(
+                endpoint, status, response_headers, retry_count, delay, retry_budget, tried
+            )
+            if next_delay is None:
+                if status is None:
+                    return False, error
+                return False, http_error_message(status, body, self.config['model'])
+
+            retry_count += 1
+            if next_delay > 0:
+                delay = next_delay
+                if status != 429:
+                    # Przy 429 czeka wspoldzielony limiter (pause), tu tylko 5xx
+                    await asyncio.sleep(delay)
+
+    async def _aread_stream(
+        self,
+        response: AsyncHttpResponse,
+        on_token: callable,
+        start: float,
+        reserved_tokens: int = 0,
+        limiter: Optional[RateLimiter] = None
+    ) -> Tuple[bool, str]:
+        """Czyta odpowiedz SSE i przekazuje fragmenty do on_token."""
+        parts = []
+        first_token_at = None
+        usage = {}
+
+        async for raw_line in response.iter_lines():
+            chunk = parse_sse_line(raw_line)
+            if chunk is None:
+                continue
+            if chunk is SSE_DONE:
+                break
+
+            if 'error' in chunk:
+                return False, f"[BLAD] Blad strumienia: {str(chunk['error'])[:200]}"
+
+            usage = chunk.get('usage') or usage
+            piece = stream_delta(chunk)
+            if not piece:
+                continue
+
+            if first_token_at is None:
+                first_token_at = time.monotonic()
+            parts.append(piece)
+
+            try:
+                result = on_token(piece)
+                if inspect.isawaitable(result):
+                    await result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return False, f"[BLAD] Przerwano strumien: {type(e).__name__}: {str(e)}"
+
+        # Doczytaj reszte, aby polaczenie wrocilo do puli
+        await response.read()
+
+        if reserved_tokens:
+            (limiter or self._rate_limiter).reconcile(reserved_tokens, usage.get('total_tokens', 0))
+
+        end = time.monotonic()
+        with self._stats_lock:
+            self.last_stream_stats = {
+                "ttft_s": round(first_token_at - start, 3) if first_token_at else None,
+                "duration_s": round(end - start, 3),
+                "chunks": len(parts),
+            }
+
+        content = "".join(parts)
+        if not content.strip():
+            return False, "[BLAD] Odpowiedz API jest pusta (null)"
+
+        return True, content.strip()
+
+    # -------------------------------------------------------------------------
+    # INTERFEJS PUBLICZNY (asyncio)
+    # -------------------------------------------------------------------------
+
+    async def asimplify_text(
+        self,
+        text: str,
+        system_prompt: Optional[str] = None,
+        on_token: Optional[callable] = None,
+        retry_budget: Optional[RetryBudget] = None
+    ) -> Tuple[bool, str]:
+        """
+        Upraszcza tekst (korutyna).
+
+        Args:
+            text: Tekst do uproszczenia
+            system_prompt: Opcjonalny wlasny prompt systemowy
+            on_token: Opcjonalna funkcja/korutyna dla kazdego fragmentu
+                      odpowiedzi (tryb strumieniowy)
+            retry_budget: Wspolny limit ponowien zadania (opcjonalny)
+
+        Returns:
+            Tuple (success: bool, result: str)
+        """
+        if not text or len(text.strip()) == 0:
+            return False, "[BLAD] Tekst jest pusty"
+
+        prompt = system_prompt or SYSTEM_PROMPT_PLAIN_LANGUAGE
+
+        if self._cache is not None:
+            cached = await self._in_executor(self._cached_result, prompt, text)
+            if cached is not None:
+                if on_token is not None:
+                    try:
+                        result = on_token(cached)
+                        if inspect.isawaitable(result):
+                            await result
+                    except Exception as e:
+                        return False, f"[BLAD] Przerwano strumien: {type(e).__name__}: {str(e)}"
+                return True, cached
+
+        messages = [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": text.strip()}
+        ]
+
+        if on_token is not None:
+            success, result = await self._amake_request(messages, on_token, retry_budget)
+            if success:
+                await self._in_executor(self._store_result, prompt, text, result)
+            return success, result
+
+        # Singleflight: ten sam tekst w toku w innej korutynie
+        flight_key = self._cache_key(prompt, text)
+        flight = self._async_in_flight.get(flight_key)
+        if flight is not None:
+            with self._stats_lock:
+                self.dedup_stats["joined_in_flight"] += 1
+            return await asyncio.shield(flight)
+
+        flight = asyncio.get_event_loop().create_future()
+        self._async_in_flight[flight_key] = flight
+        success, result = False, "[BLAD] Zapytanie przerwane"
+        try:
+            success, result = await self._amake_request(messages, None, retry_budget)
+            if success:
+                await self._in_executor(self._store_result, prompt, text, result)
+        finally:
+            del self._async_in_flight[flight_key]
+            flight.set_result((success, result))
+
+        return success, result
+
+    async def astream_text(self, text: str, system_prompt: Optional[str] = None):
+        """
+        Asynchroniczny generator fragmentow uproszczonego tekstu.
+
+        Przerwanie iteracji (break, aclose) anuluje zapytanie.
+
+        Raises:
+            NimApiError: Gdy zapytanie sie nie powiedzie
+        """
+        queue = asyncio.Queue()
+        finished = object()
+
+        async def produce():
+            try:
+                return await self.asimplify_text(text, system_prompt, on_token=queue.put_nowait)
+            finally:
+                queue.put_nowait(finished)
+
+        task = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                yield item
+
+            success, result = await task
+            if not success:
+                raise NimApiError(result)
+        finally:
+            if not task.done():
+                task.cancel()
+                # Czekamy na zakonczenie, zeby polaczenie wrocilo/zostalo zamkniete
+                await asyncio.gather(task, return_exceptions=True)
+
+    async def asimplify_many(
+        self,
+        texts: List[str],
+        system_prompt: Optional[str] = None,
+        progress_callback: Optional[callable] = None,
+        retry_budget: Optional[RetryBudget] = None
+    ) -> List[Tuple[bool, str]]:
+        """
+        Upraszcza liste tekstow wspolbieznie (max_concurrency korutyn naraz).
+
+        Semantyka jak NvidiaNimBackend.simplify_many: wyniki w kolejnosci
+        wejsciowej, blad jednej czesci nie przerywa pozostalych, po bledzie
+        klucza/dostepu niewyslane czesci sa pomijane; retry_budget jest
+        wspolny dla zadania (domyslnie nowy).
+        """
+        total = len(texts)
+        if total == 0:
+            return []
+
+        semaphore = asyncio.Semaphore(max(1, int(self.config['max_concurrency'])))
+        aborted = asyncio.Event()
+        if retry_budget is None:
+            retry_budget = RetryBudget(self.config['retry_budget'])
+        outcomes: List[Optional[Tuple[bool, str]]] = [None] * total
+        state = {"done": 0, "prefix_end": 0}
+        prefix_results: List[str] = []
+
+        async def run(i, text):
+            async with semaphore:
+                if aborted.is_set():
+                    outcome = (False, "[BLAD] Anulowano po wczesniejszym bledzie")
+                else:
+                    outcome = await self.asimplify_text(
+                        text, system_prompt, retry_budget=retry_budget
+                    )
+            if not outcome[0] and outcome[1].startswith(_FATAL_ERROR_PREFIXES):
+                aborted.set()
+
+            outcomes[i] = outcome
+            while state["prefix_end"] < total and outcomes[state["prefix_end"]] is not None:
+                ok, res = outcomes[state["prefix_end"]]
+                prefix_results.append(res if ok else texts[state["prefix_end"]])
+                state["prefix_end"] += 1
+
+            state["done"] += 1
+            if progress_callback:
+                try:
+                    progress_callback(state["done"], total, "\n\n".join(prefix_results))
+                except:
+                    pass
+
+        await asyncio.gather(*(run(i, t) for i, t in enumerate(texts)))
+        return outcomes
+
+    async def asimplify_packed(
+        self,
+        texts: List[str],
+        system_prompt: Optional[str] = None,
+        progress_callback: Optional[callable] = None,
+        retry_budget: Optional[RetryBudget] = None
+    ) -> List[Tuple[bool, str]]:
+        """
+        Upraszcza liste krotkich tekstow paczkami (korutyna).
+
+        Semantyka jak NvidiaNimBackend.simplify_packed: paczki z _plan_packs
+        (powtorzenia wysylane raz), fragmenty znieksztalcone ida do osobnych
+        zapytan, po bledzie klucza/dostepu niewyslane paczki sa pomijane.
+        """
+        prompt = system_prompt or SYSTEM_PROMPT_PLAIN_LANGUAGE
+        outcomes, packs, copies = await self._in_executor(self._plan_packs, texts, system_prompt)
+
+        def settle(i, result):
+            outcomes[i] = result
+            for j in copies.get(i, ()):
+                outcomes[j] = result
+
+        semaphore = asyncio.Semaphore(max(1, int(self.config['max_concurrency'])))
+        aborted = asyncio.Event()
+        if retry_budget is None:
+            retry_budget = RetryBudget(self.config['retry_budget'])
+        prefix = _PackedPrefix(texts, outcomes)
+        state = {"done": 0}
+
+        async def simplify_one(i):
+            async with semaphore:
+                if aborted.is_set():
+                    return False, "[BLAD] Anulowano po wczesniejszym bledzie"
+                return await self.asimplify_text(
+                    texts[i], system_prompt, retry_budget=retry_budget
+                )
+
+        async def run(pack):
+            if len(pack) == 1:
+                results = [await simplify_one(pack[0])]
+            else:
+                batch = [texts[i] for i in pack]
+                async with semaphore:
+                    if aborted.is_set():
+                        success, response = False, "[BLAD] Anulowano po wczesniejszym bledzie"
+                    else:
+                        success, response = await self._amake_request(
+                            _pack_messages(batch, prompt), retry_budget=retry_budget
+                        )
+                if success:
+                    parts = await self._in_executor(self._unpack_response, batch, prompt, response)
+                    results = [(True, part) if part is not None else None for part in parts]
+                else:
+                    results = [(False, response)] * len(pack)
+
+            for i, result in zip(pack, results):
+                settle(i, result)
+                if result is not None and not result[0] and result[1].startswith(_FATAL_ERROR_PREFIXES):
+                    aborted.set()
+
+            # Fragmenty znieksztalcone - osobne zapytania
+            missing = [i for i, result in zip(pack, results) if result is None]
+            if missing:
+                with self._stats_lock:
+                    self.pack_stats["fallback_units"] += len(missing)
+                retried = await asyncio.gather(*(simplify_one(i) for i in missing))
+                for i, result in zip(missing, retried):
+                    settle(i, result)
+
+            state["done"] += 1
+            if progress_callback:
+                try:
+                    progress_callback(state["done"], len(packs), prefix.advance())
+                except:
+                    pass
+
+        await asyncio.gather(*(run(pack) for pack in packs))
+        return outcomes
+
+    async def asimplify_long_text(
+        self,
+        text: str,
+        system_prompt: Optional[str] = None,
+        progress_callback: Optional[callable] = None,
+        retry_budget: Optional[RetryBudget] = None
+    ) -> Tuple[bool, str]:
+        """
+        Upraszcza dlugi tekst dzielac go na czesci wysylane wspolbieznie.
+
+        Wynik jak NvidiaNimBackend.simplify_long_text.
+        """
+        if not text or len(text.strip()) == 0:
+            return False, "[BLAD] Tekst jest pusty"
+
+        text = text.strip()
+
+        runs, chunks = self._plan_long_text(text, system_prompt)
+        if not chunks:
+            return True, text
+        if len(runs) == 1 and len(chunks) == 1:
+            return await self.asimplify_text(text, system_prompt, retry_budget=retry_budget)
+
+        if self._packed_long_text(runs):
+            outcomes = await self.asimplify_packed(chunks, system_prompt, progress_callback, retry_budget)
+        else:
+            outcomes = await self.asimplify_many(chunks, system_prompt, progress_callback, retry_budget)
+        return self._join_long_text(runs, chunks, outcomes)
+
+    async def aclose(self) -> None:
+        """Zamyka polaczenia keep-alive tej instancji."""
+        self._apool.close()
+
+    def get_info(self) -> Dict[str, Any]:
+        """Zwraca informacje o konfiguracji backendu."""
+        info = super().get_info()
+        info["name"] = "NVIDIA NIM Backend (asyncio)"
+        info["async_connections_created"] = self._apool.created
+        info["async_connections_reused"] = self._apool.reused
+        return info
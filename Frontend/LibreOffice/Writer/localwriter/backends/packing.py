@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+packing.py - Laczenie wielu krotkich tekstow w jedno zapytanie
+==============================================================
+
+Lista krotkich akapitow (np. wyliczenie, komorki arkusza) to jedno
+zapytanie na akapit - przy limicie 40 RPM 400 jednowierszowych akapitow
+to co najmniej 10 minut. Tu krotkie teksty sa pakowane po kilka-kilkanascie
+w jedno zapytanie:
+
+    <<<1>>>
+    pierwszy tekst
+    <<<2>>>
+    drugi tekst
+
+a prompt systemowy (packing_prompt) prosi o odpowiedz w tym samym
+formacie. parse_pack rozdziela odpowiedz z powrotem; fragmenty brakujace,
+puste lub powtorzone - oraz fragment przed brakujacym znacznikiem, ktory
+mogl wchlonac tresc nastepnego - sa zwracane jako None i tylko one ida
+potem do osobnych zapytan.
+
+Teksty zawierajace znacznik "<<<" nie sa pakowane (can_pack).
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import absolute_import
+
+import re
+from typing import List, Optional, Sequence
+
+
+# Znacznik fragmentu i jego rozpoznawanie w odpowiedzi (wlasny wiersz,
+# model bywa niestaranny w spacjach)
+PACK_MARKER = "<<<{}>>>"
+_MARKER_RE = re.compile(r"^[ \t]*<<<[ \t]*(\d+)[ \t]*>>>[ \t]*$", re.M)
+
+# Dopisywane do promptu systemowego przy zapytaniu z wieloma fragmentami
+PACKING_INSTRUCTIONS = """
+
+FORMAT ODPOWIEDZI (WIELE FRAGMENTOW):
+Tekst sklada sie z {count} ponumerowanych fragmentow. Kazdy fragment zaczyna sie od wiersza <<<numer>>>.
+Przeksztalc kazdy fragment osobno, wedlug zasad powyzej.
+Odpowiedz dokladnie {count} fragmentami, w tej samej kolejnosci i formacie: wiersz <<<numer>>>, a pod nim przeksztalcony tekst fragmentu.
+Nie lacz, nie dziel i nie pomijaj fragmentow. Nie dodawaj zadnych komentarzy."""
+
+
+def can_pack(text: str) -> bool:
+    """Czy tekst mozna bezpiecznie zapakowac (nie zawiera znacznika)."""
+    return "<<<" not in text
+
+
+def packing_prompt(system_prompt: str, count: int) -> str:
+    """Prompt systemowy dla zapytania z `count` fragmentami."""
+    return system_prompt + PACKING_INSTRUCTIONS.format(count=count)
+
+
+def format_pack(texts: Sequence[str]) -> str:
+    """Laczy teksty w jedna wiadomosc z numerowanymi znacznikami."""
+    return "\n".join(
+        PACK_MARKER.format(i) + "\n" + text.strip()
+        for i, text in enumerate(texts, 1)
+    )
+
+
+def parse_pack(response: str, count: int) -> List[Optional[str]]:
+    """
+    Rozdziela odpowiedz na fragmenty.
+
+    Args:
+        response: Odpowiedz modelu
+        count: Liczba wyslanych fragmentow
+
+    Returns:
+        Lista `count` elementow: tekst fragmentu lub None, gdy fragmentu
+        brak, jest pusty, jego numer wystapil wiecej niz raz albo po nim
+        nie ma znacznika z kolejnym numerem (tresc mogla sie zlac)
+    """
+    results: List[Optional[str]] = [None] * count
+    seen = set()
+    duplicated = set()
+
+    markers = list(_MARKER_RE.finditer(response))
+    for i, match in enumerate(markers):
+        number = int(match.group(1))
+        if not 1 <= number <= count:
+            continue
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(response)
+        text = response[match.end():end].strip()
+        if number in seen:
+            duplicated.add(number)
+        seen.add(number)
+        following = int(markers[i + 1].group(1)) if i + 1 < len(markers) else count + 1
+        results[number - 1] = (text or None) if following == number + 1 else None
+
+    for number in duplicated:
+        results[number - 1] = None
+    return results
+
+
+def pack_units(
+    sizes: Sequence[int],
+    budget: int,
+    max_units: int,
+    marker_size: int = 0
+) -> List[List[int]]:
+    """
+    Dzieli kolejne teksty na paczki mieszczace sie w budzecie.
+
+    Paczka to lista indeksow sasiednich tekstow; suma rozmiarow (plus
+    marker_size na znacznik) nie przekracza budget, a liczba tekstow
+    max_units. Tekst wiekszy niz budzet tworzy paczke jednoelementowa.
+
+    Args:
+        sizes: Rozmiary tekstow (w jednostkach budzetu)
+        budget: Budzet jednego zapytania
+        max_units: Maksymalna liczba tekstow w paczce
+        marker_size: Koszt znacznika jednego fragmentu
+
+    Returns:
+        Lista paczek (list indeksow), w kolejnosci
+    """
+    packs: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for index, size in enumerate(sizes):
+        cost = size + marker_size
+        if current and (used + cost > budget or len(current) >= max_units):
+            packs.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += cost
+    if current:
+        packs.append(current)
+    return packs
+
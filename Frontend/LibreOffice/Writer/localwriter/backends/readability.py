@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+readability.py - Lokalna ocena, czy akapit jest juz w prostym jezyku
+=====================================================================
+
+SYSTEM_PROMPT_PLAIN_LANGUAGE opisuje mierzalne zasady: zdania do 15 slow,
+bez slow obcych, bez strony biernej, bez skrotow i zargonu. Akapit, ktory
+juz je spelnia, nie musi isc do modelu - ta ocena trwa mikrosekundy
+i nie zuzywa limitu zapytan.
+
+POMIARY (score_paragraph):
+- words / sentences / longest_sentence - slowa w najdluzszym zdaniu
+  (granice zdan z backends/sentences.py, skroty nie tna zdan)
+- long_words - slowa z 4 i wiecej sylabami (jak "trudne slowa" w FOG-PL)
+- passive - "zostal/zostanie...", "jest/byl/bedzie" + imieslow bierny,
+  formy bezosobowe "-no/-to" ("przyznano", "wszczeto") i "-a/-je sie"
+  ("sklada sie", "przyznaje sie")
+- jargon - zargon urzedowy ("niniejszy", "nalezy", "celem"), slowa obce
+  ("deadline", "de facto") i skroty z ABBREVIATIONS
+
+Akapit jest prosty (is_plain), gdy najdluzsze zdanie ma najwyzej
+max_sentence_words slow, udzial dlugich slow nie przekracza
+max_long_words (jedno dlugie slowo jest zawsze dozwolone - krotkie
+akapity), a passive i jargon sa rowne 0. Ocena jest celowo
+ostrozna: akapit watpliwy idzie do modelu jak dotad.
+
+Slowa sa porownywane bez polskich znakow, wiec ocena dziala tak samo
+dla "należy" i "nalezy".
+
+plain_flags ocenia liste akapitow, dla duzych list opcjonalnie w puli
+procesow (processes > 1). Interpreter wbudowany w LibreOffice nie zawsze
+moze uruchamiac procesy potomne - kazdy blad puli konczy sie ocena
+w biezacym procesie.
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import absolute_import, division
+
+import re
+import unicodedata
+from typing import Dict, List, Sequence
+
+try:
+    from .sentences import ABBREVIATIONS, FINAL_ABBREVIATIONS, split_sentences
+except ImportError:
+    try:
+        from sentences import ABBREVIATIONS, FINAL_ABBREVIATIONS, split_sentences
+    except ImportError:
+        from backends.sentences import ABBREVIATIONS, FINAL_ABBREVIATIONS, split_sentences
+
+
+# Zargon urzedowy i prawniczy (bez polskich znakow): poczatki slow...
+JARGON_STEMS = (
+    "niniejsz", "przedmiotow", "powyzsz", "ponizsz", "nadmieni",
+    "uprzejmie", "tudziez", "albowiem", "aczkolwiek", "azeby",
+    "przedloz", "doreczen", "uiszcz", "przeslank", "zasadnosc",
+    "bezzasadn", "stosown",
+)
+
+# ...i cale slowa
+JARGON_WORDS = frozenset("""
+    nalezy celem iz jakowy jakowa jakowe winien winna winno ww tzw tj tzn
+    pkt ust art poz wszelki wszelkie wszelkich przeto
+""".split())
+
+# Slowa obce (angielskie i lacinskie wtracenia)
+FOREIGN_WORDS = frozenset("""
+    asap briefing brainstorming call case coaching content deadline event
+    feedback know how meeting online performance research target task team
+    update facto iure hoc officio contrario quo legis vacatio stricto
+    largo expressis verbis facie vide lex
+""".split())
+
+
+_WORD_RE = re.compile(r"[^\W_]+(?:[-'][^\W_]+)*")
+_ABBREVIATION_RE = re.compile(r"\b([^\W\d_]+(?:\.[^\W\d_]+)*)\.")
+
+# Strona bierna (tekst bez polskich znakow, male litery)
+_PASSIVE_RE = re.compile(
+    r"\bzosta(?:l|la|lo|ly|li|nie|na|c|ja|je|wac)\b"
+    r"|\b(?:jest|sa|byl|byla|bylo|byly|byli|bedzie|beda)\s+(?:\w+\s+)?"
+    r"\w{3,}(?:ony|ona|one|eni|ana|ane|any|ani|yty|yta|yte|ety|eta|ete|ity|ita|ite)\b"
+    r"|\b\w{3,}(?:ono|ano|eto|yto|ito)\b"
+    r"|\b\w{3,}(?:a|je)\s+sie\b"
+)
+
+# Samogloska tworzaca sylabe ("i" przed samogloska to tylko zmiekczenie)
+_NUCLEUS = r"(?:[aeouy]|i(?![aeiouy]))"
+_VOWEL_RE = re.compile(_NUCLEUS)
+
+# Slowo z co najmniej 4 sylabami
+_LONG_WORD_RE = re.compile(
+    r"\b(?:(?:[^\W\daeiouy_]|i(?=[aeiouy]))*" + _NUCLEUS + r"){4}[^\W_]*"
+)
+
+_JARGON_RE = re.compile(
+    r"\b(?:(?:" + "|".join(JARGON_STEMS) + r")\w*"
+    r"|(?:" + "|".join(sorted(JARGON_WORDS | FOREIGN_WORDS)) + r")\b)"
+)
+
+# Polskie litery bez NFKD (szybka sciezka fold)
+_POLISH = str.maketrans("ąćęłńóśźżĄĆĘŁŃÓŚŹŻ", "acelnoszzACELNOSZZ")
+
+
+def fold(text: str) -> str:
+    """Male litery bez polskich znakow ("Należy" -> "nalezy")."""
+    text = text.translate(_POLISH).lower()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+# Skroty z backends/sentences.py w postaci po fold
+_SKROTY = frozenset(fold(a) for a in ABBREVIATIONS | FINAL_ABBREVIATIONS)
+
+DEFAULT_MAX_SENTENCE_WORDS = 15
+DEFAULT_MAX_LONG_WORDS = 0.15
+
+# Ponizej tylu akapitow pula procesow nie oplaca sie
+MIN_PARALLEL = 256
+
+
+def syllables(word: str) -> int:
+    """
+    Przyblizona liczba sylab slowa (po fold).
+
+    Kazda samogloska to sylaba, poza "i" przed samogloska ("nie",
+    "zamieszkania" - zmiekczenie).
+    """
+    return len(_VOWEL_RE.findall(word))
+
+
+def score_paragraph(text: str) -> Dict[str, int]:
+    """
+    Pomiary prostego jezyka dla akapitu.
+
+    Returns:
+        Slownik z kluczami words, sentences, longest_sentence,
+        long_words, passive, jargon
+    """
+    folded = fold(text)
+
+    # Granice zdan zaleza od wielkich liter - na tekscie oryginalnym
+    longest = 0
+    sentences = split_sentences(text)
+    for sentence in sentences:
+        longest = max(longest, len(_WORD_RE.findall(sentence)))
+
+    jargon = len(_JARGON_RE.findall(folded))
+    for abbreviation in _ABBREVIATION_RE.findall(folded):
+        if abbreviation in _SKROTY and abbreviation not in JARGON_WORDS:
+            jargon += 1
+
+    return {
+        "words": len(_WORD_RE.findall(folded)),
+        "sentences": len(sentences),
+        "longest_sentence": longest,
+        "long_words": len(_LONG_WORD_RE.findall(folded)),
+        "passive": len(_PASSIVE_RE.findall(folded)),
+        "jargon": jargon,
+    }
+
+
+def is_plain(
+    text: str,
+    max_sentence_words: int = DEFAULT_MAX_SENTENCE_WORDS,
+    max_long_words: float = DEFAULT_MAX_LONG_WORDS
+) -> bool:
+    """Czy akapit juz spelnia zasady prostego jezyka (patrz opis modulu)."""
+    score = score_paragraph(text)
+    return (
+        score["longest_sentence"] <= max_sentence_words
+        and score["long_words"] <= max(1, max_long_words * score["words"])
+        and not score["passive"]
+        and not score["jargon"]
+    )
+
+
+def _plain_batch(args):
+    # Zadanie dla puli procesow (musi byc funkcja modulu)
+    texts, max_sentence_words, max_long_words = args
+    return [is_plain(t, max_sentence_words, max_long_words) for t in texts]
+
+
+def plain_flags(
+    texts: Sequence[str],
+    max_sentence_words: int = DEFAULT_MAX_SENTENCE_WORDS,
+    max_long_words: float = DEFAULT_MAX_LONG_WORDS,
+    processes: int = 0
+) -> List[bool]:
+    """
+    is_plain dla kazdego tekstu, w kolejnosci.
+
+    Args:
+        texts: Akapity
+        max_sentence_words: Limit slow w zdaniu
+        max_long_words: Limit udzialu slow 4+ sylabowych
+        processes: Liczba procesow (0/1 = w biezacym procesie); pula jest
+                   uzywana dopiero od MIN_PARALLEL akapitow
+    """
+    texts = list(texts)
+    processes = int(processes or 0)
+    if processes > 1 and len(texts) >= MIN_PARALLEL:
+        size = -(-len(texts) // (processes * 4))
+        batches = [
+            (texts[i:i + size], max_sentence_words, max_long_words)
+            for i in range(0, len(texts), size)
+        ]
+        try:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                return [flag for batch in executor.map(_plain_batch, batches) for flag in batch]
+        except Exception:
+            # Brak multiprocessing, zablokowane procesy potomne, zerwana pula
+            pass
+    return _plain_batch((texts, max_sentence_words, max_long_words))
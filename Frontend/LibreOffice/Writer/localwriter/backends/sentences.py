@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+sentences.py - Granice zdan w polskim tekscie urzedowym
+=======================================================
+
+Kropka w polskim tekscie prawnym rzadko konczy zdanie: "np.", "m.in.",
+"art. 5 ust. 2", "Dz. U. z 2020 r. poz. 1", daty "12. 03. 2024",
+inicjaly "J. Kowalski". Ten modul znajduje tylko prawdziwe konce zdan,
+zeby dzielenie tekstu (backends/chunking.py) nie ciela zdan w polowie.
+
+REGULY (w kolejnosci):
+1. Kandydat: ".", "!", "?" lub "..." (z ewentualnym zamknieciem cudzyslowu
+   lub nawiasu), po ktorym jest bialy znak lub koniec tekstu
+2. Koniec tekstu - zawsze granica
+3. Nastepne slowo zaczyna sie mala litera - nigdy granica
+4. "!" i "?" - granica
+5. Skrot, po ktorym zdanie nie konczy sie nigdy (ABBREVIATIONS) - nie
+6. Inicjal (jedna wielka litera) - nie
+7. Numer punktu na poczatku wiersza ("1.", "II.", "a.") - nie;
+   liczba, po ktorej jest liczba (data "12. 03.") - nie
+8. Skrot, ktory moze konczyc zdanie (FINAL_ABBREVIATIONS, np. "itd.",
+   "r.") lub skrot z kropkami w srodku ("Dz.U.") - granica tylko przed
+   wielka litera
+9. Pozostale - granica
+
+Czas jest liniowy: jedno przejscie skompilowanego wyrazenia po tekscie,
+a reguly patrza tylko na slowo przed kropka i pierwszy znak po niej.
+last_sentence_end szuka terminatorow od konca okna (str.rfind) i sprawdza
+reguly tylko dla kolejnych kandydatow od konca - dzielenie tekstu oglada
+zwykle jeden lub dwa znaki interpunkcji na chunk.
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import absolute_import
+
+import re
+from typing import Iterator, List
+
+
+# Skroty, po ktorych zdanie sie nie konczy (male litery, bez koncowej kropki)
+ABBREVIATIONS = frozenset("""
+    al art cz dr ds dz dz.u gen godz hab im inż jw k.c k.k k.p k.p.a
+    k.p.c k.r.o kol ks lek lit m.in mec mgr min n.p.m nast np nr o.o ob ok
+    os p.o pkt pl plk płk por pow poz ppkt prof przyp red rozdz s.a sp
+    sygn św tab tel tj tzn tzw ul ust wg ww wyd zał zm zob
+""".split())
+
+# Skroty, ktore czesto stoja na koncu zdania ("...i inne itd. Organ...")
+FINAL_ABBREVIATIONS = frozenset("""
+    ang br etc gr ha itd itp km kg łac m mld mln proc r rr sek tys ub w
+    wyż zł
+""".split())
+
+# Numer rzymski (wyliczenie "II. Przepisy szczegolowe")
+_ROMAN_RE = re.compile(r"[IVXLC]+$")
+
+# Kandydat na koniec zdania:
+#   1: terminator, 2: zamkniecie (cudzyslow, nawias),
+#   3: pierwszy znak po bialych znakach (None na koncu tekstu)
+_CANDIDATE_RE = re.compile(r"([.!?…]+)([\"'”»)\]]*)(?=\s+(\S)|\s*$)")
+_TERMINATORS = ".!?…"
+_CLOSING = "\"'”»)]"
+
+# Do ostatniego bialego znaku (poczatek slowa przed terminatorem)
+_LAST_SPACE_RE = re.compile(r".*\s", re.S)
+
+# Slowo przed terminatorem jest ogladane najwyzej na tyle znakow wstecz
+# (dluzsze "slowa" - adresy, ciagi bez spacji - sa obcinane)
+_CONTEXT = 64
+
+# Znaki otwierajace zdejmowane z poczatku slowa przed porownaniem
+_OPENING = "(\"'[„«"
+
+
+def _is_boundary(text: str, match) -> bool:
+    terminator, closing, following = match.groups()
+
+    if following is None:
+        return True
+    if following.islower():
+        return False
+    if "!" in terminator or "?" in terminator:
+        return True
+    if len(terminator) > 1 or closing:
+        # Wielokropek lub kropka przed cudzyslowem/nawiasem
+        return True
+
+    end = match.start()
+    low = end - _CONTEXT if end > _CONTEXT else 0
+    # Zwykle slowo konczy spacja - rfind; inne biale znaki (nowy wiersz,
+    # tabulator, twarda spacja) sa "niedrukowalne" - wtedy wyrazenie
+    start = text.rfind(" ", low, end) + 1 or low
+    if not text[start:end].isprintable():
+        space = _LAST_SPACE_RE.match(text, low, end)
+        start = space.end() if space else low
+    bare = text[start:end].lstrip(_OPENING)
+    lower = bare.lower()
+    if lower in ABBREVIATIONS:
+        return False
+    if len(bare) == 1 and bare.isupper():
+        return False
+    if (start == 0 or (start > low and text[start - 1] == "\n")) and (
+            bare.isdigit() or _ROMAN_RE.match(bare) or len(bare) == 1):
+        # Numer punktu na poczatku wiersza
+        return False
+    if bare.isdigit():
+        return not following.isdigit()
+    if lower in FINAL_ABBREVIATIONS or ("." in bare and len(bare) <= 8):
+        return following.isupper()
+    if len(bare) == 1 and not following.isupper():
+        return False
+    return True
+
+
+def sentence_ends(text: str) -> Iterator[int]:
+    """
+    Pozycje koncow zdan, rosnaco.
+
+    Pozycja to indeks ostatniego znaku terminatora (lub zamkniecia),
+    po ktorym w tekscie jest bialy znak - jak pozycja kropki we wzorcu
+    ". ". Koniec tekstu bez bialego znaku nie jest zwracany.
+    """
+    length = len(text)
+    for match in _CANDIDATE_RE.finditer(text):
+        position = match.end() - 1
+        if position + 1 < length and _is_boundary(text, match):
+            yield position
+
+
+def last_sentence_end(text: str, start: int, end: int) -> int:
+    """
+    Ostatni koniec zdania w text[start:end] lub -1.
+
+    Zwraca to samo co ostatnia pozycja z sentence_ends(text) spelniajaca
+    start <= pozycja <= end - 2 (terminator i bialy znak mieszcza sie
+    w oknie), ale przeszukuje okno od konca: ostatni terminator (rfind),
+    poczatek jego ciagu, dopasowanie _CANDIDATE_RE i reguly - az do
+    pierwszej granicy.
+    """
+    limit = end - 2
+    length = len(text)
+    high = limit + 1
+    # Kandydat konczacy sie w oknie moze miec terminator przed start
+    # (okno zaczyna sie na zamknieciu cudzyslowu/nawiasu lub tuz za nim)
+    low = start
+    while low > 0 and text[low - 1] in _CLOSING:
+        low -= 1
+    if low > 0 and text[low - 1] in _TERMINATORS:
+        low -= 1
+    while True:
+        # Ostatni terminator przed high: najpierw "." (najczestszy),
+        # pozostale tylko za nim - brakujace "!?…" nie skanuja calego okna
+        found = text.rfind(".", low, high)
+        if found < 0:
+            tail = text[low:high]
+        else:
+            tail = text[found + 1:high]
+        if "!" in tail or "?" in tail or "…" in tail:
+            for c in "!?…":
+                position = text.rfind(c, found + 1 if found >= 0 else low, high)
+                if position > found:
+                    found = position
+        if found < 0:
+            return -1
+        # Poczatek ciagu terminatorow ("...", "?!") - tam zaczyna sie kandydat
+        run = found
+        while run > 0 and text[run - 1] in _TERMINATORS:
+            run -= 1
+        match = _CANDIDATE_RE.match(text, run)
+        if match is not None:
+            position = match.end() - 1
+            if (start <= position <= limit and position + 1 < length
+                    and _is_boundary(text, match)):
+                return position
+        high = run
+
+
+def split_sentences(text: str) -> List[str]:
+    """Dzieli tekst na zdania (przyciete, bez pustych)."""
+    sentences = []
+    start = 0
+    for position in sentence_ends(text):
+        sentences.append(text[start:position + 1].strip())
+        start = position + 1
+    sentences.append(text[start:].strip())
+    return [s for s in sentences if s]
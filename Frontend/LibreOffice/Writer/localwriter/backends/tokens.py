@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+tokens.py - Szacowanie liczby tokenow polskiego tekstu (Bielik)
+===============================================================
+
+Tokenizer Bielika nie jest dostepny w Pythonie wbudowanym w LibreOffice,
+wiec liczbe tokenow szacujemy z cech tekstu, dla ktorych tokenizer
+SentencePiece (slownik 32k nastawiony na polski) zachowuje sie przewidywalnie:
+
+- slowo: czesc stala + czesc proporcjonalna do dlugosci (dlugie slowa
+  rozpadaja sie na kilka tokenow)
+- litery z diakrytykami: czesciej trafiaja do osobnych tokenow
+- cyfry: kazda cyfra to osobny token
+- interpunkcja i znaki nowej linii: zwykle po jednym tokenie
+
+Szacunek jest kalibrowany na biezaco: backend przekazuje do observe()
+faktyczne usage.prompt_tokens z odpowiedzi API, a estymator koryguje
+swoja skale (srednia wykladnicza).
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import absolute_import, division
+
+import math
+import re
+import threading
+from typing import Dict, List
+
+
+# Slowa (same litery), litery spoza ASCII, interpunkcja
+_WORD_RE = re.compile(r"[^\W\d_]+")
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+# Wspolczynniki modelu (dobrane dla polskiego tekstu urzedowego)
+WORD_BASE = 0.5  # Tokeny na slowo niezaleznie od dlugosci
+LETTERS_PER_TOKEN = 6.0  # Dodatkowy token co tyle liter
+NON_ASCII_WEIGHT = 0.1  # Dodatek za kazda litere z diakrytykiem
+MESSAGE_OVERHEAD = 4  # Tokeny szablonu czatu na wiadomosc
+
+# Probkowanie dlugich tekstow przy szacowaniu gestosci
+_SAMPLE_WINDOWS = 16
+_SAMPLE_SIZE = 4096
+
+
+class TokenEstimator:
+    """
+    Szacuje liczbe tokenow tekstu (z kalibracja na podstawie usage z API).
+
+    Bezpieczny watkowo; jedna instancja jest wspoldzielona przez backendy
+    korzystajace z tego samego modelu (get_token_estimator).
+    """
+
+    # Granice skali kalibracji i waga nowej obserwacji
+    MIN_SCALE = 0.5
+    MAX_SCALE = 2.0
+    SMOOTHING = 0.2
+
+    def __init__(self, scale: float = 1.0):
+        self.scale = float(scale)
+        self.observations = 0
+        self._lock = threading.Lock()
+
+    def raw_count(self, text: str) -> float:
+        """Szacunek bez kalibracji (ulamkowy)."""
+        if not text:
+            return 0.0
+        words = _WORD_RE.findall(text)
+        letters = sum(map(len, words))
+        digits = sum(map(text.count, "0123456789"))
+        return (
+            len(words) * WORD_BASE
+            + letters / LETTERS_PER_TOKEN
+            + len(_NON_ASCII_RE.findall(text)) * NON_ASCII_WEIGHT
+            + digits
+            + len(_PUNCT_RE.findall(text))
+            + text.count("\n")
+        )
+
+    def count(self, text: str) -> int:
+        """Szacowana liczba tokenow tekstu."""
+        if not text:
+            return 0
+        return int(math.ceil(self.raw_count(text) * self.scale))
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        """Szacowana liczba tokenow wejscia zapytania czatu."""
+        return sum(
+            self.count(m.get("content") or "") + MESSAGE_OVERHEAD
+            for m in messages
+        )
+
+    def chars_per_token(self, text: str) -> float:
+        """
+        Srednia liczba znakow na token w tekscie.
+
+        Dla dlugich tekstow liczona z rownomiernie rozlozonych probek,
+        wiec koszt nie rosnie z dlugoscia dokumentu.
+        """
+        length = len(text)
+        if length <= _SAMPLE_WINDOWS * _SAMPLE_SIZE:
+            sample = text
+        else:
+            step = length // _SAMPLE_WINDOWS
+            sample = "".join(
+                text[i * step:i * step + _SAMPLE_SIZE]
+                for i in range(_SAMPLE_WINDOWS)
+            )
+        tokens = self.count(sample)
+        if tokens == 0:
+            return 4.0
+        return len(sample) / tokens
+
+    def observe(self, estimated: int, actual: int) -> None:
+        """
+        Koryguje skale na podstawie faktycznej liczby tokenow z API.
+
+        Args:
+            estimated: Szacunek (count_messages) dla wyslanego zapytania
+            actual: usage.prompt_tokens z odpowiedzi
+        """
+        if estimated < 50 or actual <= 0:
+            return
+        with self._lock:
+            ratio = self.scale * actual / estimated
+            scale = (1 - self.SMOOTHING) * self.scale + self.SMOOTHING * ratio
+            self.scale = min(self.MAX_SCALE, max(self.MIN_SCALE, scale))
+            self.observations += 1
+
+
+# Estymatory wspoldzielone przez backendy (po nazwie modelu)
+_estimators: Dict[str, TokenEstimator] = {}
+_estimators_lock = threading.Lock()
+
+
+def get_token_estimator(model: str = "") -> TokenEstimator:
+    """Zwraca wspoldzielony estymator dla modelu."""
+    with _estimators_lock:
+        estimator = _estimators.get(model)
+        if estimator is None:
+            estimator = TokenEstimator()
+            _estimators[model] = estimator
+        return estimator
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+localwriter/background_job.py
+=============================
+
+Zadania w tle dla makr POLONISTA (polonista_menu.py), localwriter
+(localwriter.py) i MainJob (main.py).
+
+Makro uruchomione z menu dziala w watku interfejsu LibreOffice - dopoki
+czeka na siec, caly pakiet biurowy stoi. BackgroundJob przenosi prace
+(zapytania do modelu) do watku roboczego, a makro konczy sie od razu:
+
+- praca (work) dziala w watku roboczym i nie dotyka UNO bezposrednio,
+- operacje na dokumencie ida do watku glownego przez usluge
+  com.sun.star.awt.AsyncCallback: post() bez czekania (kolejnosc
+  zachowana), call() z czekaniem na wynik,
+- postep trafia na pasek stanu okna (XStatusIndicator) z szacowanym
+  czasem do konca z dotychczasowej przepustowosci (estimate_eta).
+
+Poza LibreOffice (bez UNO, np. bench/) post() i call() wywoluja funkcje
+od razu w biezacym watku.
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import threading
+import time
+
+try:
+    import unohelper
+    from com.sun.star.awt import XCallback
+    UNO_AVAILABLE = True
+except ImportError:
+    UNO_AVAILABLE = False
+
+
+# =============================================================================
+# STALE
+# =============================================================================
+
+# Zakres paska postepu XStatusIndicator
+PROGRESS_RANGE = 1000
+
+# Najczesciej co tyle sekund odswiezany jest pasek stanu
+STATUS_INTERVAL = 0.25
+
+
+# =============================================================================
+# CZAS DO KONCA
+# =============================================================================
+
+def estimate_eta(done, total, elapsed):
+    """
+    Szacowany czas do konca w sekundach z dotychczasowej przepustowosci.
+
+    Args:
+        done: Wykonana czesc pracy (np. znaki, komorki)
+        total: Cala praca w tych samych jednostkach
+        elapsed: Czas od startu w sekundach
+
+    Returns:
+        Sekundy albo None, gdy nie ma jeszcze pomiaru
+    """
+    if done <= 0 or elapsed <= 0 or not total:
+        return None
+    rate = done / elapsed
+    return max(0.0, (total - done) / rate)
+
+
+def format_eta(seconds):
+    """Czas do konca dla paska stanu ("ok. 2 min 10 s")."""
+    if seconds is None:
+        return ""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"ok. {seconds} s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"ok. {minutes} min {seconds} s"
+    hours, minutes = divmod(minutes, 60)
+    return f"ok. {hours} h {minutes} min"
+
+
+# =============================================================================
+# ZADANIE W TLE
+# =============================================================================
+
+if UNO_AVAILABLE:
+    class _Callback(unohelper.Base, XCallback):
+        """XCallback dla AsyncCallback - wywoluje funkcje w watku glownym."""
+
+        def __init__(self, function):
+            self.function = function
+
+        def notify(self, data):
+            self.function()
+
+
+# Dokumenty z trwajacym zadaniem (drugie zadanie na tym samym dokumencie
+# pisaloby w te same akapity)
+_running = []
+_running_lock = threading.Lock()
+
+
+def is_running(document):
+    """Czy dla dokumentu trwa juz zadanie w tle."""
+    with _running_lock:
+        return any(d == document for d in _running)
+
+
+class BackgroundJob:
+    """
+    Praca w watku roboczym, dokument i pasek stanu w watku glownym.
+
+    Tworzona i uruchamiana (start) w watku makra, czyli glownym watku
+    LibreOffice.
+
+    Args:
+        ctx: Kontekst komponentu (XSCRIPTCONTEXT.getComponentContext())
+             albo None poza LibreOffice
+        document: Dokument, na ktorym pracuje zadanie (pasek stanu jego
+                  okna, blokada is_running)
+        title: Tekst paska stanu
+    """
+
+    def __init__(self, ctx=None, document=None, title="POLONISTA"):
+        self.document = document
+        self.title = title
+        self.thread = None
+        self.started = None
+        self._main_thread = threading.get_ident()
+        self._last_status = 0.0
+
+        self._async = None
+        if UNO_AVAILABLE and ctx is not None:
+            try:
+                self._async = ctx.getServiceManager().createInstanceWithContext(
+                    "com.sun.star.awt.AsyncCallback", ctx
+                )
+            except Exception:
+                self._async = None
+
+        self._indicator = None
+        if document is not None:
+            try:
+                frame = document.getCurrentController().getFrame()
+                self._indicator = frame.createStatusIndicator()
+            except Exception:
+                self._indicator = None
+
+    # -------------------------------------------------------------------------
+    # Watek glowny
+    # -------------------------------------------------------------------------
+
+    def post(self, function, *args):
+        """Wywoluje function(*args) w watku glownym, bez czekania."""
+        if self._async is None or threading.get_ident() == self._main_thread:
+            function(*args)
+            return
+        self._async.addCallback(_Callback(lambda: function(*args)), None)
+
+    def call(self, function, *args):
+        """Wywoluje function(*args) w watku glownym i zwraca wynik (lub rzuca jego wyjatek)."""
+        if self._async is None or threading.get_ident() == self._main_thread:
+            return function(*args)
+
+        outcome = {}
+        finished = threading.Event()
+
+        def run():
+            try:
+                outcome["result"] = function(*args)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                finished.set()
+
+        self.post(run)
+        finished.wait()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+    # -------------------------------------------------------------------------
+    # Uruchomienie
+    # -------------------------------------------------------------------------
+
+    def start(self, work, on_finish=None):
+        """
+        Uruchamia work(job) w watku roboczym.
+
+        Po zakonczeniu on_finish(result, error) jest wywolywane w watku
+        glownym: result to wynik work, error - wyjatek albo None.
+
+        Returns:
+            False, jesli dla dokumentu trwa juz inne zadanie
+        """
+        with _running_lock:
+            if self.document is not None:
+                if any(d == self.document for d in _running):
+                    return False
+                _running.append(self.document)
+
+        self.started = time.monotonic()
+        if self._indicator is not None:
+            try:
+                self._indicator.start(self.title, PROGRESS_RANGE)
+            except Exception:
+                self._indicator = None
+
+        def run():
+            result = error = None
+            try:
+                result = work(self)
+            except Exception as e:
+                error = e
+            self.post(self._finish, on_finish, result, error)
+
+        self.thread = threading.Thread(target=run, name="POLONISTA-zadanie", daemon=True)
+        self.thread.start()
+        return True
+
+    def _finish(self, on_finish, result, error):
+        if self._indicator is not None:
+            try:
+                self._indicator.end()
+            except Exception:
+                pass
+        with _running_lock:
+            if self.document is not None and self.document in _running:
+                _running.remove(self.document)
+        if on_finish is not None:
+            on_finish(result, error)
+
+    # -------------------------------------------------------------------------
+    # Postep (z dowolnego watku)
+    # -------------------------------------------------------------------------
+
+    def progress(self, done, total, unit=""):
+        """
+        Pokazuje postep i czas do konca na pasku stanu.
+
+        Odswiezenia sa ograniczone do jednego na STATUS_INTERVAL
+        (ostatnie wywolanie z done >= total zawsze przechodzi).
+        """
+        now = time.monotonic()
+        if now - self._last_status < STATUS_INTERVAL and done < total:
+            return
+        self._last_status = now
+
+        elapsed = now - (self.started or now)
+        value = int(PROGRESS_RANGE * min(1.0, done / total)) if total else 0
+        text = f"{self.title}: {done}/{total} {unit}".rstrip() if total else self.title
+        eta = format_eta(estimate_eta(done, total, elapsed))
+        if eta:
+            text += f" - zostalo {eta}"
+        self.post(self._show, value, text)
+
+    def status(self, text):
+        """Pokazuje tekst na pasku stanu (praca bez znanej dlugosci)."""
+        now = time.monotonic()
+        if now - self._last_status < STATUS_INTERVAL:
+            return
+        self._last_status = now
+        self.post(self._show, None, f"{self.title}: {text}")
+
+    def _show(self, value, text):
+        if self._indicator is None:
+            return
+        try:
+            self._indicator.setText(text)
+            if value is not None:
+                self._indicator.setValue(value)
+        except Exception:
+            pass
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+localwriter/bench
+=================
+
+Narzedzia do pomiaru wydajnosci bez prawdziwego API NVIDIA:
+- nim_stub_server.py - lokalny zastepca NIM (opoznienia, 429/5xx, limit RPM)
+- benchmark.py - przepustowosc simplify_long_text, process_paragraphs
+  i petli strumieniowej z main.py
+"""
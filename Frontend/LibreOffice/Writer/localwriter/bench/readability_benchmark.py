@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+readability_benchmark.py - Trafnosc i szybkosc filtra prostego jezyka
+=====================================================================
+
+Mierzy backends/readability.py:
+
+1. Trafnosc na oznaczonym korpusie bench/akapity_pl.txt - najwazniejsze
+   sa falszywe pominiecia (akapit do poprawy uznany za prosty - model
+   by go nie zobaczyl); pominiecia prawdziwie prostych akapitow to zysk
+2. Szybkosc (akapity/s) oceny duzych dokumentow w biezacym procesie
+   i w puli procesow (plain_flags, --processes)
+
+UZYCIE (z katalogu localwriter/):
+    python -m bench.readability_benchmark
+    python -m bench.readability_benchmark --paragraphs 20000,200000 --processes 4 --errors
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import argparse
+import io
+import os
+import sys
+import time
+
+# Katalog localwriter/ na sciezce (import backends)
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from backends.readability import is_plain, plain_flags, score_paragraph
+
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "akapity_pl.txt")
+
+
+def load_corpus(path=CORPUS_PATH):
+    """Lista (akapit, czy_prosty) z oznaczonego korpusu."""
+    samples = []
+    with io.open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            samples.append((line[2:].strip(), line.startswith("+")))
+    return samples
+
+
+def score(samples):
+    """Trafne i falszywe pominiecia oraz lista bledow (akapit, oczekiwane)."""
+    skipped = false_skips = plain = 0
+    errors = []
+    for text, gold in samples:
+        found = is_plain(text)
+        plain += gold
+        skipped += found
+        if found and not gold:
+            false_skips += 1
+        if found != gold:
+            errors.append((text, gold))
+    return {"plain": plain, "skipped": skipped, "false_skips": false_skips,
+            "errors": errors}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark filtra prostego jezyka")
+    parser.add_argument("--paragraphs", default="20000,200000",
+                        help="Liczby akapitow w pomiarze szybkosci")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--errors", action="store_true", help="Wypisz bledne oceny")
+    args = parser.parse_args(argv)
+
+    samples = load_corpus()
+    result = score(samples)
+    print(f"Korpus: {len(samples)} akapitow, {result['plain']} w prostym jezyku")
+    print(f"Pominiete: {result['skipped']} "
+          f"({result['skipped'] / len(samples):.0%}), "
+          f"falszywie pominiete: {result['false_skips']}, "
+          f"bledne oceny: {len(result['errors'])}")
+    if args.errors:
+        for text, gold in result["errors"]:
+            expected = "prosty" if gold else "do poprawy"
+            print(f"    oczekiwano {expected}: {text[:70]} {score_paragraph(text)}")
+
+    print()
+    print("akapity     procesy  s        akapity/s")
+    texts = [text for text, _ in samples]
+    for count_text in args.paragraphs.split(","):
+        count = int(count_text)
+        document = (texts * (count // len(texts) + 1))[:count]
+        for processes in sorted({1, args.processes}):
+            start = time.perf_counter()
+            flags = plain_flags(document, processes=processes)
+            elapsed = time.perf_counter() - start
+            assert len(flags) == count
+            print(f"{count:<11} {processes:<8} {elapsed:<8.2f} "
+                  f"{count / elapsed if elapsed else 0:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+sentence_benchmark.py - Trafnosc i szybkosc wykrywania granic zdan
+==================================================================
+
+Porownuje backends/sentences.sentence_ends z dotychczasowa regula
+(kazde ". ", "! ", "? " to koniec zdania):
+
+1. Trafnosc na oznaczonym korpusie bench/zdania_pl.txt (precyzja, czulosc,
+   F1 oraz liczba falszywych granic - miejsc, w ktorych chunk ucialby
+   zdanie w polowie)
+2. Szybkosc (MB/s) na korpusach od 100 KB do 50 MB - czas ma rosnac
+   liniowo z dlugoscia tekstu
+3. Ciecia w srodku zdania przy dzieleniu korpusu na chunki (chunk_text
+   wzgledem starego _smart_chunk_text)
+
+UZYCIE (z katalogu localwriter/):
+    python -m bench.sentence_benchmark
+    python -m bench.sentence_benchmark --sizes 1M,10M --chunk-size 400 --errors
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import argparse
+import io
+import os
+import sys
+import time
+
+# Katalog localwriter/ na sciezce (import backends)
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from backends.chunking import chunk_text
+from backends.sentences import sentence_ends
+
+try:
+    from bench.chunking_benchmark import legacy_backend_chunk, parse_size
+except ImportError:
+    from chunking_benchmark import legacy_backend_chunk, parse_size
+
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "zdania_pl.txt")
+
+# Znacznik granicy zdania w korpusie
+MARK = " | "
+
+
+# =============================================================================
+# KORPUS
+# =============================================================================
+
+def load_corpus(path=CORPUS_PATH):
+    """
+    Wczytuje korpus.
+
+    Returns:
+        Lista (akapit, zbior pozycji granic) - pozycje jak w sentence_ends
+    """
+    samples = []
+    with io.open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            parts = line.split(MARK)
+            text = " ".join(parts)
+            gold = set()
+            offset = 0
+            for part in parts[:-1]:
+                offset += len(part)
+                gold.add(offset - 1)
+                offset += 1
+            samples.append((text, gold))
+    return samples
+
+
+def naive_sentence_ends(text):
+    """Dotychczasowa regula: kazde ". ", "! ", "? " konczy zdanie."""
+    ends = []
+    for pattern in (". ", "! ", "? "):
+        pos = text.find(pattern)
+        while pos >= 0:
+            ends.append(pos)
+            pos = text.find(pattern, pos + 1)
+    return sorted(ends)
+
+
+def score(samples, detector):
+    """Precyzja, czulosc, F1 i lista bledow (akapit, pozycja, rodzaj)."""
+    tp = fp = fn = 0
+    errors = []
+    for text, gold in samples:
+        found = set(detector(text))
+        tp += len(found & gold)
+        for pos in sorted(found - gold):
+            fp += 1
+            errors.append((text, pos, "falszywa"))
+        for pos in sorted(gold - found):
+            fn += 1
+            errors.append((text, pos, "pominieta"))
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1,
+            "false": fp, "missed": fn, "errors": errors}
+
+
+def make_corpus(samples, size):
+    """Korpus o dlugosci ok. `size` znakow z akapitow oznaczonego korpusu."""
+    paragraphs = [text for text, _ in samples]
+    block = "\n\n".join(paragraphs)
+    repeat = size // (len(block) + 2) + 1
+    return "\n\n".join([block] * repeat)[:size]
+
+
+def mid_sentence_cuts(samples, chunk_size, chunker=chunk_text):
+    """
+    Liczy chunki z korpusu (jeden ciagly akapit), ktore koncza sie
+    w srodku zdania, tj. nie na oznaczonej granicy.
+    """
+    text = ""
+    gold = set()
+    for paragraph, ends in samples:
+        if text:
+            gold.add(len(text) - 1)
+            text += " "
+        gold.update(len(text) + pos for pos in ends)
+        text += paragraph
+
+    cuts = 0
+    chunks = chunker(text, chunk_size)
+    position = 0
+    for chunk in chunks[:-1]:
+        position = text.index(chunk, position) + len(chunk)
+        if position - 1 not in gold:
+            cuts += 1
+    return cuts, len(chunks)
+
+
+# =============================================================================
+# URUCHAMIANIE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark granic zdan")
+    parser.add_argument("--sizes", default="100K,1M,10M,50M")
+    parser.add_argument("--chunk-size", type=int, default=300,
+                        help="Dlugosc chunku przy liczeniu ciec w srodku zdania")
+    parser.add_argument("--errors", action="store_true", help="Wypisz bledy segmentera")
+    args = parser.parse_args(argv)
+
+    samples = load_corpus()
+    gold_total = sum(len(gold) for _, gold in samples)
+    print(f"Korpus: {len(samples)} akapitow, {gold_total} granic zdan")
+    print()
+    print("regula        precyzja  czulosc  F1      falszywe  pominiete")
+    for name, detector in (("stara", naive_sentence_ends), ("sentences", sentence_ends)):
+        result = score(samples, detector)
+        print(f"{name:<13} {result['precision']:<9.3f} {result['recall']:<8.3f} "
+              f"{result['f1']:<7.3f} {result['false']:<9} {result['missed']}")
+        if args.errors and detector is sentence_ends:
+            for text, pos, kind in result["errors"]:
+                print(f"    {kind}: ...{text[max(0, pos - 40):pos + 1]}|{text[pos + 1:pos + 30]}...")
+
+    print()
+    for name, chunker in (("stara", legacy_backend_chunk), ("chunk_text", chunk_text)):
+        cuts, chunks = mid_sentence_cuts(samples, args.chunk_size, chunker)
+        print(f"{name} ({args.chunk_size} zn.): {cuts} z {chunks - 1} ciec w srodku zdania")
+
+    print()
+    print("rozmiar     granice   ms         MB/s    us/KB")
+    for size_text in args.sizes.split(","):
+        text = make_corpus(samples, parse_size(size_text))
+        start = time.perf_counter()
+        count = sum(1 for _ in sentence_ends(text))
+        elapsed = time.perf_counter() - start
+        size_mb = len(text.encode("utf-8")) / 1e6
+        print(f"{size_text:<11} {count:<9} {elapsed * 1000:<10.1f} "
+              f"{size_mb / elapsed if elapsed else 0:<7.1f} "
+              f"{elapsed * 1e6 / (len(text) / 1000.0):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+writer_stub.py - Minimalny model dokumentu Writer bez UNO
+=========================================================
+
+Tyle API dokumentu tekstowego, ile uzywaja makra (writer_document.py,
+polonista_menu.py, localwriter.py), zeby mierzyc je poza LibreOffice:
+
+- doc.getText(): getString/setString, createEnumeration (akapity i tabele),
+  createTextCursorByRange
+- akapit: getString/setString, getStart/getEnd, getText, supportsService,
+  getPropertyValue("ParaStyleName")
+- kursor: gotoRange(zakres, rozszerz), setString
+- doc.getDocumentProperties().getUserDefinedProperties() (odciski)
+- doc.getPropertyValue("CharacterCount")
+- doc.lockControllers/unlockControllers, addActionLock/removeActionLock,
+  doc.getUndoManager() z enterUndoContext/leaveUndoContext
+
+Jak w Writerze "\\n" w setString tworzy nowe akapity (ze stylem akapitu,
+w ktorym zaczyna sie zakres), a setString na calym tekscie usuwa tabele
+i style. Dokument liczy wywolania UNO (doc.calls), kroki cofania
+(doc.undo_steps()) i przeliczenia ukladu (calls["layout"]: zapis przy
+odblokowanym widoku albo odblokowanie po zapisach).
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import absolute_import
+
+from collections import Counter
+
+
+PARAGRAPH_SERVICE = "com.sun.star.text.Paragraph"
+TABLE_SERVICE = "com.sun.star.text.TextTable"
+
+
+class StubPosition:
+    """Pozycja w akapicie (jak getStart()/getEnd())."""
+
+    def __init__(self, paragraph, offset):
+        self.paragraph = paragraph
+        self.offset = offset
+
+
+DEFAULT_STYLE = "Standard"
+
+
+class StubParagraph:
+    def __init__(self, text, owner, style=DEFAULT_STYLE):
+        self._text = text
+        self.owner = owner
+        self.style = style
+
+    def supportsService(self, name):
+        return name == PARAGRAPH_SERVICE
+
+    def getString(self):
+        self.owner.calls["getString"] += 1
+        return self._text
+
+    def setString(self, text):
+        self.owner.calls["setString"] += 1
+        self.owner.replace(StubPosition(self, 0), StubPosition(self, len(self._text)), text)
+
+    def getText(self):
+        return self.owner
+
+    def getPropertyValue(self, name):
+        if name == "ParaStyleName":
+            return self.style
+        raise KeyError(name)
+
+    def getStart(self):
+        return StubPosition(self, 0)
+
+    def getEnd(self):
+        return StubPosition(self, len(self._text))
+
+
+class StubTable:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def supportsService(self, name):
+        return name == TABLE_SERVICE
+
+
+class StubEnumeration:
+    """Enumeracja wezlow z chwili utworzenia (jak w Writerze - nie cofa sie)."""
+
+    def __init__(self, nodes):
+        self._nodes = list(nodes)
+        self._index = 0
+
+    def hasMoreElements(self):
+        return self._index < len(self._nodes)
+
+    def nextElement(self):
+        node = self._nodes[self._index]
+        self._nodes[self._index] = None
+        self._index += 1
+        return node
+
+
+class StubCursor:
+    def __init__(self, owner, position):
+        self.owner = owner
+        self.start = position
+        self.end = position
+
+    def gotoRange(self, position, expand):
+        self.end = position
+        if not expand:
+            self.start = position
+
+    def setString(self, text):
+        self.owner.calls["setString"] += 1
+        self.owner.replace(self.start, self.end, text)
+        self.start = self.end
+
+
+class StubText:
+    """Glowny tekst dokumentu: lista akapitow i tabel."""
+
+    def __init__(self, document):
+        self.document = document
+        self.calls = document.calls
+        self.nodes = []
+
+    def paragraphs(self):
+        return [n for n in self.nodes if isinstance(n, StubParagraph)]
+
+    def getString(self):
+        self.calls["getString"] += 1
+        return "\n".join(p._text for p in self.paragraphs())
+
+    def setString(self, text):
+        self.calls["setString"] += 1
+        self.nodes = [StubParagraph(line, self) for line in text.split("\n")]
+        self.document.modified()
+
+    def createEnumeration(self):
+        self.calls["createEnumeration"] += 1
+        return StubEnumeration(self.nodes)
+
+    def createTextCursorByRange(self, position):
+        self.calls["createTextCursorByRange"] += 1
+        return StubCursor(self, position)
+
+    def replace(self, start, end, text):
+        """Zastepuje tekst od start do end (pozycje w akapitach) napisem."""
+        first = self.nodes.index(start.paragraph)
+        last = self.nodes.index(end.paragraph, first)
+        prefix = start.paragraph._text[:start.offset]
+        suffix = end.paragraph._text[end.offset:]
+        lines = text.split("\n")
+        lines[0] = prefix + lines[0]
+        lines[-1] = lines[-1] + suffix
+
+        start.paragraph._text = lines[0]
+        style = start.paragraph.style
+        added = [StubParagraph(line, self, style) for line in lines[1:]]
+        self.nodes[first + 1:last + 1] = added
+        self.document.modified()
+
+
+class StubUserProperties:
+    def __init__(self):
+        self.values = {}
+
+    def getPropertySetInfo(self):
+        return self
+
+    def hasPropertyByName(self, name):
+        return name in self.values
+
+    def getPropertyValue(self, name):
+        return self.values[name]
+
+    def setPropertyValue(self, name, value):
+        self.values[name] = value
+
+    def addProperty(self, name, attributes, value):
+        self.values[name] = value
+
+
+class StubDocumentProperties:
+    def __init__(self):
+        self.user = StubUserProperties()
+
+    def getUserDefinedProperties(self):
+        return self.user
+
+
+class StubUndoManager:
+    """
+    Krok cofania na zapis, jeden na caly kontekst enterUndoContext.
+
+    Zapisy w kontekscie enterHiddenUndoContext dolaczaja do ostatniego
+    kroku; user_edit i undo udaja uzytkownika miedzy zapisami zadania.
+    """
+
+    def __init__(self):
+        self.titles = []
+        self.depth = 0
+        self.pending = False
+        self.hidden = False
+        self.title = ""
+
+    @property
+    def steps(self):
+        return len(self.titles)
+
+    def enterUndoContext(self, title):
+        if self.depth == 0:
+            self.hidden = False
+            self.title = title
+        self.depth += 1
+
+    def enterHiddenUndoContext(self):
+        if self.depth == 0:
+            if not self.titles:
+                raise RuntimeError("EmptyUndoStackException")
+            self.hidden = True
+        self.depth += 1
+
+    def leaveUndoContext(self):
+        self.depth -= 1
+        if self.depth == 0 and self.pending:
+            if not self.hidden:
+                self.titles.append(self.title)
+            self.pending = False
+
+    def getAllUndoActionTitles(self):
+        return tuple(reversed(self.titles))
+
+    def getCurrentUndoActionTitle(self):
+        if not self.titles:
+            raise RuntimeError("EmptyUndoStackException")
+        return self.titles[-1]
+
+    def record(self, title="Zapis"):
+        if self.depth:
+            self.pending = True
+        else:
+            self.titles.append(title)
+
+    def user_edit(self):
+        self.record("Pisanie")
+
+    def undo(self):
+        if self.titles:
+            self.titles.pop()
+
+
+class StubDocument:
+    """
+    Dokument Writer z akapitami (i opcjonalnie tabelami).
+
+    Args:
+        paragraphs: Teksty akapitow
+        table_every: Co ile akapitow wstawic tabele (0 = bez tabel)
+        styles: Style kolejnych akapitow (domyslnie DEFAULT_STYLE)
+    """
+
+    def __init__(self, paragraphs, table_every=0, styles=None):
+        self.calls = Counter()
+        self.text = StubText(self)
+        self.properties = StubDocumentProperties()
+        self.undo = StubUndoManager()
+        self.locks = 0
+        self.dirty = False
+        for i, paragraph in enumerate(paragraphs):
+            if table_every and i and i % table_every == 0:
+                self.text.nodes.append(StubTable(self.text))
+            style = styles[i] if styles else DEFAULT_STYLE
+            self.text.nodes.append(StubParagraph(paragraph, self.text, style))
+
+    def supportsService(self, name):
+        return name == "com.sun.star.text.TextDocument"
+
+    def getText(self):
+        return self.text
+
+    def getDocumentProperties(self):
+        return self.properties
+
+    def getPropertyValue(self, name):
+        if name == "CharacterCount":
+            return sum(len(p._text) for p in self.text.paragraphs())
+        raise KeyError(name)
+
+    def getUndoManager(self):
+        return self.undo
+
+    def lockControllers(self):
+        self.calls["lockControllers"] += 1
+        self.locks += 1
+
+    def unlockControllers(self):
+        self.calls["unlockControllers"] += 1
+        self.locks -= 1
+        if not self.locks and self.dirty:
+            self.calls["layout"] += 1
+            self.dirty = False
+
+    def addActionLock(self):
+        self.calls["addActionLock"] += 1
+
+    def removeActionLock(self):
+        self.calls["removeActionLock"] += 1
+
+    def modified(self):
+        """Zapis: krok cofania i przeliczenie ukladu (od razu albo po odblokowaniu)."""
+        self.undo.record()
+        if self.locks:
+            self.dirty = True
+        else:
+            self.calls["layout"] += 1
+
+    def undo_steps(self):
+        return self.undo.steps
+
+    def styles(self):
+        return [p.style for p in self.text.paragraphs()]
+
+    def tables(self):
+        return sum(1 for n in self.text.nodes if isinstance(n, StubTable))
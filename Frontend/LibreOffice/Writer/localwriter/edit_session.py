@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+localwriter/edit_session.py
+===========================
+
+Sesja edycji zbiorczej dla makr POLONISTA (polonista_menu.py), localwriter
+(localwriter.py) i MainJob (main.py).
+
+Kazdy setString() na dokumencie to osobny krok cofania i osobne
+przeliczenie ukladu strony. Dlugi wynik zapisywany akapit po akapicie
+albo strumieniowany fragmentami zostawial tysiace krokow w Edycja >
+Cofnij i tyle samo przeliczen ukladu. EditSession:
+
+- otwiera jeden kontekst cofania (XUndoManager.enterUndoContext) na cale
+  zadanie - uzytkownik cofa wynik jednym krokiem; w zadaniu w tle
+  (undo_per_burst) kontekst obejmuje tylko jeden burst, bo dokument jest
+  w tym czasie edytowalny i zmiany uzytkownika trafilyby do kroku zadania;
+  kolejne bursty dolaczaja do kroku zadania (enterHiddenUndoContext),
+  dopoki jest on ostatni na stosie cofania - edycja lub cofniecie
+  uzytkownika miedzy burstami zaczyna nowy krok,
+- na czas zapisu (burst) blokuje kontrolery i akcje dokumentu
+  (lockControllers, addActionLock) - uklad jest przeliczany raz po
+  odblokowaniu, a nie po kazdym zapisie,
+- co flush_writes zapisow w jednym burst odblokowuje dokument na chwile
+  (punkt odswiezenia), zeby dlugi zapis nie zamrozil widoku.
+
+Wszystkie metody wywoluje sie w watku glownym LibreOffice (w zadaniu
+w tle - przez BackgroundJob.call/post). Dokument bez tych interfejsow
+(np. bench/writer_stub.py bez nich) jest obslugiwany bez blokad.
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import print_function, absolute_import
+
+from contextlib import contextmanager
+
+
+class EditSession:
+    """
+    Jeden krok cofania i zablokowany widok dla zapisow jednego zadania.
+
+    Uzycie:
+        with EditSession(doc, "POLONISTA") as session:
+            with session.burst():
+                for paragraph, text in zmiany:
+                    paragraph.setString(text)
+                    session.wrote()
+
+    Args:
+        document: Dokument (Writer lub Calc)
+        title: Nazwa kroku w Edycja > Cofnij
+        flush_writes: Po tylu zapisach w jednym burst dokument jest na
+                      chwile odblokowywany (0 = dopiero na koncu burst)
+        undo_per_burst: Kontekst cofania na kazdy burst zamiast na cala
+                        sesje (zadania w tle - miedzy zapisami uzytkownik
+                        moze edytowac dokument); bursty nadal skladaja sie
+                        na jeden krok, dopoki uzytkownik nie zmieni stosu
+                        cofania
+    """
+
+    def __init__(self, document, title="POLONISTA", flush_writes=0, undo_per_burst=False):
+        self.document = document
+        self.title = title
+        self.flush_writes = max(0, int(flush_writes or 0))
+        self.undo_per_burst = undo_per_burst
+        self.undo_manager = None
+        self.opened = False
+        self.locked = False
+        self.writes = 0
+        self.flushes = 0
+        # Stan stosu cofania po ostatnim burst z krokiem zadania (None - brak)
+        self._step = None
+        self._entered = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    # -------------------------------------------------------------------------
+    # Kontekst cofania
+    # -------------------------------------------------------------------------
+
+    def open(self):
+        """Otwiera kontekst cofania sesji (raz; z undo_per_burst - nic)."""
+        if self.opened:
+            return
+        self.opened = True
+        if not self.undo_per_burst:
+            self.enter_undo()
+
+    def close(self):
+        """Odblokowuje dokument i zamyka kontekst cofania."""
+        self.unlock()
+        self.leave_undo()
+
+    def enter_undo(self):
+        if self.undo_manager is not None:
+            return
+        try:
+            manager = self.document.getUndoManager()
+            self._entered = _undo_state(manager)
+            if self._step is not None and self._entered == self._step:
+                # Krok zadania nadal ostatni - burst dopisuje sie do niego
+                try:
+                    manager.enterHiddenUndoContext()
+                    self.undo_manager = manager
+                    return
+                except Exception:
+                    pass
+            manager.enterUndoContext(self.title)
+            self.undo_manager = manager
+        except Exception:
+            self.undo_manager = None
+
+    def leave_undo(self):
+        if self.undo_manager is None:
+            return
+        try:
+            self.undo_manager.leaveUndoContext()
+        except Exception:
+            pass
+        if self.undo_per_burst:
+            # Pusty kontekst nie zostawia kroku - stan stosu bez zmian
+            state = _undo_state(self.undo_manager)
+            if state is not None and state != self._entered and state[1] == self.title:
+                self._step = state
+            elif state != self._step:
+                self._step = None
+        self.undo_manager = None
+
+    # -------------------------------------------------------------------------
+    # Blokada widoku
+    # -------------------------------------------------------------------------
+
+    def lock(self):
+        """Blokuje kontrolery i akcje dokumentu (bez przeliczania ukladu)."""
+        if self.locked:
+            return
+        self.locked = True
+        self.writes = 0
+        try:
+            self.document.lockControllers()
+        except Exception:
+            pass
+        try:
+            self.document.addActionLock()
+        except Exception:
+            pass
+
+    def unlock(self):
+        """Zdejmuje blokady - dokument przelicza uklad i odswieza widok."""
+        if not self.locked:
+            return
+        self.locked = False
+        try:
+            self.document.removeActionLock()
+        except Exception:
+            pass
+        try:
+            self.document.unlockControllers()
+        except Exception:
+            pass
+        self.flushes += 1
+
+    def wrote(self, count=1):
+        """Liczy zapisy; po flush_writes zapisach odblokowuje dokument na chwile."""
+        self.writes += count
+        if self.locked and self.flush_writes and self.writes >= self.flush_writes:
+            self.unlock()
+            self.lock()
+
+    @contextmanager
+    def burst(self):
+        """Zapisy wewnatrz bloku with ida przy zablokowanym widoku."""
+        if self.undo_per_burst:
+            self.enter_undo()
+        self.lock()
+        try:
+            yield self
+        finally:
+            self.unlock()
+            if self.undo_per_burst:
+                self.leave_undo()
+
+    def apply(self, function, *args):
+        """Wywoluje function(*args) w jednym burst i zwraca wynik."""
+        with self.burst():
+            return function(*args)
+
+
+def _undo_state(manager):
+    """(liczba krokow, tytul ostatniego) stosu cofania albo None."""
+    try:
+        titles = manager.getAllUndoActionTitles()
+    except Exception:
+        return None
+    return (len(titles), titles[0] if titles else None)
@@ -43,6 +43,30 @@ except ImportError:
     BACKEND_AVAILABLE = False
     NvidiaNimBackend = None
 
+# Silnik dzielenia tekstu (wspolny z backendem)
+try:
+    from backends.chunking import chunk_text
+except ImportError:
+    from .backends.chunking import chunk_text
+
+# Operacje na akapitach (tryb przyrostowy)
+try:
+    import writer_document
+except ImportError:
+    writer_document = None
+
+# Zadania w tle (praca poza watkiem interfejsu)
+try:
+    import background_job
+except ImportError:
+    background_job = None
+
+# Sesja edycji (jeden krok cofania, zablokowany widok przy zapisie)
+try:
+    import edit_session
+except ImportError:
+    edit_session = None
+
 
 # =============================================================================
 # WERSJA I STALE
@@ -121,75 +145,7 @@ def smart_chunk_text(text, max_chunk_size=3000):
     if len(text) <= max_chunk_size:
         return [text]
     
-    chunks = []
-    current_pos = 0
-    
-    while current_pos < len(text):
-        # Okresl koniec potencjalnego chunka
-        end_pos = min(current_pos + max_chunk_size, len(text))
-        
-        # Jesli to ostatni fragment
-        if end_pos >= len(text):
-            chunk = text[current_pos:].strip()
-            if chunk:
-                chunks.append(chunk)
-            break
-        
-        # Znajdz najlepszy punkt podzialu
-        chunk_text = text[current_pos:end_pos]
-        best_split = -1
-        
-        # Priorytet 1: Podwojny enter (koniec akapitu)
-        split_pos = chunk_text.rfind("\n\n")
-        if split_pos > max_chunk_size * 0.3:
-            best_split = split_pos
-            separator_len = 2
-        
-        # Priorytet 2: Pojedynczy enter
-        if best_split == -1:
-            split_pos = chunk_text.rfind("\n")
-            if split_pos > max_chunk_size * 0.5:
-                best_split = split_pos
-                separator_len = 1
-        
-        # Priorytet 3: Koniec zdania
-        if best_split == -1:
-            # Szukaj od konca: . ! ?
-            for punct in [". ", "! ", "? ", ".\n", "!\n", "?\n"]:
-                split_pos = chunk_text.rfind(punct)
-                if split_pos > max_chunk_size * 0.5:
-                    best_split = split_pos + 1  # Wlacz znak interpunkcji
-                    separator_len = 1
-                    break
-        
-        # Priorytet 4: Przecinek lub srednik
-        if best_split == -1:
-            for punct in [", ", "; ", ",\n", ";\n"]:
-                split_pos = chunk_text.rfind(punct)
-                if split_pos > max_chunk_size * 0.5:
-                    best_split = split_pos + 1
-                    separator_len = 1
-                    break
-        
-        # Priorytet 5: Spacja (ostatecznosc)
-        if best_split == -1:
-            split_pos = chunk_text.rfind(" ")
-            if split_pos > 0:
-                best_split = split_pos
-                separator_len = 1
-            else:
-                # Twardy podzial
-                best_split = max_chunk_size
-                separator_len = 0
-        
-        # Dodaj chunk
-        chunk = text[current_pos:current_pos + best_split].strip()
-        if chunk:
-            chunks.append(chunk)
-        
-        current_pos = current_pos + best_split + separator_len
-    
-    return chunks
+    return chunk_text(text, max_chunk_size)
 
 
 def process_document_text(full_text, backend=None, progress_callback=None):
@@ -442,6 +398,57 @@ def SimplifyDocument(*args):
             show_error_dialog("To nie jest dokument Writer")
             return
         
+        if not BACKEND_AVAILABLE:
+            show_error_dialog("Backend nie jest dostepny")
+            return
+        
+        backend = get_backend()
+        
+        # Akapity czytane i zapisywane grupami; juz uproszczone sa pomijane
+        if writer_document is not None:
+            known = writer_document.load_fingerprints(doc)
+            
+            def finished(result, error):
+                if error is not None:
+                    show_error_dialog(f"Nieoczekiwany blad:\n{type(error).__name__}: {error}")
+                    return
+                success, summary = result
+                if not (summary["changed"] or summary["skipped"] or summary["plain"] or summary["stale"]
+                        or summary["failed"]):
+                    show_error_dialog("Dokument jest pusty")
+                elif not success or summary["stale"]:
+                    show_error_dialog(writer_document.format_summary(summary))
+            
+            def session(background):
+                # Krok cofania na zadanie (w tle - kontekst na partie zapisow)
+                if edit_session is None:
+                    return None
+                return edit_session.EditSession(
+                    doc, "localwriter", backend.config.get("edit_flush_writes", 0), background
+                )
+            
+            if background_job is None:
+                finished(writer_document.simplify_document_streaming(
+                    doc, backend, known, session=session(False)
+                ), None)
+                return
+            
+            # Zapytania w watku roboczym, postep na pasku stanu dokumentu
+            job = background_job.BackgroundJob(ctx, doc, "localwriter")
+            char_count = writer_document.document_char_count(doc) or 0
+            summary = {}
+            
+            def work(job):
+                def progress(done, submitted, result):
+                    job.progress(summary["chars"], char_count, "znakow")
+                return writer_document.simplify_document_streaming(
+                    doc, backend, known, progress, job.call, summary, session(True)
+                )
+            
+            if not job.start(work, finished):
+                show_error_dialog("Ten dokument jest juz upraszczany")
+            return
+        
         text = doc.getText()
         full_text = text.getString()
         
@@ -449,11 +456,6 @@ def SimplifyDocument(*args):
             show_error_dialog("Dokument jest pusty")
             return
         
-        if not BACKEND_AVAILABLE:
-            show_error_dialog("Backend nie jest dostepny")
-            return
-        
-        backend = get_backend()
         success, result = backend.simplify_long_text(full_text)
         
         if success:
@@ -10,10 +10,39 @@ import uno
 import os 
 import logging
 import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from com.sun.star.beans import PropertyValue
 from com.sun.star.container import XNamed
 
+# Shared modules next to this file: packing of short Calc cells (POLONISTA
+# backend), background jobs and bulk-edit sessions
+try:
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+except:
+    pass
+
+try:
+    from backends.packing import PACK_MARKER, can_pack, format_pack, pack_units, packing_prompt, parse_pack
+    PACKING_AVAILABLE = True
+except ImportError:
+    PACKING_AVAILABLE = False
+
+try:
+    import background_job
+except ImportError:
+    background_job = None
+
+try:
+    import edit_session
+except ImportError:
+    edit_session = None
+
 
 def log_to_file(message):
     # Get the user's home directory
@@ -29,6 +58,181 @@ def log_to_file(message):
     logging.info(message)
 
 
+class ConfigFile:
+    """localwriter.json, parsed once and re-read only when the file changes.
+
+    get() compares the file's mtime and size with the ones the cached copy
+    was parsed from, so a Calc run over thousands of cells costs one stat()
+    per lookup instead of an open() and a json.load(). Edits made by hand
+    while LibreOffice runs are still picked up on the next lookup.
+
+    set() writes through atomically: the new content goes to a temporary
+    file in the same directory, which then replaces localwriter.json with
+    os.replace, so a reader never sees a half-written file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {}
+        self.stamp = None
+        self.reads = 0
+
+    def file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self):
+        # Must be called with the lock held
+        stamp = self.file_stamp()
+        if stamp != self.stamp:
+            self.stamp = stamp
+            self.data = {}
+            if stamp is not None:
+                self.reads += 1
+                try:
+                    with open(self.path, 'r') as file:
+                        data = json.load(file)
+                    if isinstance(data, dict):
+                        self.data = data
+                except (IOError, ValueError):
+                    pass
+        return self.data
+
+    def get(self, key, default):
+        with self.lock:
+            return self.load().get(key, default)
+
+    def set(self, key, value):
+        with self.lock:
+            # Start from the file as it is now, not from a stale copy
+            data = dict(self.load())
+            data[key] = value
+            directory = os.path.dirname(self.path) or "."
+            try:
+                fd, temp_path = tempfile.mkstemp(prefix=".localwriter.", suffix=".tmp", dir=directory)
+                try:
+                    with os.fdopen(fd, 'w') as file:
+                        json.dump(data, file, indent=4)
+                        file.flush()
+                        os.fsync(file.fileno())
+                    if self.stamp is not None:
+                        # mkstemp creates the file private; keep the old permissions
+                        os.chmod(temp_path, os.stat(self.path).st_mode & 0o7777)
+                    os.replace(temp_path, self.path)
+                except BaseException:
+                    os.unlink(temp_path)
+                    raise
+            except (IOError, OSError) as e:
+                print(f"Error writing to {self.path}: {e}")
+                return
+            self.data = data
+            self.stamp = self.file_stamp()
+
+
+# One ConfigFile per process: PathSettings is asked for the directory once
+_config_file = None
+_config_lock = threading.Lock()
+
+
+class StreamSink:
+    """Appends streamed tokens to a Writer text range or a Calc cell.
+
+    getString() + setString() per token rewrites everything generated so
+    far, so a long answer costs O(n^2). The sink keeps a text cursor at the
+    end of the target (Calc cells are XText too) and inserts text there,
+    which costs the same for the first and the last token. Targets without
+    a text cursor fall back to a local buffer.
+
+    Tokens are coalesced: the document is written and the UI repainted at
+    most every flush_ms milliseconds, or sooner once flush_chars characters
+    are waiting (flush_ms=0 writes every token). close() writes the rest
+    and returns stats() - tokens, tokens/sec and flushes for tuning.
+
+    With dispatch (BackgroundJob.post) the sink can be fed from a worker
+    thread: each flush is handed to the main thread, in order, and the UI
+    needs no processEventsToIdle.
+    """
+
+    def __init__(self, target, toolkit=None, replace=False, flush_ms=50, flush_chars=200,
+                 dispatch=None):
+        self.target = target
+        self.toolkit = toolkit
+        self.dispatch = dispatch
+        self.flush_ms = flush_ms
+        self.flush_chars = flush_chars
+        if replace:
+            target.setString("")
+        try:
+            self.text = target.getText()
+            self.cursor = self.text.createTextCursorByRange(target.getEnd())
+            self.buffer = None
+        except Exception:
+            self.text = self.cursor = None
+            self.buffer = [target.getString()]
+        self.pending = []
+        self.pending_chars = 0
+        self.tokens = 0
+        self.chars = 0
+        self.flushes = 0
+        self.first_token = self.last_token = None
+        self.last_flush = time.monotonic()
+
+    def write(self, token):
+        if not token:
+            return
+        now = time.monotonic()
+        if self.first_token is None:
+            self.first_token = now
+        self.last_token = now
+        self.tokens += 1
+        self.pending.append(token)
+        self.pending_chars += len(token)
+        if (self.flush_chars and self.pending_chars >= self.flush_chars) \
+                or (now - self.last_flush) * 1000 >= self.flush_ms:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        text = "".join(self.pending)
+        self.pending = []
+        self.pending_chars = 0
+        if self.dispatch is not None:
+            self.dispatch(self.insert, text)
+        else:
+            self.insert(text)
+            if self.toolkit is not None:
+                self.toolkit.processEventsToIdle()   # let the UI catch up
+        self.chars += len(text)
+        self.flushes += 1
+        self.last_flush = time.monotonic()
+
+    def insert(self, text):
+        if self.cursor is not None:
+            # The cursor moves past the inserted text, ready for the next flush
+            self.text.insertString(self.cursor, text, False)
+        else:
+            self.buffer.append(text)
+            self.target.setString("".join(self.buffer))
+
+    def close(self):
+        self.flush()
+        return self.stats()
+
+    def stats(self):
+        elapsed = (self.last_token - self.first_token) if self.tokens > 1 else 0.0
+        return {
+            "tokens": self.tokens,
+            "chars": self.chars,
+            "flushes": self.flushes,
+            "tokens_per_sec": round((self.tokens - 1) / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+
 # The MainJob is a UNO component derived from unohelper.Base class
 # and also the XJobExecutor, the implemented interface
 class MainJob(unohelper.Base, XJobExecutor):
@@ -45,68 +249,27 @@ class MainJob(unohelper.Base, XJobExecutor):
                 "com.sun.star.frame.Desktop", self.ctx)
     
 
-    def get_config(self,key,default):
-  
-        name_file ="localwriter.json"
-        #path_settings = create_instance('com.sun.star.util.PathSettings')
-        
-        
-        path_settings = self.sm.createInstanceWithContext('com.sun.star.util.PathSettings', self.ctx)
-
-        user_config_path = getattr(path_settings, "UserConfig")
+    def config_file(self):
+        # localwriter.json in the LibreOffice user profile, resolved through
+        # PathSettings on the first call and shared by every MainJob after that
+        global _config_file
+        with _config_lock:
+            if _config_file is None:
+                path_settings = self.sm.createInstanceWithContext('com.sun.star.util.PathSettings', self.ctx)
+                user_config_path = getattr(path_settings, "UserConfig")
 
-        if user_config_path.startswith('file://'):
-            user_config_path = str(uno.fileUrlToSystemPath(user_config_path))
-        
-        # Ensure the path ends with the filename
-        config_file_path = os.path.join(user_config_path, name_file)
+                if user_config_path.startswith('file://'):
+                    user_config_path = str(uno.fileUrlToSystemPath(user_config_path))
 
-        # Check if the file exists
-        if not os.path.exists(config_file_path):
-            return default
-
-        # Try to load the JSON content from the file
-        try:
-            with open(config_file_path, 'r') as file:
-                config_data = json.load(file)
-        except (IOError, json.JSONDecodeError):
-            return default
+                _config_file = ConfigFile(os.path.join(user_config_path, "localwriter.json"))
+            return _config_file
 
-        # Return the value corresponding to the key, or the default value if the key is not found
-        return config_data.get(key, default)
+    def get_config(self, key, default):
+        # Return the value for the key, or the default if the file or the key is missing
+        return self.config_file().get(key, default)
 
     def set_config(self, key, value):
-        name_file = "localwriter.json"
-        
-        path_settings = self.sm.createInstanceWithContext('com.sun.star.util.PathSettings', self.ctx)
-        user_config_path = getattr(path_settings, "UserConfig")
-
-        if user_config_path.startswith('file://'):
-            user_config_path = str(uno.fileUrlToSystemPath(user_config_path))
-
-        # Ensure the path ends with the filename
-        config_file_path = os.path.join(user_config_path, name_file)
-
-        # Load existing configuration if the file exists
-        if os.path.exists(config_file_path):
-            try:
-                with open(config_file_path, 'r') as file:
-                    config_data = json.load(file)
-            except (IOError, json.JSONDecodeError):
-                config_data = {}
-        else:
-            config_data = {}
-
-        # Update the configuration with the new key-value pair
-        config_data[key] = value
-
-        # Write the updated configuration back to the file
-        try:
-            with open(config_file_path, 'w') as file:
-                json.dump(config_data, file, indent=4)
-        except IOError as e:
-            # Handle potential IO errors (optional)
-            print(f"Error writing to {config_file_path}: {e}")
+        self.config_file().set(key, value)
 
 
     #retrieved from https://wiki.documentfoundation.org/Macros/General/IO_to_Screen
@@ -297,10 +460,265 @@ class MainJob(unohelper.Base, XJobExecutor):
         return result
     #end sharealike section 
 
+    def stream_sink(self, target, toolkit, replace=False):
+        # Streaming sink with the refresh rate from localwriter.json
+        return StreamSink(target, toolkit, replace,
+                          flush_ms=self.get_config("stream_flush_ms", 50),
+                          flush_chars=self.get_config("stream_flush_chars", 200))
+
+    def bulk_session(self, document, background=False):
+        # One undo step for all writes of a job, with the controllers locked
+        # while a batch of writes is applied (None without edit_session.py).
+        # A background job leaves the document editable, so its undo context
+        # covers one batch of writes at a time and never the user's own
+        # typing; the batches still join one undo step until the user edits
+        # or undoes in between
+        if edit_session is None or document is None:
+            return None
+        return edit_session.EditSession(document, "localwriter",
+                                        self.get_config("edit_flush_writes", 100), background)
+
+    def stream_completion(self, request, sink, log_stats=False, job=None):
+        # Send the request and append each streamed token through the sink;
+        # no UNO calls here except through the sink (see stream_in_background)
+        try:
+            with urllib.request.urlopen(request) as response:
+                for line in response:
+                    try:
+                        if line.strip():  # skip empty keep-alive lines
+                            if line.startswith(b"data: "):
+                                payload = line[len(b"data: "):].decode("utf-8")
+                                chunk = json.loads(payload)
+                                if chunk["choices"][0]["finish_reason"] != None:
+                                    break
+                                sink.write(str(chunk["choices"][0]["text"]))
+                                if job is not None:
+                                    job.status("%d tokens" % sink.tokens)
+                    except Exception as e:
+                        # ignore parse errors, but show them in the document
+                        sink.write(str(e))
+        finally:
+            stats = sink.close()
+            if log_stats:
+                log_to_file("stream: %(tokens)d tokens, %(tokens_per_sec)s tokens/s, "
+                            "%(flushes)d flushes" % stats)
+        return stats
+
+    def stream_in_background(self, document, request, target, replace=False):
+        # Stream the answer on a worker thread so LibreOffice stays responsive;
+        # the sink writes through the main thread. Errors are appended to the
+        # target, like in the synchronous loops
+        toolkit = self.ctx.getServiceManager().createInstanceWithContext(
+            "com.sun.star.awt.Toolkit", self.ctx
+        )
+        log_stats = self.get_config("log_stream_stats", False)
+        if background_job is not None and background_job.is_running(document):
+            raise RuntimeError("another localwriter job is still running in this document")
+
+        if background_job is None:
+            # Clearing the selection and every flush undo as one step
+            session = self.bulk_session(document)
+            if session is not None:
+                session.open()
+            try:
+                self.stream_completion(request, self.stream_sink(target, toolkit, replace), log_stats)
+            finally:
+                if session is not None:
+                    session.close()
+            return
+
+        # Each write on the main thread is one batch of the job's undo step
+        # (see bulk_session)
+        session = self.bulk_session(document, background=True)
+
+        def write(function, *args):
+            if session is None:
+                return function(*args)
+            return session.apply(function, *args)
+
+        def work(job):
+            # The selection is cleared only once the job has started
+            sink = job.call(write, self.stream_sink, target, toolkit, replace)
+            sink.dispatch = lambda function, *args: job.post(write, function, *args)
+            return self.stream_completion(request, sink, log_stats, job)
+
+        def finished(stats, error):
+            if error is not None:
+                write(target.setString, target.getString() + ": " + str(error))
+
+        job = background_job.BackgroundJob(self.ctx, document, "localwriter")
+        if not job.start(work, finished):
+            raise RuntimeError("another localwriter job is still running in this document")
+
+    def calc_settings(self, args, user_input=""):
+        # Everything the Calc requests need from localwriter.json, read once
+        # on the main thread (the first get_config goes through UNO)
+        return {
+            "args": args,
+            "user_input": user_input,
+            "url": self.get_config("endpoint", "http://127.0.0.1:5000") + "/v1/completions",
+            "model": self.get_config("model", ""),
+            "extend_system_prompt": self.get_config("extend_selection_system_prompt", ""),
+            "extend_max_tokens": self.get_config("extend_selection_max_tokens", 70),
+            "edit_system_prompt": self.get_config("edit_selection_system_prompt", ""),
+            "edit_max_new_tokens": self.get_config("edit_selection_max_new_tokens", 0),
+            "max_concurrency": self.get_config("calc_max_concurrency", 4),
+            "pack_chars": self.get_config("calc_pack_chars", 1500),
+            "pack_max_cells": self.get_config("calc_pack_max_cells", 20),
+        }
+
+    def calc_prompt(self, settings, text, count=1):
+        # Prompt and max_tokens for one cell, or for `count` cells packed into
+        # `text` with format_pack (EditSelection only)
+        if settings["args"] == "ExtendSelection":
+            prompt = text
+            if settings["extend_system_prompt"] != "":
+                prompt = "SYSTEM PROMPT\n" + settings["extend_system_prompt"] + "\nEND SYSTEM PROMPT\n" + text
+            return prompt, settings["extend_max_tokens"]
+
+        if count > 1:
+            instructions = packing_prompt("USER INSTRUCTIONS: \n" + settings["user_input"], count)
+            prompt = "ORIGINAL VERSION:\n" + text + "\n Below is an edited version according to the following instructions. Don't waste time thinking, be as fast as you can. There are no comments in the edited version. " + instructions + "\nEDITED VERSION:\n"
+        else:
+            prompt = "ORIGINAL VERSION:\n" + text + "\n Below is an edited version according to the following instructions. Don't waste time thinking, be as fast as you can. The edited text does not end with a newline. There are no comments in the edited version. USER INSTRUCTIONS: \n" + settings["user_input"] + "\nEDITED VERSION:\n"
+
+        if settings["edit_system_prompt"] != "":
+            prompt = "SYSTEM PROMPT\n" + settings["edit_system_prompt"] + "\nEND SYSTEM PROMPT\n" + prompt
+        # this is a bit hacky, it's actually number of characters + max new tokens (see EditSelection)
+        return prompt, len(text) + settings["edit_max_new_tokens"]
+
+    def completion(self, settings, prompt, max_tokens):
+        # One blocking /v1/completions request; no UNO calls, so it is safe in worker threads
+        data = {
+            'prompt': prompt,
+            'max_tokens': max_tokens,
+            'temperature': 1,
+            'top_p': 0.9,
+            'seed': 10,
+        }
+        if settings["model"] != "":
+            data["model"] = settings["model"]
+        request = urllib.request.Request(settings["url"], data=json.dumps(data).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'}, method='POST')
+        with urllib.request.urlopen(request) as response:
+            return str(json.loads(response.read().decode("utf-8"))["choices"][0]["text"])
+
+    def calc_job(self, settings, texts):
+        # New values for a group of cells. Several cells go in one packed
+        # request; cells missing from the packed answer are sent one by one
+        results = [None] * len(texts)
+        if len(texts) > 1:
+            try:
+                prompt, max_tokens = self.calc_prompt(settings, format_pack(texts), len(texts))
+                results = parse_pack(self.completion(settings, prompt, max_tokens), len(texts))
+            except Exception:
+                pass
+        for i, text in enumerate(texts):
+            if results[i] is not None:
+                continue
+            try:
+                prompt, max_tokens = self.calc_prompt(settings, text)
+                answer = self.completion(settings, prompt, max_tokens)
+                results[i] = text + answer if settings["args"] == "ExtendSelection" else answer
+            except Exception as e:
+                results[i] = text + ": " + str(e)
+        return results
+
+    def calc_bulk(self, selection, settings, document=None):
+        # Bulk mode for a Calc range: one getDataArray, the text cells through
+        # a bounded pool of requests on a worker thread, one setDataArray back
+        # on the main thread. Returns False when the range has fewer than two
+        # text cells (the streaming loop handles those)
+        data = selection.getDataArray()
+        formulas = selection.getFormulaArray()
+
+        # Text cells only: numbers come back as floats, empty cells as "",
+        # formula results are recognised by the formula array
+        cells = [
+            (row, col, value)
+            for row, values in enumerate(data)
+            for col, value in enumerate(values)
+            if isinstance(value, str) and value.strip() and not formulas[row][col].startswith("=")
+        ]
+        if len(cells) < 2:
+            return False
+        texts = [value for _, _, value in cells]
+        session = self.bulk_session(document)
+
+        groups = [[i] for i in range(len(texts))]
+        if settings["args"] == "EditSelection" and PACKING_AVAILABLE and settings["pack_max_cells"] > 1:
+            packable = [i for i, text in enumerate(texts) if can_pack(text)]
+            packs = pack_units([len(texts[i]) for i in packable], settings["pack_chars"],
+                               settings["pack_max_cells"], marker_size=len(PACK_MARKER))
+            groups = [[packable[j] for j in pack] for pack in packs]
+            groups += [[i] for i, text in enumerate(texts) if not can_pack(text)]
+
+        def work(job):
+            results = list(texts)
+            done = 0
+            with ThreadPoolExecutor(max_workers=max(1, settings["max_concurrency"])) as executor:
+                pending = {
+                    executor.submit(self.calc_job, settings, [texts[i] for i in group]): group
+                    for group in groups
+                }
+                for future in as_completed(pending):
+                    group = pending[future]
+                    for i, text in zip(group, future.result()):
+                        results[i] = text
+                    done += len(group)
+                    if job is not None:
+                        job.progress(done, len(texts), "cells")
+            return results
+
+        def write(results):
+            # The range stays editable during the job: only cells that still
+            # hold their original text are replaced
+            current = selection.getDataArray()
+            formulas = selection.getFormulaArray()
+            updates = [
+                (row, col, text)
+                for (row, col, value), text in zip(cells, results)
+                if text != value and current[row][col] == value
+            ]
+            if any(formula.startswith("=") for values in formulas for formula in values):
+                # setDataArray would replace the formulas with their values
+                for row, col, text in updates:
+                    selection.getCellByPosition(col, row).setString(text)
+                    if session is not None:
+                        session.wrote()
+            elif updates:
+                values = [list(row) for row in current]
+                for row, col, text in updates:
+                    values[row][col] = text
+                selection.setDataArray(tuple(tuple(row) for row in values))
+
+        def finished(results, error):
+            if error is not None:
+                # Appended to the first text cell, like the Writer paths do
+                row, col, _ = cells[0]
+                cell = selection.getCellByPosition(col, row)
+                cell.setString(cell.getString() + ": " + str(error))
+                return
+            # One undo step and one recalculation/repaint for the whole range
+            if session is None:
+                write(results)
+                return
+            with session, session.burst():
+                write(results)
+
+        if background_job is None:
+            finished(work(None), None)
+            return True
+        if background_job.is_running(document):
+            raise RuntimeError("another localwriter job is still running in this document")
+        background_job.BackgroundJob(self.ctx, document, "localwriter").start(work, finished)
+        return True
+
     def trigger(self, args):
         desktop = self.ctx.ServiceManager.createInstanceWithContext(
             "com.sun.star.frame.Desktop", self.ctx)
         model = desktop.getCurrentComponent()
+        document = model
         #if not hasattr(model, "Text"):
         #    model = self.desktop.loadComponentFromURL("private:factory/swriter", "_blank", 0, ())
 
@@ -354,32 +772,8 @@ class MainJob(unohelper.Base, XJobExecutor):
                         request = urllib.request.Request(url, data=json_data, headers=headers, method='POST')
 
 
-                        toolkit = self.ctx.getServiceManager().createInstanceWithContext(
-                            "com.sun.star.awt.Toolkit", self.ctx
-                        )
-
-                        # Send the request and read the response
-                        with urllib.request.urlopen(request) as response:
-                            for line in response:
-                                try:
-                                    if line.strip():  # skip empty keep-alive lines
-                                        if line.startswith(b"data: "):
-                                            payload = line[len(b"data: "):].decode("utf-8")
-                                            chunk = json.loads(payload)
-                                            if chunk["choices"][0]["finish_reason"] != None:
-                                                break
-                                            selected_text = text_range.getString()
-                                            new_text = selected_text + str(chunk["choices"][0]["text"])
-                                            text_range.setString(new_text)
-                                            toolkit.processEventsToIdle()   # let the UI catch up      
-                                except Exception as e:
-                                    selected_text = text_range.getString()
-                                    new_text = selected_text + str(e)
-                                    text_range.setString(new_text)
-                                    toolkit.processEventsToIdle()   # let the UI catch up      
-
-                                    # ignore parse errors
-                                    pass 
+                        # Send the request in the background and append the answer after the selection
+                        self.stream_in_background(document, request, text_range)
                                       
                     except Exception as e:
                         text_range = selection.getByIndex(0)
@@ -422,36 +816,9 @@ class MainJob(unohelper.Base, XJobExecutor):
                     # Create a request object with the URL, data, and headers
                     request = urllib.request.Request(url, data=json_data, headers=headers, method='POST')
 
-                    
-                    toolkit = self.ctx.getServiceManager().createInstanceWithContext(
-                                            "com.sun.star.awt.Toolkit", self.ctx
-                                        )
-
-
 
-                     # Send the request and read the response
-                    text_range.setString("")
-                    with urllib.request.urlopen(request) as response:
-                        for line in response:
-                            try:
-                                if line.strip():  # skip empty keep-alive lines
-                                    if line.startswith(b"data: "):
-                                        payload = line[len(b"data: "):].decode("utf-8")
-                                        chunk = json.loads(payload)
-                                        if chunk["choices"][0]["finish_reason"] != None:
-                                            break
-                                        selected_text = text_range.getString()
-                                        new_text = selected_text + str(chunk["choices"][0]["text"])
-                                        text_range.setString(new_text)
-                                        toolkit.processEventsToIdle()   # let the UI catch up      
-                            except Exception as e:
-                                selected_text = text_range.getString()
-                                new_text = selected_text + str(e)
-                                text_range.setString(new_text)
-                                toolkit.processEventsToIdle()   # let the UI catch up      
-
-                                # ignore parse errors
-                                pass 
+                    # Send the request in the background and replace the selection with the answer
+                    self.stream_in_background(document, request, text_range, replace=True)
 
                 except Exception as e:
                     text_range = selection.getByIndex(0)
@@ -497,9 +864,16 @@ class MainJob(unohelper.Base, XJobExecutor):
                 selection = model.CurrentController.Selection
                 
 
+                user_input = ""
                 if args == "EditSelection":
                     user_input= self.input_box("Please enter edit instructions!", "Input", "")
 
+                settings = self.calc_settings(args, user_input)
+
+                # Bulk mode for ranges with several text cells
+                if args in ("ExtendSelection", "EditSelection") and self.get_config("calc_bulk", True):
+                    if self.calc_bulk(selection, settings, document):
+                        return
 
                 area = selection.getRangeAddress()
                 start_row = area.StartRow
@@ -510,33 +884,77 @@ class MainJob(unohelper.Base, XJobExecutor):
                 col_range = range(start_col, end_col + 1)
                 row_range = range(start_row, end_row + 1)
 
-                for row in row_range:
-                    new_values = []
-                    for col in col_range:
-                        cell = sheet.getCellByPosition(col, row)
+                # Every streamed cell undoes as one step
+                session = self.bulk_session(document)
+                if session is not None:
+                    session.open()
+                try:
+                    for row in row_range:
+                        for col in col_range:
+                            cell = sheet.getCellByPosition(col, row)
 
 
-                        if args == "ExtendSelection":
+                            if args == "ExtendSelection":
                             
-                            if len(cell.getString()) > 0:
-                                try:
+                                if len(cell.getString()) > 0:
+                                    try:
 
-                                    url = self.get_config("endpoint", "http://127.0.0.1:5000") + "/v1/completions" 
+                                        url = self.get_config("endpoint", "http://127.0.0.1:5000") + "/v1/completions" 
                                     
                                     
+                                        headers = {
+                                            'Content-Type': 'application/json'
+                                        }
+
+                                        prompt, max_tokens = self.calc_prompt(settings, cell.getString())
+
+                                        data = {
+                                            'prompt': prompt,
+                                            'max_tokens': max_tokens,
+                                            'temperature': 1,
+                                            'top_p': 0.9,
+                                            'seed': 10,
+                                            'stream': True
+                                        }
+
+                                        model = self.get_config("model", "")
+                                        if model != "":
+                                            data["model"] = model
+
+
+                                        # Convert data to JSON format
+                                        json_data = json.dumps(data).encode('utf-8')
+
+                                        # Create a request object with the URL, data, and headers
+                                        request = urllib.request.Request(url, data=json_data, headers=headers, method='POST')
+
+                                        # Send the request and read the response
+                                        toolkit = self.ctx.getServiceManager().createInstanceWithContext(
+                                            "com.sun.star.awt.Toolkit", self.ctx
+                                        )
+
+                                        # Send the request and append the answer to the cell
+                                        self.stream_completion(request, self.stream_sink(cell, toolkit),
+                                                               self.get_config("log_stream_stats", False))
+
+                                    except Exception as e:
+                                        # Append the user input to the selected text
+                                        cell.setString(cell.getString() + ": " + str(e))
+                            elif args == "EditSelection":
+                                # Access the current selection
+                                try:
+                                    #text_range.setString(text_range.getString() + ": " + user_input)
+                                    url = self.get_config("endpoint", "http://127.0.0.1:5000") + "/v1/completions" 
+
                                     headers = {
                                         'Content-Type': 'application/json'
                                     }
 
-                                    prompt = None
-                                    if self.get_config("extend_selection_system_prompt", "") != "":
-                                        prompt = "SYSTEM PROMPT\n" + self.get_config("extend_selection_system_prompt", "") + "\nEND SYSTEM PROMPT\n" + cell.getString()
-                                    else:
-                                        prompt = cell.getString()
+                                    prompt, max_tokens = self.calc_prompt(settings, cell.getString())
 
                                     data = {
-                                        'prompt': prompt,
-                                        'max_tokens': self.get_config("extend_selection_max_tokens", 70),
+                                        'prompt':prompt,
+                                        'max_tokens': max_tokens, # number of characters + max new tokens, see calc_prompt
                                         'temperature': 1,
                                         'top_p': 0.9,
                                         'seed': 10,
@@ -547,141 +965,63 @@ class MainJob(unohelper.Base, XJobExecutor):
                                     if model != "":
                                         data["model"] = model
 
-
                                     # Convert data to JSON format
                                     json_data = json.dumps(data).encode('utf-8')
 
                                     # Create a request object with the URL, data, and headers
                                     request = urllib.request.Request(url, data=json_data, headers=headers, method='POST')
 
-                                    # Send the request and read the response
+       # Send the request and read the response
                                     toolkit = self.ctx.getServiceManager().createInstanceWithContext(
                                         "com.sun.star.awt.Toolkit", self.ctx
                                     )
 
-                                    # Send the request and read the response
-                                    with urllib.request.urlopen(request) as response:
-                                        for line in response:
-                                            try:
-                                                if line.strip():  # skip empty keep-alive lines
-                                                    if line.startswith(b"data: "):
-                                                        payload = line[len(b"data: "):].decode("utf-8")
-                                                        chunk = json.loads(payload)
-                                                        if chunk["choices"][0]["finish_reason"] != None:
-                                                            break
-                                                        selected_text = cell.getString()
-                                                        new_text = selected_text + str(chunk["choices"][0]["text"])
-                                                        cell.setString(new_text)
-                                                        toolkit.processEventsToIdle()   # let the UI catch up      
-                                            except Exception as e:
-                                                selected_text = cell.getString()
-                                                new_text = selected_text + str(e)
-                                                cell.setString(new_text)
-                                                toolkit.processEventsToIdle()   # let the UI catch up      
-                                                # ignore parse errors
-                                                pass 
+                                    # Send the request and replace the cell with the answer
+                                    self.stream_completion(request, self.stream_sink(cell, toolkit, replace=True),
+                                                           self.get_config("log_stream_stats", False))
+
 
                                 except Exception as e:
                                     # Append the user input to the selected text
                                     cell.setString(cell.getString() + ": " + str(e))
-                        elif args == "EditSelection":
-                            # Access the current selection
-                            try:
-                                #text_range.setString(text_range.getString() + ": " + user_input)
-                                url = self.get_config("endpoint", "http://127.0.0.1:5000") + "/v1/completions" 
-
-                                headers = {
-                                    'Content-Type': 'application/json'
-                                }
-
-                                prompt =  "ORIGINAL VERSION:\n" + cell.getString() + "\n Below is an edited version according to the following instructions. Don't waste time thinking, be as fast as you can. The edited text does not end with a newline. There are no comments in the edited version. USER INSTRUCTIONS: \n" + user_input + "\nEDITED VERSION:\n"
-
-                                if self.get_config("edit_selection_system_prompt", "") != "":
-                                    prompt = "SYSTEM PROMPT\n" + self.get_config("edit_selection_system_prompt","") + "\nEND SYSTEM PROMPT\n" + prompt
-
-
-                                data = {
-                                    'prompt':prompt,
-                                    'max_tokens': len(cell.getString()) + self.get_config("edit_selection_max_new_tokens", 0), # this is a bit hacky, it's actually number of characters + max new tokens, so even if max new tokens is zero, max_tokens will often end up with more tokens than the selected text actually contains.
-                                    'temperature': 1,
-                                    'top_p': 0.9,
-                                    'seed': 10,
-                                    'stream': True
-                                }
-
-                                model = self.get_config("model", "")
-                                if model != "":
-                                    data["model"] = model
-
-                                # Convert data to JSON format
-                                json_data = json.dumps(data).encode('utf-8')
-
-                                # Create a request object with the URL, data, and headers
-                                request = urllib.request.Request(url, data=json_data, headers=headers, method='POST')
-
-   # Send the request and read the response
-                                toolkit = self.ctx.getServiceManager().createInstanceWithContext(
-                                    "com.sun.star.awt.Toolkit", self.ctx
-                                )
-
-                                cell.setString("")
-
-                                # Send the request and read the response
-                                with urllib.request.urlopen(request) as response:
-                                    for line in response:
-                                        try:
-                                            if line.strip():  # skip empty keep-alive lines
-                                                if line.startswith(b"data: "):
-                                                    payload = line[len(b"data: "):].decode("utf-8")
-                                                    chunk = json.loads(payload)
-                                                    if chunk["choices"][0]["finish_reason"] != None:
-                                                        break
-                                                    selected_text = cell.getString()
-                                                    new_text = selected_text + str(chunk["choices"][0]["text"])
-                                                    cell.setString(new_text)
-                                                    toolkit.processEventsToIdle()   # let the UI catch up      
-                                        except Exception as e:
-                                            selected_text = cell.getString()
-                                            new_text = selected_text + str(e)
-                                            cell.setString(new_text)
-                                            toolkit.processEventsToIdle()   # let the UI catch up      
-                                            # ignore parse errors
-                                            pass 
-
-
-                            except Exception as e:
-                                # Append the user input to the selected text
-                                cell.setString(cell.getString() + ": " + str(e))
                         
-                        elif args == "settings":
-                            try:
+                            elif args == "settings":
+                                try:
 
-                                result = self.settings_box("Settings")
+                                    result = self.settings_box("Settings")
                                                 
-                                if "extend_selection_max_tokens" in result:
-                                    self.set_config("extend_selection_max_tokens", result["extend_selection_max_tokens"])
+                                    if "extend_selection_max_tokens" in result:
+                                        self.set_config("extend_selection_max_tokens", result["extend_selection_max_tokens"])
 
-                                if "extend_selection_system_prompt" in result:
-                                    self.set_config("extend_selection_system_prompt", result["extend_selection_system_prompt"])
+                                    if "extend_selection_system_prompt" in result:
+                                        self.set_config("extend_selection_system_prompt", result["extend_selection_system_prompt"])
 
-                                if "edit_selection_max_new_tokens" in result:
-                                    self.set_config("edit_selection_max_new_tokens", result["edit_selection_max_new_tokens"])
+                                    if "edit_selection_max_new_tokens" in result:
+                                        self.set_config("edit_selection_max_new_tokens", result["edit_selection_max_new_tokens"])
 
-                                if "edit_selection_system_prompt" in result:
-                                    self.set_config("edit_selection_system_prompt", result["edit_selection_system_prompt"])
+                                    if "edit_selection_system_prompt" in result:
+                                        self.set_config("edit_selection_system_prompt", result["edit_selection_system_prompt"])
 
-                                if "endpoint" in result and result["endpoint"].startswith("http"):
-                                    self.set_config("endpoint", result["endpoint"])
+                                    if "endpoint" in result and result["endpoint"].startswith("http"):
+                                        self.set_config("endpoint", result["endpoint"])
 
-                                if "model" in result:                
-                                    self.set_config("model", result["model"])
+                                    if "model" in result:                
+                                        self.set_config("model", result["model"])
 
 
-                            except Exception as e:
-                                # Append the user input to the selected text
-                                cell.setString(cell.getString() + ":error: " + str(e))
+                                except Exception as e:
+                                    # Append the user input to the selected text
+                                    cell.setString(cell.getString() + ":error: " + str(e))
+                finally:
+                    if session is not None:
+                        session.close()
             except Exception as e:
-                pass
+                # E.g. another job still running in this document
+                try:
+                    cell = model.CurrentController.Selection.getCellByPosition(0, 0)
+                    cell.setString(cell.getString() + ":error: " + str(e))
+                except Exception:
+                    pass
 
 # Starting from Python IDE
 def main():
@@ -25,18 +25,55 @@ WYMAGANIA:
 
 from __future__ import print_function, absolute_import, division
 
+import gzip
+import hashlib
 import json
+import socket
+import threading
 import time
 import os
+import random
 import re
-from typing import Optional, Tuple, Dict, Any, List
+import unicodedata
+from collections import OrderedDict
+from email.utils import parsedate_tz, mktime_tz
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from typing import Optional, Tuple, Dict, Any, List, Callable
 
 # Kompatybilnosc Python 2/3
 try:
-    from urllib.request import Request, urlopen
-    from urllib.error import HTTPError, URLError
+    import http.client as http_client
+    from urllib.parse import urlsplit
+    from urllib.request import getproxies, proxy_bypass
 except ImportError:
-    from urllib2 import Request, urlopen, HTTPError, URLError
+    import httplib as http_client
+    from urlparse import urlsplit
+    from urllib import getproxies, proxy_bypass
+
+# Silnik dzielenia tekstu (ten sam dla backendu i localwriter.py)
+try:
+    from .chunking import chunk_text, chunk_text_by_tokens
+    from .tokens import TokenEstimator, get_token_estimator
+    from .packing import can_pack, format_pack, pack_units, packing_prompt, parse_pack
+    from . import readability
+except ImportError:
+    try:
+        from chunking import chunk_text, chunk_text_by_tokens
+        from tokens import TokenEstimator, get_token_estimator
+        from packing import can_pack, format_pack, pack_units, packing_prompt, parse_pack
+        import readability
+    except ImportError:
+        from backends.chunking import chunk_text, chunk_text_by_tokens
+        from backends.tokens import TokenEstimator, get_token_estimator
+        from backends.packing import can_pack, format_pack, pack_units, packing_prompt, parse_pack
+        from backends import readability
+
+# sqlite3 bywa niedostepny w Pythonie wbudowanym w LibreOffice -
+# wtedy cache wynikow dziala tylko w pamieci
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
 
 
 # =============================================================================
@@ -45,15 +82,48 @@ except ImportError:
 
 DEFAULT_CONFIG = {
     "endpoint": "https://integrate.api.nvidia.com/v1/chat/completions",
+    "endpoints": [],  # Kilka serwerow: ["url", {"url", "weight", "api_key", "model", "rate_limit_rpm"}]
+    "endpoint_error_threshold": 0.5,  # Udzial bledow, po ktorym endpoint jest wylaczany
+    "endpoint_cooldown": 30,  # Sekundy przerwy dla niesprawnego endpointu
     "model": "speakleash/bielik-11b-v2.6-instruct",
     "temperature": 0.3,
     "max_tokens": 2048,
     "timeout": 60,
-    "max_retries": 5,
+    "max_retries": 5,  # Max ponowien jednego zapytania (429/5xx)
+    "retry_base_delay": 1.0,  # Minimalne opoznienie ponowienia (s)
+    "retry_max_delay": 30,  # Max opoznienie ponowienia; dluzszy Retry-After = rezygnacja
+    "retry_budget": 12,  # Max ponowien w calym zadaniu (wszystkie czesci dokumentu)
     "rate_limit_rpm": 40,
-    "chunk_size": 3000,  # Max znakow na zapytanie
+    "rate_limit_burst": 4,  # Ile zapytan mozna wyslac naraz po okresie bezczynnosci
+    "rate_limit_tpm": 0,  # Limit tokenow na minute (0 = wylaczony)
+    "chunk_size": 3000,  # Max znakow na zapytanie (gdy chunk_by_tokens=False)
+    "chunk_by_tokens": True,  # Dziel dlugie teksty wedlug budzetu tokenow
+    "chunk_tokens": 0,  # Budzet tokenow wejscia na czesc (0 = automatycznie)
+    "context_window": 32768,  # Okno kontekstu modelu (tokeny)
+    "output_expansion": 1.2,  # Ile razy dluzsza moze byc odpowiedz niz tekst
+    "max_concurrency": 4,  # Max rownoleglych zapytan przy dlugich tekstach (1 = sekwencyjnie)
+    "pack_short_units": True,  # Laczenie krotkich akapitow w jedno zapytanie (process_paragraphs)
+    "pack_max_units": 20,  # Max akapitow w jednym zapytaniu
+    "edit_flush_writes": 100,  # Odswiez widok co tyle zapisanych akapitow (0 = po kazdej partii)
+    "dedupe_paragraphs": True,  # Powtorzone akapity (stopki, pouczenia) upraszczane raz w zadaniu
+    "prefilter_plain": True,  # Nie wysylaj akapitow juz w prostym jezyku (backends/readability.py)
+    "plain_max_sentence_words": 15,  # Max slow w zdaniu akapitu uznanego za prosty
+    "plain_max_long_words": 0.15,  # Max udzial slow 4+ sylabowych
+    "prefilter_processes": 0,  # Procesy oceny duzych dokumentow (0 = w biezacym procesie)
+    "pool_maxsize": 4,  # Max bezczynnych polaczen keep-alive na host
+    "pool_idle_timeout": 30,  # Sekundy bezczynnosci po ktorych polaczenie jest zamykane
+    "gzip_request": True,  # Kompresuj body zapytania (Content-Encoding: gzip)
+    "gzip_min_bytes": 1024,  # Nie kompresuj mniejszych zapytan
+    "cache_enabled": True,  # Zapamietuj wyniki simplify_text
+    "cache_path": "",  # Baza SQLite ("" = ~/.polonista/cache.sqlite3)
+    "cache_memory_entries": 512,  # Rozmiar LRU w pamieci
+    "cache_max_entries": 20000,  # Max wpisow w bazie na dysku
+    "cache_ttl_days": 30,  # Waznosc wpisu w dniach
 }
 
+# Granica akapitow w simplify_long_text (z bialymi znakami wokol)
+_PARAGRAPH_BREAK_RE = re.compile(r"(\s*\n\s*)")
+
 SYSTEM_PROMPT_PLAIN_LANGUAGE = """Jestes ekspertem Prostego Jezyka polskiego (Plain Language).
 Twoje zadanie: przeksztalcic tekst na prosty, zrozumialy jezyk.
 
@@ -75,6 +145,1152 @@ FORMATOWANIE:
 Uproscij ponizszy tekst:"""
 
 
+# =============================================================================
+# TRANSPORT HTTP: PULA POLACZEN KEEP-ALIVE
+# =============================================================================
+
+# Bledy oznaczajace, ze ponownie uzyte polaczenie zostalo juz zamkniete
+# przez serwer (wyscig z keep-alive) - wtedy ponawiamy na nowym polaczeniu.
+_STALE_CONNECTION_ERRORS = (
+    http_client.BadStatusLine,
+    http_client.CannotSendRequest,
+    http_client.ResponseNotReady,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+
+class HttpTransportError(Exception):
+    """Blad sieci (DNS, polaczenie, timeout) - odpowiednik URLError."""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class _PooledConnection:
+    """Polaczenie HTTP(S) z czasem ostatniego uzycia."""
+
+    def __init__(self, key, conn):
+        self.key = key
+        self.conn = conn
+        self.last_used = time.time()
+        self.reused = False
+
+
+class HttpConnectionPool:
+    """
+    Watkowo-bezpieczna pula polaczen keep-alive (http.client).
+
+    Polaczenia sa trzymane osobno dla kazdego (schemat, host, port).
+    Zwrocone polaczenie wraca do puli, jesli serwer nie zamknal go
+    (Connection: close) i pula nie jest pelna. Polaczenia bezczynne
+    dluzej niz idle_timeout sa zamykane przy nastepnym pobraniu.
+    """
+
+    def __init__(self, maxsize: int = 4, idle_timeout: float = 30):
+        self.maxsize = max(1, int(maxsize))
+        self.idle_timeout = float(idle_timeout)
+        self._idle: Dict[Tuple[str, str, int], List[_PooledConnection]] = {}
+        self._lock = threading.Lock()
+        self._gzip_rejected = set()
+        self.created = 0
+        self.reused = 0
+
+    # -- zarzadzanie polaczeniami ---------------------------------------------
+
+    def _new_connection(self, key, timeout):
+        scheme, host, port = key
+        conn_class = (http_client.HTTPSConnection if scheme == "https"
+                      else http_client.HTTPConnection)
+
+        # Proxy z HTTPS_PROXY/HTTP_PROXY (jak urlopen) - tunel CONNECT
+        proxy = getproxies().get(scheme)
+        if proxy and not proxy_bypass(host):
+            proxy_parts = urlsplit(proxy)
+            conn = conn_class(proxy_parts.hostname, proxy_parts.port or 80, timeout=timeout)
+            conn.set_tunnel(host, port)
+        else:
+            conn = conn_class(host, port, timeout=timeout)
+
+        with self._lock:
+            self.created += 1
+        return _PooledConnection(key, conn)
+
+    def _acquire(self, key, timeout) -> _PooledConnection:
+        now = time.time()
+        expired = []
+        pooled = None
+
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                candidate = idle.pop()
+                if now - candidate.last_used > self.idle_timeout:
+                    expired.append(candidate)
+                    continue
+                pooled = candidate
+                break
+            if pooled is not None:
+                self.reused += 1
+
+        for old in expired:
+            old.conn.close()
+
+        if pooled is None:
+            return self._new_connection(key, timeout)
+
+        pooled.reused = True
+        pooled.conn.timeout = timeout
+        if pooled.conn.sock is not None:
+            pooled.conn.sock.settimeout(timeout)
+        return pooled
+
+    def _release(self, pooled: _PooledConnection, reusable: bool) -> None:
+        if not reusable:
+            pooled.conn.close()
+            return
+
+        pooled.last_used = time.time()
+        pooled.reused = False
+        with self._lock:
+            idle = self._idle.setdefault(pooled.key, [])
+            if len(idle) < self.maxsize:
+                idle.append(pooled)
+                return
+        pooled.conn.close()
+
+    def close(self) -> None:
+        """Zamyka wszystkie bezczynne polaczenia."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for pooled in connections:
+                pooled.conn.close()
+
+    # -- zapytania ------------------------------------------------------------
+
+    def request(
+        self,
+        url: str,
+        body: bytes,
+        headers: Dict[str, str],
+        timeout: float,
+        gzip_request: bool = False,
+        gzip_min_bytes: int = 1024
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Wysyla zapytanie POST i zwraca (status, naglowki, body).
+
+        Body odpowiedzi jest juz rozpakowane, jesli serwer uzyl gzip.
+        Jesli serwer odrzuci skompresowane body (415), zapytanie jest
+        powtarzane bez kompresji, a host zapamietany.
+
+        Raises:
+            HttpTransportError: Blad sieci lub timeout
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        use_gzip = (gzip_request and len(body) >= gzip_min_bytes
+                    and key not in self._gzip_rejected)
+
+        request_headers = dict(headers)
+        request_headers.setdefault("Accept-Encoding", "gzip")
+        if use_gzip:
+            request_headers["Content-Encoding"] = "gzip"
+            payload = gzip.compress(body)
+        else:
+            payload = body
+
+        status, response_headers, response_body = self._send(
+            key, path, payload, request_headers, timeout
+        )
+
+        if use_gzip and status == 415:
+            self._gzip_rejected.add(key)
+            del request_headers["Content-Encoding"]
+            status, response_headers, response_body = self._send(
+                key, path, body, request_headers, timeout
+            )
+
+        return status, response_headers, response_body
+
+    def _send(self, key, path, payload, headers, timeout):
+        # Maksymalnie 2 proby: druga tylko gdy polaczenie z puli bylo martwe
+        for attempt in range(2):
+            pooled = self._acquire(key, timeout)
+            try:
+                pooled.conn.request("POST", path, body=payload, headers=headers)
+                response = pooled.conn.getresponse()
+                raw = response.read()
+            except _STALE_CONNECTION_ERRORS as e:
+                pooled.conn.close()
+                if pooled.reused and attempt == 0:
+                    continue
+                raise HttpTransportError(e)
+            except (socket.timeout, OSError, http_client.HTTPException) as e:
+                pooled.conn.close()
+                raise HttpTransportError(e)
+
+            response_headers = {k.lower(): v for k, v in response.getheaders()}
+            self._release(pooled, not response.will_close)
+
+            if response_headers.get("content-encoding", "").lower() == "gzip":
+                try:
+                    raw = gzip.decompress(raw)
+                except (OSError, EOFError) as e:
+                    raise HttpTransportError(f"Uszkodzona odpowiedz gzip: {e}")
+
+            return response.status, response_headers, raw
+
+        raise HttpTransportError("Nie udalo sie nawiazac polaczenia")
+
+    def open_stream(
+        self,
+        url: str,
+        body: bytes,
+        headers: Dict[str, str],
+        timeout: float
+    ) -> "HttpStreamResponse":
+        """
+        Wysyla zapytanie POST i zwraca otwarta odpowiedz do czytania liniami.
+
+        Odpowiedz trzeba zamknac (close) - polaczenie wraca wtedy do puli,
+        jesli zostalo przeczytane do konca.
+
+        Raises:
+            HttpTransportError: Blad sieci lub timeout
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        request_headers = dict(headers)
+        # Strumien czytamy linia po linii - bez kompresji odpowiedzi
+        request_headers["Accept-Encoding"] = "identity"
+
+        for attempt in range(2):
+            pooled = self._acquire(key, timeout)
+            try:
+                pooled.conn.request("POST", path, body=body, headers=request_headers)
+                response = pooled.conn.getresponse()
+            except _STALE_CONNECTION_ERRORS as e:
+                pooled.conn.close()
+                if pooled.reused and attempt == 0:
+                    continue
+                raise HttpTransportError(e)
+            except (socket.timeout, OSError, http_client.HTTPException) as e:
+                pooled.conn.close()
+                raise HttpTransportError(e)
+
+            return HttpStreamResponse(self, pooled, response)
+
+        raise HttpTransportError("Nie udalo sie nawiazac polaczenia")
+
+
+class HttpStreamResponse:
+    """Otwarta odpowiedz HTTP z puli (np. strumien server-sent events)."""
+
+    def __init__(self, pool: HttpConnectionPool, pooled: _PooledConnection, response):
+        self._pool = pool
+        self._pooled = pooled
+        self._response = response
+        self._closed = False
+        self.status = response.status
+        self.headers = {k.lower(): v for k, v in response.getheaders()}
+
+    def iter_lines(self):
+        """Zwraca kolejne linie odpowiedzi (bytes, z koncem linii)."""
+        try:
+            while True:
+                line = self._response.readline()
+                if not line:
+                    return
+                yield line
+        except (socket.timeout, OSError, http_client.HTTPException) as e:
+            self.close()
+            raise HttpTransportError(e)
+
+    def read(self) -> bytes:
+        """Czyta reszte odpowiedzi."""
+        try:
+            return self._response.read()
+        except (socket.timeout, OSError, http_client.HTTPException) as e:
+            self.close()
+            raise HttpTransportError(e)
+
+    def close(self) -> None:
+        """Zwalnia polaczenie (do puli tylko gdy odpowiedz przeczytano do konca)."""
+        if self._closed:
+            return
+        self._closed = True
+        reusable = self._response.isclosed() and not self._response.will_close
+        self._pool._release(self._pooled, reusable)
+
+
+# Pule wspoldzielone przez wszystkie instancje backendu (get_backend,
+# create_backend) i kolejne wywolania makr w tym samym procesie LibreOffice.
+_connection_pools: Dict[Tuple[int, float], HttpConnectionPool] = {}
+_connection_pools_lock = threading.Lock()
+
+
+def get_connection_pool(maxsize: int = 4, idle_timeout: float = 30) -> HttpConnectionPool:
+    """Zwraca wspoldzielona pule polaczen dla podanych ustawien."""
+    key = (int(maxsize), float(idle_timeout))
+    with _connection_pools_lock:
+        pool = _connection_pools.get(key)
+        if pool is None:
+            pool = HttpConnectionPool(maxsize, idle_timeout)
+            _connection_pools[key] = pool
+        return pool
+
+
+def close_connection_pools() -> None:
+    """Zamyka wszystkie polaczenia keep-alive (np. przy zamykaniu LibreOffice)."""
+    with _connection_pools_lock:
+        pools = list(_connection_pools.values())
+    for pool in pools:
+        pool.close()
+
+
+# =============================================================================
+# RATE LIMITING: WSPOLDZIELONY TOKEN BUCKET
+# =============================================================================
+
+class TokenBucket:
+    """
+    Wiadro tokenow uzupelniane w sposob ciagly.
+
+    Args:
+        rate_per_minute: Ile tokenow przybywa na minute
+        capacity: Maksymalna liczba tokenow (rozmiar burstu)
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float):
+        self.rate = float(rate_per_minute) / 60.0
+        self.capacity = max(1.0, float(capacity))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Sekundy do chwili, gdy w wiadrze bedzie `amount` tokenow."""
+        missing = min(amount, self.capacity) - self.tokens
+        if missing <= 0:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return missing / self.rate
+
+    def take(self, amount: float) -> None:
+        # Koszt wiekszy niz pojemnosc zuzywa cale wiadro (inaczej czekalby w nieskonczonosc)
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Watkowo-bezpieczny limiter RPM (+ opcjonalnie TPM) z kolejka FIFO.
+
+    Watki czekaja w kolejce zgloszen - tylko pierwszy w kolejce moze
+    pobrac tokeny, wiec zaden watek nie jest wyprzedzany przez pozniejsze.
+    Budzet TPM jest rezerwowany z szacunku przed zapytaniem i korygowany
+    metoda `reconcile` po otrzymaniu faktycznego zuzycia (`usage`).
+    """
+
+    def __init__(self, rpm: float, burst: int = 1, tpm: int = 0):
+        self._cond = threading.Condition()
+        self._queue: List[object] = []
+        self._paused_until = 0.0
+        self.configure(rpm, burst, tpm)
+        self.total_wait = 0.0
+        self.acquired = 0
+        self.pauses = 0
+
+    def configure(self, rpm: float, burst: int = 1, tpm: int = 0) -> None:
+        """Zmienia limity (zachowuje biezacy stan wiader, jesli sie da)."""
+        with self._cond:
+            self.rpm = float(rpm)
+            self.burst = max(1, int(burst))
+            self.tpm = int(tpm or 0)
+            self._requests = TokenBucket(self.rpm, self.burst)
+            self._tokens = TokenBucket(self.tpm, self.tpm) if self.tpm > 0 else None
+            self._cond.notify_all()
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Blokuje do chwili, gdy mozna wyslac zapytanie.
+
+        Args:
+            tokens: Szacowana liczba tokenow zapytania (dla limitu TPM)
+
+        Returns:
+            Czas oczekiwania w sekundach
+        """
+        ticket = object()
+        start = time.monotonic()
+
+        with self._cond:
+            self._queue.append(ticket)
+            try:
+                while True:
+                    if self._queue[0] is ticket:
+                        now = time.monotonic()
+                        self._requests.refill(now)
+                        wait = max(self._requests.time_until(1), self._paused_until - now)
+                        if self._tokens is not None and tokens > 0:
+                            self._tokens.refill(now)
+                            wait = max(wait, self._tokens.time_until(tokens))
+                        if wait <= 0:
+                            self._requests.take(1)
+                            if self._tokens is not None and tokens > 0:
+                                self._tokens.take(tokens)
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            self.total_wait += waited
+            self.acquired += 1
+            return waited
+
+    def add_wait(self, seconds: float) -> None:
+        """Dolicza czas oczekiwania spoza acquire (np. AsyncRateLimiter)."""
+        with self._cond:
+            self.total_wait += seconds
+
+    def try_acquire(self, tokens: int = 0) -> float:
+        """
+        Probuje pobrac miejsce bez blokowania.
+
+        Returns:
+            0 jesli pobrano, w przeciwnym razie sekundy do ponownej proby
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._requests.refill(now)
+            wait = max(self._requests.time_until(1), self._paused_until - now)
+            if self._tokens is not None and tokens > 0:
+                self._tokens.refill(now)
+                wait = max(wait, self._tokens.time_until(tokens))
+            if self._queue:
+                # Pierwszenstwo maja watki czekajace w acquire()
+                wait = max(wait, 0.05)
+            if wait > 0:
+                return wait
+            self._requests.take(1)
+            if self._tokens is not None and tokens > 0:
+                self._tokens.take(tokens)
+            self.acquired += 1
+            return 0.0
+
+    def pause(self, seconds: float) -> None:
+        """
+        Wstrzymuje wszystkie zapytania na `seconds` (po odpowiedzi 429).
+
+        Po przerwie wiadro zapytan startuje puste, wiec czekajacy wracaja
+        stopniowo w tempie RPM, a nie wszyscy naraz.
+        """
+        with self._cond:
+            until = time.monotonic() + max(0.0, seconds)
+            if until > self._paused_until:
+                self._paused_until = until
+                self._requests.tokens = 0.0
+                self._requests.updated = until
+                self.pauses += 1
+            self._cond.notify_all()
+
+    def reconcile(self, reserved: int, actual: int) -> None:
+        """Koryguje budzet TPM o roznice miedzy szacunkiem a faktycznym zuzyciem."""
+        if self._tokens is None or actual <= 0:
+            return
+        with self._cond:
+            self._tokens.refill(time.monotonic())
+            self._tokens.tokens = min(
+                self._tokens.capacity,
+                self._tokens.tokens + (reserved - actual)
+            )
+            self._cond.notify_all()
+
+
+# Limitery wspoldzielone przez wszystkie instancje backendu dla danego endpointu
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(endpoint: str, rpm: float, burst: int = 1, tpm: int = 0) -> RateLimiter:
+    """Zwraca wspoldzielony limiter dla endpointu (aktualizuje limity, jesli sie zmienily)."""
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(endpoint)
+        if limiter is None:
+            limiter = RateLimiter(rpm, burst, tpm)
+            _rate_limiters[endpoint] = limiter
+        elif (limiter.rpm, limiter.burst, limiter.tpm) != (float(rpm), max(1, int(burst)), int(tpm or 0)):
+            limiter.configure(rpm, burst, tpm)
+        return limiter
+
+
+def estimate_tokens(
+    messages: List[Dict[str, str]],
+    max_tokens: int = 0,
+    estimator: Optional[TokenEstimator] = None
+) -> int:
+    """
+    Szacuje liczbe tokenow zapytania (wejscie + zarezerwowane wyjscie).
+
+    Z estymatorem (backends/tokens.py) liczy tokeny z cech tekstu; bez
+    niego przyjmuje ok. 3.5 znaku na token.
+    """
+    if estimator is not None:
+        return estimator.count_messages(messages) + int(max_tokens or 0)
+    chars = sum(len(m.get("content") or "") for m in messages)
+    return int(chars / 3.5) + 4 * len(messages) + int(max_tokens or 0)
+
+
+# =============================================================================
+# PONAWIANIE ZAPYTAN
+# =============================================================================
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Odczytuje naglowek Retry-After (sekundy lub data HTTP).
+
+    Returns:
+        Liczba sekund (>= 0) lub None, gdy naglowka brak lub jest niepoprawny
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(0.0, mktime_tz(parsed) - time.time())
+
+
+def decorrelated_jitter(previous: float, base: float, cap: float) -> float:
+    """
+    Kolejne opoznienie ponowienia (decorrelated jitter).
+
+    Losowe opoznienia rozpraszaja ponowienia wielu watkow, ktore dostaly
+    blad w tej samej chwili.
+    """
+    return min(cap, random.uniform(base, max(base, previous * 3)))
+
+
+class RetryBudget:
+    """
+    Wspolny limit ponowien dla jednego zadania (np. wszystkich czesci
+    dokumentu). Gdy sie wyczerpie, kolejne bledy 429/5xx nie sa ponawiane.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(0, int(limit))
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def try_spend(self) -> bool:
+        """Zuzywa jedno ponowienie; False gdy budzet jest wyczerpany."""
+        with self._lock:
+            if self.spent >= self.limit:
+                return False
+            self.spent += 1
+            return True
+
+    @property
+    def remaining(self) -> int:
+        return self.limit - self.spent
+
+
+# Bledy, po ktorych nie ma sensu wysylac kolejnych czesci tego samego zadania
+_FATAL_ERROR_PREFIXES = (
+    "[BLAD] Brak klucza",
+    "[BLAD] Klucz API",
+    "[BLAD 401]",
+    "[BLAD 403]",
+    "[BLAD 404]",
+)
+
+
+def is_fatal_error(message: str) -> bool:
+    """Czy blad wyklucza powodzenie kolejnych zapytan (klucz, dostep, model)."""
+    return message.startswith(_FATAL_ERROR_PREFIXES)
+
+
+# =============================================================================
+# WIELE ENDPOINTOW: ROZKLADANIE RUCHU I FAILOVER
+# =============================================================================
+
+def parse_endpoints(value: Any) -> List[Dict[str, Any]]:
+    """
+    Normalizuje liste endpointow z konfiguracji lub .env.
+
+    Przyjmuje napis "url|waga, url2" (NVIDIA_ENDPOINTS w .env) albo liste
+    napisow/slownikow {"url", "weight", "api_key", "model", "rate_limit_rpm"}.
+
+    Returns:
+        Lista slownikow z kluczem "url" (i opcjonalnie pozostalymi)
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = [item for item in re.split(r"[,\s]+", value) if item]
+
+    specs = []
+    for item in value:
+        if isinstance(item, dict):
+            spec = dict(item)
+        else:
+            url, _, weight = str(item).partition("|")
+            spec = {"url": url.strip()}
+            try:
+                spec["weight"] = float(weight)
+            except ValueError:
+                pass
+        if spec.get("url"):
+            specs.append(spec)
+    return specs
+
+
+class Endpoint:
+    """Jeden serwer API: adres, waga, wlasny limiter i stan zdrowia."""
+
+    # Ile ostatnich wynikow bierzemy pod uwage przy ocenie zdrowia
+    WINDOW = 20
+    MIN_SAMPLES = 5
+
+    def __init__(self, url: str, weight: float = 1.0, api_key: Optional[str] = None,
+                 model: Optional[str] = None, limiter: Optional[RateLimiter] = None):
+        self.url = url
+        self.weight = max(0.01, float(weight))
+        self.api_key = api_key  # None = klucz NVIDIA_API_KEY backendu
+        self.model = model
+        self.limiter = limiter
+        self.outstanding = 0
+        self.unhealthy_until = 0.0
+        self.recent: List[bool] = []
+        self.requests = 0
+        self.failures = 0
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "weight": self.weight,
+            "outstanding": self.outstanding,
+            "healthy": self.is_healthy(time.monotonic()),
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class EndpointBalancer:
+    """
+    Wybiera endpoint dla zapytania (najmniej zapytan w toku wzgledem wagi).
+
+    Endpoint z udzialem bledow (siec, 5xx) >= error_threshold wsrod
+    ostatnich Endpoint.WINDOW zapytan jest wylaczany na `cooldown` sekund;
+    potem dostaje ruch ponownie i jest oceniany od nowa.
+    """
+
+    def __init__(self, endpoints: List[Endpoint], error_threshold: float = 0.5,
+                 cooldown: float = 30):
+        self.endpoints = endpoints
+        self.error_threshold = float(error_threshold)
+        self.cooldown = float(cooldown)
+        self._lock = threading.Lock()
+
+    def pick(self, exclude: Optional[set] = None) -> Endpoint:
+        """
+        Zwraca endpoint do uzycia i zwieksza jego licznik zapytan w toku.
+
+        Najpierw sprawne endpointy spoza `exclude`; gdy takich nie ma -
+        ten, ktorego przerwa konczy sie najwczesniej.
+        """
+        exclude = exclude or set()
+        with self._lock:
+            now = time.monotonic()
+            candidates = [e for e in self.endpoints if e not in exclude] or self.endpoints
+            healthy = [e for e in candidates if e.is_healthy(now)]
+            if healthy:
+                lowest = min((e.outstanding + 1) / e.weight for e in healthy)
+                best = [e for e in healthy if (e.outstanding + 1) / e.weight == lowest]
+                endpoint = random.choice(best)
+            else:
+                endpoint = min(candidates, key=lambda e: e.unhealthy_until)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def has_alternative(self, exclude: set) -> bool:
+        """Czy jest sprawny endpoint spoza `exclude` (do natychmiastowego failover)."""
+        now = time.monotonic()
+        return any(e not in exclude and e.is_healthy(now) for e in self.endpoints)
+
+    def release(self, endpoint: Endpoint, ok: bool) -> None:
+        """Konczy zapytanie i zapisuje jego wynik w ocenie zdrowia endpointu."""
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.requests += 1
+            if not ok:
+                endpoint.failures += 1
+            if len(self.endpoints) == 1:
+                # Jedyny endpoint nigdy nie jest wylaczany
+                return
+            endpoint.recent.append(ok)
+            del endpoint.recent[:-Endpoint.WINDOW]
+            if len(endpoint.recent) >= Endpoint.MIN_SAMPLES:
+                errors = endpoint.recent.count(False) / len(endpoint.recent)
+                if errors >= self.error_threshold:
+                    endpoint.unhealthy_until = time.monotonic() + self.cooldown
+                    endpoint.recent = []
+
+
+# Balancery wspoldzielone przez instancje z ta sama lista endpointow
+_balancers: Dict[Any, EndpointBalancer] = {}
+_balancers_lock = threading.Lock()
+
+
+def get_endpoint_balancer(config: Dict[str, Any]) -> EndpointBalancer:
+    """
+    Zwraca wspoldzielony balancer dla endpointow z konfiguracji.
+
+    Bez "endpoints" uzywany jest pojedynczy config["endpoint"].
+    Kazdy endpoint ma wlasny limiter RPM (rate_limit_rpm z wpisu lub
+    z konfiguracji), wiec przepustowosc rosnie z liczba serwerow.
+    """
+    specs = parse_endpoints(config.get('endpoints')) or [{"url": config['endpoint']}]
+    key = (
+        json.dumps(specs, sort_keys=True, default=str),
+        config['rate_limit_rpm'], config['rate_limit_burst'], config['rate_limit_tpm'],
+        config['endpoint_error_threshold'], config['endpoint_cooldown'],
+    )
+    with _balancers_lock:
+        balancer = _balancers.get(key)
+        if balancer is None:
+            endpoints = [
+                Endpoint(
+                    spec["url"],
+                    spec.get("weight", 1.0),
+                    spec.get("api_key"),
+                    spec.get("model"),
+                    get_rate_limiter(
+                        spec["url"],
+                        spec.get("rate_limit_rpm", config['rate_limit_rpm']),
+                        config['rate_limit_burst'],
+                        config['rate_limit_tpm']
+                    )
+                )
+                for spec in specs
+            ]
+            balancer = EndpointBalancer(
+                endpoints,
+                config['endpoint_error_threshold'],
+                config['endpoint_cooldown']
+            )
+            _balancers[key] = balancer
+        return balancer
+
+
+# =============================================================================
+# MAPOWANIE ODPOWIEDZI I BLEDOW API
+# =============================================================================
+
+def is_retryable_status(status: int) -> bool:
+    """429 (limit) i 5xx (blad serwera) warto ponowic."""
+    return status == 429 or status >= 500
+
+
+def http_error_message(status: int, body: bytes, model: str) -> str:
+    """Zamienia kod bledu HTTP na komunikat dla uzytkownika."""
+    error_body = ""
+    try:
+        error_body = body.decode('utf-8')
+    except:
+        pass
+    
+    if status == 429:
+        return "[BLAD 429] Przekroczono limit zapytan. Poczekaj minute."
+    elif status == 401:
+        return "[BLAD 401] Nieprawidlowy klucz API"
+    elif status == 403:
+        return "[BLAD 403] Brak dostepu do API lub modelu"
+    elif status == 404:
+        return f"[BLAD 404] Model nie znaleziony: {model}"
+    elif status >= 500:
+        return f"[BLAD {status}] Blad serwera NVIDIA"
+    else:
+        return f"[BLAD HTTP {status}] {error_body[:200]}"
+
+
+def parse_completion(result: Dict[str, Any]) -> Tuple[bool, str]:
+    """
+    Wyciaga tresc z odpowiedzi chat/completions.
+    
+    Returns:
+        Tuple (success: bool, content_or_error: str)
+    """
+    if 'choices' not in result:
+        return False, "[BLAD] Brak 'choices' w odpowiedzi API"
+    
+    if len(result['choices']) == 0:
+        return False, "[BLAD] Pusta lista 'choices' w odpowiedzi API"
+    
+    choice = result['choices'][0]
+    
+    if 'message' not in choice:
+        return False, "[BLAD] Brak 'message' w odpowiedzi API"
+    
+    if 'content' not in choice['message']:
+        return False, "[BLAD] Brak 'content' w odpowiedzi API"
+    
+    content = choice['message']['content']
+    
+    if content is None:
+        return False, "[BLAD] Odpowiedz API jest pusta (null)"
+    
+    return True, content.strip()
+
+
+# Znacznik konca strumienia ("data: [DONE]")
+SSE_DONE = object()
+
+
+def parse_sse_line(line: bytes):
+    """
+    Parsuje linie strumienia server-sent events.
+    
+    Returns:
+        dict dla linii "data: {...}", SSE_DONE dla "data: [DONE]",
+        None dla pozostalych linii (puste, komentarze, event:)
+    """
+    line = line.strip()
+    if not line.startswith(b"data:"):
+        return None
+    
+    event = line[len(b"data:"):].strip()
+    if event == b"[DONE]":
+        return SSE_DONE
+    
+    return json.loads(event.decode('utf-8'))
+
+
+def stream_delta(chunk: Dict[str, Any]) -> Optional[str]:
+    """Zwraca fragment tekstu z chunka chat/completions (lub completions)."""
+    choices = chunk.get('choices') or []
+    if not choices:
+        return None
+    choice = choices[0]
+    delta = choice.get('delta')
+    if delta is not None:
+        return delta.get('content')
+    return choice.get('text')
+
+
+# =============================================================================
+# CACHE WYNIKOW: LRU W PAMIECI + SQLITE NA DYSKU
+# =============================================================================
+
+def _default_cache_path() -> str:
+    return os.path.join(os.path.expanduser("~"), ".polonista", "cache.sqlite3")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizuje tekst do klucza cache.
+
+    NFC, bez spacji na koncach linii, zbite wielokrotne spacje/tabulatory.
+    Podzial na linie i akapity zostaje zachowany.
+    """
+    text = unicodedata.normalize("NFC", text.replace("\r\n", "\n").replace("\r", "\n"))
+    lines = [re.sub(r"[ \t\u00a0]+", " ", line).strip() for line in text.split("\n")]
+    return "\n".join(lines).strip()
+
+
+def make_cache_key(
+    model: str,
+    system_prompt: str,
+    temperature: float,
+    max_tokens: int,
+    text: str
+) -> str:
+    """Zwraca klucz SHA-256 dla parametrow zapytania i znormalizowanego tekstu."""
+    material = json.dumps(
+        [model, system_prompt, float(temperature), int(max_tokens), normalize_text(text)],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Dwupoziomowy cache wynikow: LRU w pamieci przed baza SQLite (WAL).
+
+    Wpisy starsze niz ttl_days sa traktowane jak brak trafienia i usuwane.
+    Baza jest przycinana do max_entries (najdawniej uzywane wypadaja);
+    czas uzycia trafien z dysku jest zapisywany zbiorczo (przy zapisie
+    wyniku lub co TOUCH_BATCH trafien), a nie osobnym commitem na trafienie.
+    Jesli baza jest niedostepna (np. katalog tylko do odczytu), cache
+    dziala tylko w pamieci.
+    """
+
+    TOUCH_BATCH = 100
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_entries: int = 512,
+        max_entries: int = 20000,
+        ttl_days: float = 30
+    ):
+        self.path = path or _default_cache_path()
+        self.memory_entries = max(0, int(memory_entries))
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl_days) * 86400
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._puts_since_trim = 0
+        self._touched: Dict[str, float] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._open_db()
+
+    def _open_db(self) -> None:
+        if sqlite3 is None:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            db = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results(accessed)")
+            db.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl,))
+            db.commit()
+            self._db = db
+        except (sqlite3.Error, OSError):
+            self._db = None
+
+    def _flush_touched(self) -> None:
+        # Wywolywane pod self._lock; commit robi wywolujacy
+        if self._touched:
+            touched, self._touched = self._touched, {}
+            self._db.executemany(
+                "UPDATE results SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in touched.items()]
+            )
+
+    def _remember(self, key: str, value: str, created: float) -> None:
+        if self.memory_entries == 0:
+            return
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """Zwraca zapamietany wynik albo None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, created FROM results WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        if now - row[1] <= self.ttl:
+                            self._touched[key] = now
+                            if len(self._touched) >= self.TOUCH_BATCH:
+                                self._flush_touched()
+                                self._db.commit()
+                            self._remember(key, row[0], row[1])
+                            self.disk_hits += 1
+                            return row[0]
+                        self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                        self._db.commit()
+                except sqlite3.Error:
+                    pass
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        """Zapisuje wynik w obu poziomach cache."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is None:
+                return
+            try:
+                self._flush_touched()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, created, accessed)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, value, now, now)
+                )
+                self._puts_since_trim += 1
+                if self._puts_since_trim >= 100:
+                    self._puts_since_trim = 0
+                    self._db.execute(
+                        "DELETE FROM results WHERE key IN ("
+                        " SELECT key FROM results ORDER BY accessed DESC"
+                        " LIMIT -1 OFFSET ?)",
+                        (self.max_entries,)
+                    )
+                self._db.commit()
+            except sqlite3.Error:
+                pass
+
+    def clear(self) -> None:
+        """Usuwa wszystkie wpisy."""
+        with self._lock:
+            self._memory.clear()
+            self._touched = {}
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM results")
+                    self._db.commit()
+                except sqlite3.Error:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Liczniki trafien i rozmiar cache."""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk": self._db is not None,
+            }
+
+
+# Cache wspoldzielony przez instancje backendu z ta sama baza i ustawieniami
+_result_caches: Dict[Tuple[str, int, int, float], ResultCache] = {}
+_result_caches_lock = threading.Lock()
+
+
+def get_result_cache(
+    path: Optional[str] = None,
+    memory_entries: int = 512,
+    max_entries: int = 20000,
+    ttl_days: float = 30
+) -> ResultCache:
+    """
+    Zwraca wspoldzielony cache dla podanej sciezki bazy i ustawien.
+
+    Instancje z inna wielkoscia LRU, limitem wpisow lub ttl_days dostaja
+    osobny obiekt (na tej samej bazie), a nie cache skonfigurowany przez
+    pierwsza instancje.
+    """
+    path = path or _default_cache_path()
+    key = (path, int(memory_entries), int(max_entries), float(ttl_days))
+    with _result_caches_lock:
+        cache = _result_caches.get(key)
+        if cache is None:
+            cache = ResultCache(path, memory_entries, max_entries, ttl_days)
+            _result_caches[key] = cache
+        return cache
+
+
+def duplicate_groups(texts: List[str]) -> Dict[int, List[int]]:
+    """
+    Powtorzenia tekstow po normalizacji (normalize_text).
+
+    Returns:
+        Slownik: indeks pierwszego wystapienia -> indeksy kolejnych
+        wystapien (tylko teksty wystepujace wiecej niz raz)
+    """
+    first: Dict[str, int] = {}
+    copies: Dict[int, List[int]] = {}
+    for i, text in enumerate(texts):
+        key = normalize_text(text)
+        if key in first:
+            copies.setdefault(first[key], []).append(i)
+        else:
+            first[key] = i
+    return copies
+
+
+def _batch_item(text: str, status: str, error: Optional[str] = None) -> Dict[str, Any]:
+    """Wynik jednego akapitu simplify_batch."""
+    return {
+        "status": status,
+        "text": text,
+        "error": error,
+        "latency_s": 0.0,
+        "retries": 0,
+        "duplicate_of": None,
+    }
+
+
+def _pack_messages(texts: List[str], prompt: str) -> List[Dict[str, str]]:
+    """Wiadomosci zapytania z paczka tekstow (backends/packing.py)."""
+    return [
+        {"role": "system", "content": packing_prompt(prompt, len(texts))},
+        {"role": "user", "content": format_pack(texts)}
+    ]
+
+
+class _PackedPrefix:
+    """Ciagly poczatek wynikow simplify_packed (podglad postepu)."""
+
+    def __init__(self, texts: List[str], outcomes: List[Optional[Tuple[bool, str]]]):
+        self.texts = texts
+        self.outcomes = outcomes
+        self.end = 0
+        self.results: List[str] = []
+
+    def advance(self) -> str:
+        while self.end < len(self.outcomes) and self.outcomes[self.end] is not None:
+            ok, res = self.outcomes[self.end]
+            self.results.append(res if ok else self.texts[self.end])
+            self.end += 1
+        return "\n\n".join(self.results)
+
+
 # =============================================================================
 # KLASA GLOWNA: NvidiaNimBackend
 # =============================================================================
@@ -97,11 +1313,42 @@ class NvidiaNimBackend:
             self.config.update(config)
         
         self._api_key: Optional[str] = None
-        self._last_request_time: float = 0
         self._request_count: int = 0
-        
+        self._stats_lock = threading.Lock()
+        self.pack_stats = {"packs": 0, "packed_units": 0, "fallback_units": 0}
+        self.prefilter_stats = {"checked": 0, "skipped": 0}
+        self.dedup_stats = {"duplicates": 0, "joined_in_flight": 0}
+        # Zapytania w toku wg klucza cache (singleflight w simplify_text)
+        self._in_flight: Dict[str, Future] = {}
+        # Licznik ponowien biezacego watku (simplify_batch)
+        self._thread_state = threading.local()
+        self.last_stream_stats: Optional[Dict[str, Any]] = None
+
+        # Wspoldzielona pula polaczen keep-alive
+        self._pool = get_connection_pool(
+            self.config['pool_maxsize'],
+            self.config['pool_idle_timeout']
+        )
+
         # Wczytaj klucz API
         self._load_api_key()
+
+        # Cache wynikow (wspoldzielony przez instancje z ta sama baza)
+        self._cache: Optional[ResultCache] = None
+        if self.config['cache_enabled']:
+            self._cache = get_result_cache(
+                self.config['cache_path'] or None,
+                self.config['cache_memory_entries'],
+                self.config['cache_max_entries'],
+                self.config['cache_ttl_days']
+            )
+
+        # Szacowanie tokenow (kalibrowane przez usage z odpowiedzi API)
+        self._token_estimator = get_token_estimator(self.config['model'])
+
+        # Endpointy i ich limitery wspoldzielone z innymi instancjami
+        # (po wczytaniu .env, bo NVIDIA_ENDPOINT(S) moze zmienic endpoint)
+        self._get_balancer()
     
     # -------------------------------------------------------------------------
     # KONFIGURACJA I KLUCZ API
@@ -193,6 +1440,8 @@ class NvidiaNimBackend:
                 # Wczytaj tez inne opcjonalne zmienne
                 if 'NVIDIA_ENDPOINT' in env_vars:
                     self.config['endpoint'] = env_vars['NVIDIA_ENDPOINT']
+                if 'NVIDIA_ENDPOINTS' in env_vars:
+                    self.config['endpoints'] = env_vars['NVIDIA_ENDPOINTS']
                 if 'NVIDIA_MODEL' in env_vars:
                     self.config['model'] = env_vars['NVIDIA_MODEL']
                 
@@ -245,19 +1494,48 @@ class NvidiaNimBackend:
     # RATE LIMITING
     # -------------------------------------------------------------------------
     
-    def _wait_for_rate_limit(self) -> None:
-        """Czeka jesli potrzebne dla zachowania limitu 40 RPM."""
-        min_interval = 60.0 / self.config['rate_limit_rpm']  # ~1.5 sekundy
-        
-        now = time.time()
-        elapsed = now - self._last_request_time
-        
-        if elapsed < min_interval:
-            wait_time = min_interval - elapsed
-            time.sleep(wait_time)
-        
-        self._last_request_time = time.time()
-        self._request_count += 1
+    def _get_balancer(self) -> EndpointBalancer:
+        """Balancer endpointow dla biezacej konfiguracji."""
+        self._balancer = get_endpoint_balancer(self.config)
+        # Limiter pierwszego endpointu (statystyki, zgodnosc wsteczna)
+        self._rate_limiter = self._balancer.endpoints[0].limiter
+        return self._balancer
+
+    def _wait_for_rate_limit(self, tokens: int = 0, limiter: Optional[RateLimiter] = None) -> None:
+        """
+        Czeka na wolne miejsce we wspoldzielonym limiterze (RPM/TPM).
+
+        Args:
+            tokens: Szacowana liczba tokenow zapytania (0 gdy TPM wylaczony)
+            limiter: Limiter endpointu (domyslnie pierwszego)
+        """
+        (limiter or self._rate_limiter).acquire(tokens)
+        with self._stats_lock:
+            self._request_count += 1
+
+    def _request_headers(self, endpoint: Endpoint) -> Tuple[Optional[str], Dict[str, str]]:
+        """
+        Naglowki zapytania do endpointu.
+
+        Returns:
+            Tuple (blad walidacji klucza lub None, naglowki)
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "POLONISTA/2.1 localwriter-nvidia-backend",
+            "Accept-Encoding": "gzip",
+            "Connection": "keep-alive"
+        }
+
+        if endpoint.api_key is None:
+            is_valid, msg = self.validate_api_key()
+            if not is_valid:
+                return f"[BLAD] {msg}", headers
+            headers["Authorization"] = f"Bearer {self._api_key}"
+        elif endpoint.api_key:
+            headers["Authorization"] = f"Bearer {endpoint.api_key}"
+
+        return None, headers
     
     # -------------------------------------------------------------------------
     # WYWOLANIE API
@@ -266,118 +1544,314 @@ class NvidiaNimBackend:
     def _make_request(
         self, 
         messages: List[Dict[str, str]], 
-        retry_count: int = 0
+        on_token: Optional[callable] = None,
+        retry_budget: Optional[RetryBudget] = None
     ) -> Tuple[bool, str]:
         """
-        Wykonuje pojedyncze zapytanie do API.
+        Wykonuje zapytanie do API (z ponowieniami dla 429/5xx).
+
+        Przy kilku endpointach blad sieci, 429 lub 5xx przenosi zapytanie
+        od razu na inny sprawny endpoint; dopiero gdy wszystkie zawiodly,
+        ponowienie czeka wedlug harmonogramu (_next_retry_delay).
+        Zerwany strumien jest ponawiany tylko przed pierwszym fragmentem;
+        po nim zapytanie konczy sie bledem, a endpoint jest liczony jako
+        niesprawny.
         
         Args:
             messages: Lista wiadomosci [{role, content}, ...]
-            retry_count: Numer aktualnej proby (dla rekurencji)
+            on_token: Jesli podany, odpowiedz jest strumieniowana (SSE),
+                      a kazdy fragment tekstu trafia do on_token(fragment)
+            retry_budget: Wspolny limit ponowien zadania (opcjonalny)
         
         Returns:
             Tuple (success: bool, result: str)
         """
-        # Walidacja
-        is_valid, msg = self.validate_api_key()
-        if not is_valid:
-            return False, f"[BLAD] {msg}"
-        
-        # Rate limiting
-        self._wait_for_rate_limit()
-        
+        balancer = self._get_balancer()
+
         # Przygotowanie payload
         payload = {
             "model": self.config['model'],
             "messages": messages,
             "temperature": self.config['temperature'],
             "max_tokens": self.config['max_tokens'],
-            "stream": False
+            "stream": on_token is not None
         }
-        
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self._api_key}",
-            "User-Agent": "POLONISTA/2.1 localwriter-nvidia-backend"
-        }
-        
-        data = json.dumps(payload).encode('utf-8')
-        
-        try:
-            req = Request(
-                self.config['endpoint'],
-                data=data,
-                headers=headers
-            )
-            
-            response = urlopen(req, timeout=self.config['timeout'])
-            result = json.loads(response.read().decode('utf-8'))
-            
-            # Parsowanie odpowiedzi - POPRAWIONE
-            if 'choices' not in result:
-                return False, "[BLAD] Brak 'choices' w odpowiedzi API"
-            
-            if len(result['choices']) == 0:
-                return False, "[BLAD] Pusta lista 'choices' w odpowiedzi API"
-            
-            choice = result['choices'][0]
-            
-            if 'message' not in choice:
-                return False, "[BLAD] Brak 'message' w odpowiedzi API"
-            
-            if 'content' not in choice['message']:
-                return False, "[BLAD] Brak 'content' w odpowiedzi API"
-            
-            content = choice['message']['content']
-            
-            if content is None:
-                return False, "[BLAD] Odpowiedz API jest pusta (null)"
-            
-            return True, content.strip()
-            
-        except HTTPError as e:
-            error_body = ""
+
+        retry_count = 0
+        delay = 0.0
+        tried = set()
+
+        while True:
+            endpoint = balancer.pick(tried)
+            ok = False
             try:
-                error_body = e.read().decode('utf-8')
-            except:
-                pass
-            
-            if e.code == 429:
-                # Rate limit - exponential backoff
-                if retry_count < self.config['max_retries']:
-                    wait_time = (2 ** retry_count) + 1
-                    time.sleep(wait_time)
-                    return self._make_request(messages, retry_count + 1)
-                return False, f"[BLAD 429] Przekroczono limit zapytan. Poczekaj minute."
-            
-            elif e.code == 401:
-                return False, "[BLAD 401] Nieprawidlowy klucz API"
-            
-            elif e.code == 403:
-                return False, "[BLAD 403] Brak dostepu do API lub modelu"
-            
-            elif e.code == 404:
-                return False, f"[BLAD 404] Model nie znaleziony: {self.config['model']}"
-            
-            elif e.code >= 500:
-                # Blad serwera - sprobuj ponownie
-                if retry_count < self.config['max_retries']:
-                    wait_time = (2 ** retry_count) + 1
-                    time.sleep(wait_time)
-                    return self._make_request(messages, retry_count + 1)
-                return False, f"[BLAD {e.code}] Blad serwera NVIDIA"
-            
-            else:
-                return False, f"[BLAD HTTP {e.code}] {error_body[:200]}"
+                key_error, headers = self._request_headers(endpoint)
+                if key_error:
+                    ok = True  # Blad klucza nie swiadczy o stanie serwera
+                    return False, key_error
+
+                data = json.dumps(
+                    dict(payload, model=endpoint.model or self.config['model'])
+                ).encode('utf-8')
+
+                # Rate limiting (takze przed kazdym ponowieniem)
+                reserved_tokens = 0
+                if self.config['rate_limit_tpm']:
+                    reserved_tokens = estimate_tokens(
+                        messages, self.config['max_tokens'], self._token_estimator
+                    )
+                self._wait_for_rate_limit(reserved_tokens, endpoint.limiter)
+
+                if on_token is not None:
+                    start = time.monotonic()
+                    response = self._pool.open_stream(
+                        endpoint.url, data, headers,
+                        timeout=self.config['timeout']
+                    )
+                    if response.status < 400:
+                        emitted = []
+
+                        def forward(piece):
+                            emitted.append(len(piece))
+                            on_token(piece)
+
+                        try:
+                            result = self._read_stream(
+                                response, forward, start, reserved_tokens, endpoint.limiter
+                            )
+                        except HttpTransportError as e:
+                            if emitted:
+                                # Czesc odpowiedzi jest juz u odbiorcy (dokument) -
+                                # ponowienie od poczatku zdublowaloby tekst
+                                return False, f"[BLAD] Przerwany strumien: {str(e.reason)}"
+                            raise
+                        ok = True
+                        return result
+                    status, response_headers = response.status, response.headers
+                    try:
+                        body = response.read()
+                    finally:
+                        response.close()
+                else:
+                    status, response_headers, body = self._pool.request(
+                        endpoint.url,
+                        data,
+                        headers,
+                        timeout=self.config['timeout'],
+                        gzip_request=self.config['gzip_request'],
+                        gzip_min_bytes=self.config['gzip_min_bytes']
+                    )
+
+                    if status < 400:
+                        ok = True
+                        result = json.loads(body.decode('utf-8'))
+
+                        usage = result.get('usage') or {}
+                        if reserved_tokens:
+                            endpoint.limiter.reconcile(reserved_tokens, usage.get('total_tokens', 0))
+                        self._observe_usage(messages, usage)
+
+                        return parse_completion(result)
+
+                ok = status < 500
+
+            except HttpTransportError as e:
+                status, response_headers, body = None, {}, b""
+                error = f"[BLAD] Brak polaczenia z internetem: {str(e.reason)}"
                 
-        except URLError as e:
-            return False, f"[BLAD] Brak polaczenia z internetem: {str(e.reason)}"
-            
-        except json.JSONDecodeError as e:
-            return False, f"[BLAD] Nieprawidlowa odpowiedz JSON: {str(e)}"
-            
-        except Exception as e:
-            return False, f"[BLAD] {type(e).__name__}: {str(e)}"
+            except json.JSONDecodeError as e:
+                return False, f"[BLAD] Nieprawidlowa odpowiedz JSON: {str(e)}"
+                
+            except Exception as e:
+                return False, f"[BLAD] {type(e).__name__}: {str(e)}"
+
+            finally:
+                balancer.release(endpoint, ok)
+
+            next_delay = self._plan_retry(
+                endpoint, status, response_headers, retry_count, delay, retry_budget, tried
+            )
+            if next_delay is None:
+                if status is None:
+                    return False, error
+                return False, http_error_message(status, body, self.config['model'])
+
+            retry_count += 1
+            self._thread_state.retries = getattr(self._thread_state, "retries", 0) + 1
+            if next_delay > 0:
+                delay = next_delay
+                if status != 429:
+                    # Przy 429 czeka wspoldzielony limiter (pause), tu tylko 5xx
+                    time.sleep(delay)
+
+    def _observe_usage(self, messages: List[Dict[str, str]], usage: Dict[str, Any]) -> None:
+        """Kalibruje estymator tokenow faktycznym usage.prompt_tokens."""
+        actual = usage.get('prompt_tokens') if isinstance(usage, dict) else None
+        if actual:
+            self._token_estimator.observe(
+                self._token_estimator.count_messages(messages), int(actual)
+            )
+
+    def _plan_retry(
+        self,
+        endpoint: Endpoint,
+        status: Optional[int],
+        headers: Dict[str, str],
+        retry_count: int,
+        previous_delay: float,
+        retry_budget: Optional[RetryBudget],
+        tried: set
+    ) -> Optional[float]:
+        """
+        Decyduje o dalszym losie nieudanego zapytania.
+
+        Kazde ponowienie - takze natychmiastowe przeniesienie na inny
+        endpoint - jest liczone w retry_budget.
+
+        Args:
+            status: Kod HTTP lub None (blad sieci)
+            tried: Endpointy, ktore zawiodly w tej rundzie (aktualizowane)
+
+        Returns:
+            None (nie ponawiac), 0 (od razu inny endpoint) lub opoznienie w s
+        """
+        if retry_count >= self.config['max_retries']:
+            return None
+        if status is not None and not is_retryable_status(status):
+            return None
+
+        tried.add(endpoint)
+        if self._balancer.has_alternative(tried):
+            # Przeniesienie na inny endpoint to tez ponowienie - z budzetu zadania
+            if retry_budget is not None and not retry_budget.try_spend():
+                return None
+            if status == 429:
+                retry_after = parse_retry_after((headers or {}).get('retry-after'))
+                endpoint.limiter.pause(
+                    retry_after if retry_after is not None else self.config['retry_base_delay']
+                )
+            return 0.0
+
+        if status is None:
+            return None
+
+        tried.clear()
+        return self._next_retry_delay(
+            status, headers, retry_count, previous_delay, retry_budget, endpoint.limiter
+        )
+
+    def _next_retry_delay(
+        self,
+        status: int,
+        headers: Dict[str, str],
+        retry_count: int,
+        previous_delay: float,
+        retry_budget: Optional[RetryBudget] = None,
+        limiter: Optional[RateLimiter] = None
+    ) -> Optional[float]:
+        """
+        Decyduje, czy ponowic zapytanie i po jakim czasie.
+
+        Retry-After ma pierwszenstwo; bez niego opoznienie jest losowane
+        (decorrelated jitter). Przy 429 wstrzymywany jest wspoldzielony
+        limiter, wiec ponowienia wszystkich watkow wracaja przez niego
+        w tempie RPM zamiast jednoczesnie.
+
+        Returns:
+            Opoznienie w sekundach lub None (nie ponawiac)
+        """
+        if not is_retryable_status(status) or retry_count >= self.config['max_retries']:
+            return None
+
+        base = float(self.config['retry_base_delay'])
+        cap = float(self.config['retry_max_delay'])
+
+        retry_after = parse_retry_after((headers or {}).get('retry-after'))
+        if retry_after is not None and retry_after > cap:
+            # Serwer kaze czekac dluzej niz pozwalamy - nie blokujemy zadania
+            return None
+
+        if retry_budget is not None and not retry_budget.try_spend():
+            return None
+
+        if retry_after is not None:
+            delay = retry_after + random.uniform(0, base)
+        else:
+            delay = decorrelated_jitter(previous_delay, base, cap)
+
+        if status == 429:
+            (limiter or self._rate_limiter).pause(delay)
+
+        return delay
+    
+    def _read_stream(
+        self,
+        response: HttpStreamResponse,
+        on_token: callable,
+        start: float,
+        reserved_tokens: int = 0,
+        limiter: Optional[RateLimiter] = None
+    ) -> Tuple[bool, str]:
+        """
+        Czyta odpowiedz SSE (zapytanie ze "stream": true).
+
+        Kazdy fragment `delta.content` jest przekazywany do on_token.
+        Wyjatek rzucony przez on_token przerywa strumien (anulowanie).
+        Zapisuje czas do pierwszego tokenu w last_stream_stats.
+
+        Returns:
+            Tuple (success: bool, result: str) - result to caly tekst
+        """
+        try:
+            parts = []
+            first_token_at = None
+            usage = {}
+
+            for raw_line in response.iter_lines():
+                chunk = parse_sse_line(raw_line)
+                if chunk is None:
+                    continue
+                if chunk is SSE_DONE:
+                    break
+
+                if 'error' in chunk:
+                    return False, f"[BLAD] Blad strumienia: {str(chunk['error'])[:200]}"
+
+                usage = chunk.get('usage') or usage
+                piece = stream_delta(chunk)
+                if not piece:
+                    continue
+
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
+                parts.append(piece)
+
+                try:
+                    on_token(piece)
+                except Exception as e:
+                    return False, f"[BLAD] Przerwano strumien: {type(e).__name__}: {str(e)}"
+
+            # Doczytaj reszte (koniec chunked), aby polaczenie wrocilo do puli
+            response.read()
+        finally:
+            response.close()
+
+        if reserved_tokens:
+            (limiter or self._rate_limiter).reconcile(reserved_tokens, usage.get('total_tokens', 0))
+
+        end = time.monotonic()
+        with self._stats_lock:
+            self.last_stream_stats = {
+                "ttft_s": round(first_token_at - start, 3) if first_token_at else None,
+                "duration_s": round(end - start, 3),
+                "chunks": len(parts),
+            }
+
+        content = "".join(parts)
+        if not content.strip():
+            return False, "[BLAD] Odpowiedz API jest pusta (null)"
+
+        return True, content.strip()
     
     # -------------------------------------------------------------------------
     # INTERFEJS PUBLICZNY
@@ -386,7 +1860,9 @@ class NvidiaNimBackend:
     def simplify_text(
         self, 
         text: str, 
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        on_token: Optional[callable] = None,
+        retry_budget: Optional[RetryBudget] = None
     ) -> Tuple[bool, str]:
         """
         Upraszcza tekst uzywajac modelu Bielik.
@@ -394,6 +1870,10 @@ class NvidiaNimBackend:
         Args:
             text: Tekst do uproszczenia
             system_prompt: Opcjonalny wlasny prompt systemowy
+            on_token: Opcjonalny callback(fragment) - wlacza strumieniowanie,
+                      fragmenty odpowiedzi przychodza na biezaco
+            retry_budget: Wspolny limit ponowien, gdy tekst jest czescia
+                          wiekszego zadania
         
         Returns:
             Tuple (success: bool, result: str)
@@ -403,18 +1883,79 @@ class NvidiaNimBackend:
         
         prompt = system_prompt or SYSTEM_PROMPT_PLAIN_LANGUAGE
         
+        cached = self._cached_result(prompt, text)
+        if cached is not None:
+            if on_token is not None:
+                try:
+                    on_token(cached)
+                except Exception as e:
+                    return False, f"[BLAD] Przerwano strumien: {type(e).__name__}: {str(e)}"
+            return True, cached
+        
         messages = [
             {"role": "system", "content": prompt},
             {"role": "user", "content": text.strip()}
         ]
         
-        return self._make_request(messages)
+        if on_token is not None:
+            # Strumien ma wlasnego odbiorce - bez wspoldzielenia
+            success, result = self._make_request(
+                messages, on_token=on_token, retry_budget=retry_budget
+            )
+            if success:
+                self._store_result(prompt, text, result)
+            return success, result
+        
+        # Singleflight: ten sam tekst w toku w innym watku - czekamy na
+        # jego wynik zamiast wysylac drugie zapytanie
+        key = self._cache_key(prompt, text)
+        with self._stats_lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = Future()
+            else:
+                self.dedup_stats["joined_in_flight"] += 1
+        if not leader:
+            return flight.result()
+        
+        success, result = False, "[BLAD] Zapytanie przerwane"
+        try:
+            success, result = self._make_request(messages, retry_budget=retry_budget)
+            if success:
+                self._store_result(prompt, text, result)
+        finally:
+            with self._stats_lock:
+                del self._in_flight[key]
+            flight.set_result((success, result))
+        
+        return success, result
+
+    def _cache_key(self, prompt: str, text: str) -> str:
+        return make_cache_key(
+            self.config['model'],
+            prompt,
+            self.config['temperature'],
+            self.config['max_tokens'],
+            text
+        )
+
+    def _cached_result(self, prompt: str, text: str) -> Optional[str]:
+        """Wynik z cache dla tekstu i promptu lub None."""
+        if self._cache is None:
+            return None
+        return self._cache.get(self._cache_key(prompt, text))
+
+    def _store_result(self, prompt: str, text: str, result: str) -> None:
+        if self._cache is not None:
+            self._cache.put(self._cache_key(prompt, text), result)
     
     def simplify_long_text(
         self, 
         text: str, 
         system_prompt: Optional[str] = None,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        retry_budget: Optional[RetryBudget] = None
     ) -> Tuple[bool, str]:
         """
         Upraszcza dlugi tekst dzielac go na czesci.
@@ -424,6 +1965,19 @@ class NvidiaNimBackend:
             system_prompt: Opcjonalny wlasny prompt systemowy
             progress_callback: Funkcja wywoływana po kazdym chunku
                               callback(current_chunk, total_chunks, partial_result)
+            retry_budget: Wspolny limit ponowien, gdy tekst jest czescia
+                          wiekszego zadania (domyslnie nowy z retry_budget)
+        
+        Czesci sa wysylane rownolegle (patrz simplify_many) i skladane
+        w oryginalnej kolejnosci. Jesli ktoras czesc sie nie powiedzie,
+        zwracany jest (False, tekst) z oryginalem tej czesci na jej
+        miejscu i lista bledow na koncu.
+        
+        Akapity juz w prostym jezyku (plain_flags) nie sa wysylane
+        i zostaja w wyniku bez zmian. Akapity powtorzone w tekscie
+        (dedupe_paragraphs) sa wysylane osobno i tylko raz. Odcinki
+        miedzy nimi sa zwykle krotkie, wiec ida przez simplify_packed
+        (po kilka w zapytaniu).
         
         Returns:
             Tuple (success: bool, result: str)
@@ -432,36 +1986,571 @@ class NvidiaNimBackend:
             return False, "[BLAD] Tekst jest pusty"
         
         text = text.strip()
-        chunk_size = self.config['chunk_size']
         
+        # Podziel tekst na chunki (z pominieciem akapitow juz prostych)
+        runs, chunks = self._plan_long_text(text, system_prompt)
+        if not chunks:
+            return True, text
+
         # Jesli tekst jest krotki, przetwarzaj normalnie
-        if len(text) <= chunk_size:
-            return self.simplify_text(text, system_prompt)
-        
-        # Podziel tekst na chunki
-        chunks = self._smart_chunk_text(text, chunk_size)
+        if len(runs) == 1 and len(chunks) == 1:
+            return self.simplify_text(text, system_prompt, None, retry_budget)
+
+        if self._packed_long_text(runs):
+            outcomes = self.simplify_packed(chunks, system_prompt, progress_callback, retry_budget)
+        else:
+            outcomes = self.simplify_many(chunks, system_prompt, progress_callback, retry_budget)
+        return self._join_long_text(runs, chunks, outcomes)
+
+    def _packed_long_text(self, runs) -> bool:
+        """
+        Czy czesci simplify_long_text ida przez simplify_packed.
+
+        Tak, gdy tekst ma kilka odcinkow, a wlaczone jest pakowanie
+        (pack_short_units) lub deduplikacja (dedupe_paragraphs) - bez
+        pakowania simplify_packed wysyla kazda czesc osobno, ale powtorzenia
+        tylko raz. Wspolne dla klienta synchronicznego i asyncio.
+        """
+        return len(runs) > 1 and bool(
+            self.config['pack_short_units'] or self.config['dedupe_paragraphs']
+        )
+
+    def _plan_long_text(self, text: str, system_prompt: Optional[str] = None):
+        """
+        Dzieli tekst na odcinki akapitow prostych i do wyslania.
+
+        Returns:
+            Tuple (runs, chunks): runs to lista (prosty, tekst, separator,
+            start, end) - odcinki sasiednich akapitow z tym samym wynikiem
+            plain_flags, z separatorem po odcinku; chunks[start:end] to
+            czesci odcinka do wyslania (pusto dla odcinka prostego).
+            Akapit powtorzony w tekscie tworzy wlasny odcinek, wiec jego
+            kopie daja identyczne czesci (simplify_packed wysle je raz).
+        """
+        parts = _PARAGRAPH_BREAK_RE.split(text)
+        paragraphs, separators = parts[0::2], parts[1::2] + [""]
+        flags = self.plain_flags(paragraphs, system_prompt)
+
+        repeated = set()
+        if self.config['dedupe_paragraphs']:
+            for first, later in duplicate_groups(paragraphs).items():
+                if not flags[first]:
+                    repeated.add(first)
+                    repeated.update(later)
+
+        groups = []
+        for i, (paragraph, separator, plain) in enumerate(zip(paragraphs, separators, flags)):
+            if groups and groups[-1][0] == plain and not (
+                    i in repeated or i - 1 in repeated):
+                groups[-1][1].append(paragraph)
+                groups[-1][2].append(separator)
+            else:
+                groups.append((plain, [paragraph], [separator]))
+
+        runs = []
+        chunks: List[str] = []
+        for plain, texts, seps in groups:
+            run_text = "".join(t + s for t, s in zip(texts[:-1], seps)) + texts[-1]
+            start = len(chunks)
+            if not plain:
+                chunks.extend(self.split_for_requests(run_text, system_prompt))
+            runs.append((plain, run_text, seps[-1], start, len(chunks)))
+        return runs, chunks
+
+    def _join_long_text(self, runs, chunks: List[str], outcomes: List[Tuple[bool, str]]) -> Tuple[bool, str]:
+        """Sklada wynik simplify_long_text z odcinkow i wynikow czesci."""
         total_chunks = len(chunks)
         results = []
-        
-        for i, chunk in enumerate(chunks):
-            success, result = self.simplify_text(chunk, system_prompt)
-            
-            if not success:
-                # Zwroc czesciowy wynik z bledem
-                partial = "\n\n".join(results)
-                return False, f"{partial}\n\n[BLAD w czesci {i+1}/{total_chunks}] {result}"
-            
-            results.append(result)
-            
-            # Callback dla progress bar
-            if progress_callback:
+        errors = []
+        for plain, run_text, separator, start, end in runs:
+            if plain:
+                results.append(run_text + separator)
+                continue
+            # Czesci z bledem zostaja w wersji oryginalnej, bledy dopisujemy na koncu
+            pieces = []
+            for i in range(start, end):
+                success, result = outcomes[i]
+                if success:
+                    pieces.append(result)
+                else:
+                    pieces.append(chunks[i])
+                    errors.append(f"[BLAD w czesci {i+1}/{total_chunks}] {result}")
+            results.append("\n\n".join(pieces) + separator)
+
+        if errors:
+            return False, "\n\n".join(["".join(results)] + errors)
+
+        return True, "".join(results)
+
+    def plain_flags(self, texts: List[str], system_prompt: Optional[str] = None) -> List[bool]:
+        """
+        Ktore teksty juz sa w prostym jezyku (backends/readability.py).
+
+        Tylko dla promptu prostego jezyka - przy wlasnym prompcie (inne
+        zadanie) i przy prefilter_plain = False wszystkie teksty ida do
+        modelu. Pominiecia sa liczone w prefilter_stats.
+        """
+        if not self.config['prefilter_plain'] or system_prompt not in (None, SYSTEM_PROMPT_PLAIN_LANGUAGE):
+            return [False] * len(texts)
+        flags = readability.plain_flags(
+            texts,
+            self.config['plain_max_sentence_words'],
+            self.config['plain_max_long_words'],
+            self.config['prefilter_processes']
+        )
+        with self._stats_lock:
+            self.prefilter_stats["checked"] += len(texts)
+            self.prefilter_stats["skipped"] += sum(flags)
+        return flags
+
+    def is_plain(self, text: str, system_prompt: Optional[str] = None) -> bool:
+        """plain_flags dla jednego tekstu."""
+        return bool(text.strip()) and self.plain_flags([text], system_prompt)[0]
+
+    def simplify_many(
+        self,
+        texts: List[str],
+        system_prompt: Optional[str] = None,
+        progress_callback: Optional[callable] = None,
+        retry_budget: Optional[RetryBudget] = None
+    ) -> List[Tuple[bool, str]]:
+        """
+        Upraszcza liste tekstow rownolegle (max_concurrency watkow).
+
+        Wszystkie zapytania przechodza przez wspoldzielony limiter, wiec
+        rownoleglosc nie przekracza limitu RPM. Wszystkie czesci dziela
+        jeden budzet ponowien (retry_budget). Blad jednej czesci nie
+        przerywa pozostalych - z wyjatkiem bledow klucza/dostepu, po
+        ktorych niewyslane czesci sa anulowane.
+
+        Args:
+            texts: Lista tekstow (np. chunkow dokumentu)
+            system_prompt: Opcjonalny wlasny prompt systemowy
+            progress_callback: callback(done, total, partial_result) wywolywany
+                              w watku wywolujacym po kazdej ukonczonej czesci;
+                              partial_result to ciagly poczatek wyniku w
+                              oryginalnej kolejnosci
+            retry_budget: Wspolny limit ponowien (domyslnie nowy z retry_budget)
+
+        Returns:
+            Lista (success, result) w kolejnosci wejsciowej
+        """
+        total = len(texts)
+        outcomes: List[Optional[Tuple[bool, str]]] = [None] * total
+        if total == 0:
+            return []
+
+        workers = max(1, min(int(self.config['max_concurrency']), total))
+        if retry_budget is None:
+            retry_budget = RetryBudget(self.config['retry_budget'])
+        done = 0
+        prefix_end = 0
+        prefix_results: List[str] = []
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    self.simplify_text, t, system_prompt, None, retry_budget
+                ): i
+                for i, t in enumerate(texts)
+            }
+
+            for future in as_completed(futures):
+                i = futures[future]
+                if future.cancelled():
+                    continue
                 try:
-                    progress_callback(i + 1, total_chunks, "\n\n".join(results))
-                except:
-                    pass
-        
-        return True, "\n\n".join(results)
+                    outcomes[i] = future.result()
+                except Exception as e:
+                    outcomes[i] = (False, f"[BLAD] {type(e).__name__}: {str(e)}")
+
+                success, result = outcomes[i]
+                if not success and is_fatal_error(result):
+                    for pending in futures:
+                        pending.cancel()
+
+                # Ciagly poczatek wyniku (dla podgladu postepu)
+                while prefix_end < total and outcomes[prefix_end] is not None:
+                    ok, res = outcomes[prefix_end]
+                    prefix_results.append(res if ok else texts[prefix_end])
+                    prefix_end += 1
+
+                done += 1
+                if progress_callback:
+                    try:
+                        progress_callback(done, total, "\n\n".join(prefix_results))
+                    except:
+                        pass
+
+        for i, outcome in enumerate(outcomes):
+            if outcome is None:
+                outcomes[i] = (False, "[BLAD] Anulowano po wczesniejszym bledzie")
+
+        return outcomes
     
+    def simplify_batch(
+        self,
+        texts: List[str],
+        system_prompt: Optional[str] = None,
+        previous: Optional[List[Dict[str, Any]]] = None,
+        progress_callback: Optional[callable] = None,
+        plain: Optional[List[bool]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Upraszcza liste akapitow z osobnym wynikiem dla kazdego.
+
+        Kazdy akapit to osobne zapytanie (blad jednego nie dotyka innych),
+        wysylane z puli max_concurrency watkow przez wspoldzielony limiter
+        i wspolny budzet ponowien. Akapity puste i juz w prostym jezyku nie
+        sa wysylane, powtorzenia (dedupe_paragraphs) - tylko raz. Po bledzie
+        klucza/dostepu niewyslane akapity sa anulowane.
+
+        Args:
+            texts: Lista akapitow
+            system_prompt: Opcjonalny wlasny prompt systemowy
+            previous: Wynik poprzedniego wywolania dla tych samych akapitow -
+                      wysylane sa tylko akapity ze statusem "failed"
+            progress_callback: callback(done, total, item) po kazdym zapytaniu
+            plain: Gotowe flagi plain_flags dla texts (np. od wywolujacego,
+                   ktory juz sprawdzil akapity) - bez ponownego sprawdzania
+
+        Returns:
+            Lista slownikow w kolejnosci wejsciowej:
+                status: "ok", "failed", "plain" (juz prosty) lub "empty"
+                text: wynik, a dla pozostalych statusow oryginal
+                error: komunikat [BLAD ...] lub None
+                latency_s: czas zapytania (0 dla niewyslanych)
+                retries: liczba ponowien zapytania
+                duplicate_of: indeks akapitu, ktorego wynik skopiowano, lub None
+        """
+        if previous is not None and len(previous) != len(texts):
+            raise ValueError("previous musi miec tyle elementow co texts")
+        if plain is not None and len(plain) != len(texts):
+            raise ValueError("plain musi miec tyle elementow co texts")
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        todo = []
+        for i, text in enumerate(texts):
+            if previous is not None and previous[i]["status"] != "failed":
+                results[i] = previous[i]
+            elif not text or not text.strip():
+                results[i] = _batch_item(text, "empty")
+            else:
+                todo.append(i)
+
+        if plain is None:
+            flags = self.plain_flags([texts[i] for i in todo], system_prompt)
+        else:
+            flags = [plain[i] for i in todo]
+        for i, skip in zip(todo, flags):
+            if skip:
+                results[i] = _batch_item(texts[i], "plain")
+        todo = [i for i, skip in zip(todo, flags) if not skip]
+
+        copies: Dict[int, List[int]] = {}
+        if self.config['dedupe_paragraphs']:
+            copies = {
+                todo[k]: [todo[j] for j in later]
+                for k, later in duplicate_groups([texts[i] for i in todo]).items()
+            }
+            repeated = {j for js in copies.values() for j in js}
+            with self._stats_lock:
+                self.dedup_stats["duplicates"] += len(repeated)
+            todo = [i for i in todo if i not in repeated]
+
+        total = len(todo)
+        workers = max(1, min(int(self.config['max_concurrency']), total or 1))
+        retry_budget = RetryBudget(self.config['retry_budget'])
+        done = 0
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._simplify_batch_item, texts[i], system_prompt, retry_budget): i
+                for i in todo
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                if future.cancelled():
+                    continue
+                try:
+                    item = future.result()
+                except Exception as e:
+                    item = _batch_item(texts[i], "failed", f"[BLAD] {type(e).__name__}: {str(e)}")
+
+                results[i] = item
+                for j in copies.get(i, ()):
+                    results[j] = dict(item, duplicate_of=i)
+                if item["status"] == "failed" and is_fatal_error(item["error"]):
+                    for pending in futures:
+                        pending.cancel()
+
+                done += 1
+                if progress_callback:
+                    try:
+                        progress_callback(done, total, item)
+                    except:
+                        pass
+
+        for i in todo:
+            if results[i] is None:
+                results[i] = _batch_item(texts[i], "failed", "[BLAD] Anulowano po wczesniejszym bledzie")
+                for j in copies.get(i, ()):
+                    results[j] = dict(results[i], duplicate_of=i)
+
+        return results
+
+    def _simplify_batch_item(
+        self, text: str, system_prompt: Optional[str], retry_budget: RetryBudget
+    ) -> Dict[str, Any]:
+        """simplify_text dla jednego akapitu simplify_batch, z czasem i ponowieniami."""
+        self._thread_state.retries = 0
+        start = time.monotonic()
+        success, result = self.simplify_text(text, system_prompt, None, retry_budget)
+        latency = time.monotonic() - start
+        if success:
+            item = _batch_item(result, "ok")
+        else:
+            item = _batch_item(text, "failed", result)
+        item["latency_s"] = round(latency, 3)
+        item["retries"] = self._thread_state.retries
+        return item
+
+    def simplify_packed(
+        self,
+        texts: List[str],
+        system_prompt: Optional[str] = None,
+        progress_callback: Optional[callable] = None,
+        retry_budget: Optional[RetryBudget] = None
+    ) -> List[Tuple[bool, str]]:
+        """
+        Upraszcza liste krotkich tekstow, laczac je po kilka w jedno zapytanie.
+
+        Kolejne teksty sa pakowane (backends/packing.py) do budzetu jednego
+        zapytania, najwyzej pack_max_units na paczke, i wysylane rownolegle
+        jak w simplify_many. Odpowiedz jest dzielona z powrotem wedlug
+        numerowanych znacznikow; teksty, ktorych fragment jest brakujacy
+        lub znieksztalcony, ida do osobnych zapytan. Wyniki z cache nie sa
+        wysylane, a nowe trafiaja do cache jak z simplify_text. Powtorzone
+        teksty (dedupe_paragraphs) sa wysylane raz, a wynik trafia do
+        kazdego wystapienia.
+
+        Args:
+            texts: Lista tekstow (np. akapitow)
+            system_prompt: Opcjonalny wlasny prompt systemowy
+            progress_callback: callback(done, total, partial_result) po kazdej
+                              paczce; partial_result jak w simplify_many,
+                              total rosnie o osobne zapytania dla
+                              fragmentow znieksztalconych
+            retry_budget: Wspolny limit ponowien (domyslnie nowy z retry_budget)
+
+        Returns:
+            Lista (success, result) w kolejnosci wejsciowej
+        """
+        prompt = system_prompt or SYSTEM_PROMPT_PLAIN_LANGUAGE
+        outcomes, packs, copies = self._plan_packs(texts, system_prompt)
+
+        def settle(i, result):
+            outcomes[i] = result
+            for j in copies.get(i, ()):
+                outcomes[j] = result
+
+        workers = max(1, min(int(self.config['max_concurrency']), len(packs) or 1))
+        if retry_budget is None:
+            retry_budget = RetryBudget(self.config['retry_budget'])
+        done = 0
+        total = len(packs)
+        prefix = _PackedPrefix(texts, outcomes)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for pack in packs:
+                if len(pack) == 1:
+                    future = executor.submit(
+                        self.simplify_text, texts[pack[0]], system_prompt, None, retry_budget
+                    )
+                else:
+                    future = executor.submit(
+                        self._simplify_pack, [texts[i] for i in pack], prompt, retry_budget
+                    )
+                futures[future] = pack
+
+            while futures:
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    pack = futures.pop(future)
+                    if future.cancelled():
+                        result = (False, "[BLAD] Anulowano po wczesniejszym bledzie")
+                    else:
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            result = (False, f"[BLAD] {type(e).__name__}: {str(e)}")
+
+                    if len(pack) == 1 or isinstance(result, tuple):
+                        # Zwykle zapytanie lub blad calej paczki
+                        for i in pack:
+                            settle(i, result)
+                        if not result[0] and is_fatal_error(result[1]):
+                            for other in futures:
+                                other.cancel()
+                    else:
+                        for i, part in zip(pack, result):
+                            if part is not None:
+                                settle(i, (True, part))
+                                continue
+                            # Fragment znieksztalcony - osobne zapytanie
+                            with self._stats_lock:
+                                self.pack_stats["fallback_units"] += 1
+                            retry = executor.submit(
+                                self.simplify_text, texts[i], system_prompt, None, retry_budget
+                            )
+                            futures[retry] = [i]
+                            total += 1
+
+                    done += 1
+                    if progress_callback:
+                        try:
+                            progress_callback(done, total, prefix.advance())
+                        except:
+                            pass
+
+        return [
+            outcome if outcome is not None else (False, "[BLAD] Brak wyniku")
+            for outcome in outcomes
+        ]
+
+    def _plan_packs(self, texts: List[str], system_prompt: Optional[str] = None):
+        """
+        Wyniki z cache i paczki do wyslania dla simplify_packed.
+
+        Returns:
+            Tuple (outcomes, packs, copies): outcomes to lista wynikow (None
+            dla tekstow do wyslania), packs - lista paczek (list indeksow),
+            copies - powtorzenia wysylanych tekstow (patrz duplicate_groups)
+        """
+        outcomes: List[Optional[Tuple[bool, str]]] = [None] * len(texts)
+        prompt = system_prompt or SYSTEM_PROMPT_PLAIN_LANGUAGE
+
+        copies: Dict[int, List[int]] = {}
+        duplicates = set()
+        if self.config['dedupe_paragraphs']:
+            copies = duplicate_groups(texts)
+            duplicates = {j for later in copies.values() for j in later}
+            with self._stats_lock:
+                self.dedup_stats["duplicates"] += len(duplicates)
+
+        pending = []
+        for i, text in enumerate(texts):
+            if i in duplicates:
+                continue
+            if not text or not text.strip():
+                outcomes[i] = (False, "[BLAD] Tekst jest pusty")
+                continue
+            cached = self._cached_result(prompt, text)
+            if cached is not None:
+                outcomes[i] = (True, cached)
+            else:
+                pending.append(i)
+
+        # Bez pakowania (pack_short_units) kazdy tekst to osobne zapytanie
+        packing = self.config['pack_short_units']
+        packable = [i for i in pending if packing and can_pack(texts[i])]
+        packs = [[i] for i in pending if not (packing and can_pack(texts[i]))]
+        budget, measure = self.request_budget(system_prompt)
+        for pack in pack_units(
+            [measure(texts[i]) for i in packable],
+            budget,
+            max(1, int(self.config['pack_max_units'])),
+            measure(format_pack(["x"])) - measure("x")
+        ):
+            packs.append([packable[k] for k in pack])
+
+        # Powtorzenia tekstow juz rozstrzygnietych (puste, z cache)
+        for i, later in copies.items():
+            if outcomes[i] is not None:
+                for j in later:
+                    outcomes[j] = outcomes[i]
+        return outcomes, packs, copies
+
+    def _simplify_pack(self, texts: List[str], prompt: str, retry_budget: Optional[RetryBudget]):
+        """
+        Wysyla paczke tekstow jednym zapytaniem.
+
+        Returns:
+            Lista wynikow (None dla fragmentow znieksztalconych) lub
+            (False, blad), gdy zapytanie sie nie udalo
+        """
+        success, response = self._make_request(
+            _pack_messages(texts, prompt), retry_budget=retry_budget
+        )
+        if not success:
+            return False, response
+        return self._unpack_response(texts, prompt, response)
+
+    def _unpack_response(self, texts: List[str], prompt: str, response: str) -> List[Optional[str]]:
+        """Dzieli odpowiedz na paczke, zapisuje dobre fragmenty w cache."""
+        parts = parse_pack(response, len(texts))
+        for text, part in zip(texts, parts):
+            if part is not None:
+                self._store_result(prompt, text, part)
+
+        with self._stats_lock:
+            self.pack_stats["packs"] += 1
+            self.pack_stats["packed_units"] += len(texts)
+        return parts
+
+    def chunk_token_budget(self, system_prompt: Optional[str] = None) -> int:
+        """
+        Budzet tokenow wejscia na jedna czesc tekstu.
+
+        chunk_tokens z konfiguracji lub automatycznie: tyle, by odpowiedz
+        (do output_expansion razy dluzsza) zmiescila sie w max_tokens,
+        a prompt systemowy, tekst i odpowiedz - w oknie kontekstu.
+        """
+        if self.config['chunk_tokens']:
+            return max(1, int(self.config['chunk_tokens']))
+
+        prompt_tokens = self._token_estimator.count(
+            system_prompt or SYSTEM_PROMPT_PLAIN_LANGUAGE
+        )
+        context_room = (
+            int(self.config['context_window'])
+            - int(self.config['max_tokens'])
+            - prompt_tokens
+            - 64  # Szablon czatu i zapas
+        )
+        output_room = int(self.config['max_tokens'] / max(0.1, float(self.config['output_expansion'])))
+        return max(1, min(context_room, output_room))
+
+    def request_budget(self, system_prompt: Optional[str] = None) -> Tuple[int, Callable[[str], int]]:
+        """
+        Rozmiar jednej czesci i funkcja mierzaca tekst w tych samych jednostkach.
+
+        Returns:
+            (budzet tokenow, estymator.count) przy chunk_by_tokens=True,
+            inaczej (chunk_size, len)
+        """
+        if self.config['chunk_by_tokens']:
+            return self.chunk_token_budget(system_prompt), self._token_estimator.count
+        return int(self.config['chunk_size']), len
+
+    def split_for_requests(self, text: str, system_prompt: Optional[str] = None) -> List[str]:
+        """
+        Dzieli tekst na czesci do osobnych zapytan.
+
+        Przy chunk_by_tokens=True czesci sa wypelniane do budzetu tokenow
+        (chunk_token_budget), w przeciwnym razie do chunk_size znakow.
+        """
+        if self.config['chunk_by_tokens']:
+            budget = self.chunk_token_budget(system_prompt)
+            if self._token_estimator.count(text) <= budget:
+                return [text]
+            return chunk_text_by_tokens(text, budget, self._token_estimator)
+
+        if len(text) <= self.config['chunk_size']:
+            return [text]
+        return self._smart_chunk_text(text, self.config['chunk_size'])
+
     def _smart_chunk_text(self, text: str, max_size: int) -> List[str]:
         """
         Inteligentnie dzieli tekst na czesci.
@@ -469,72 +2558,20 @@ class NvidiaNimBackend:
         Priorytet podzialu:
         1. Podwojny enter (akapity)
         2. Pojedynczy enter
-        3. Koniec zdania (. ! ?)
+        3. Koniec zdania (. ! ? - z pominieciem skrotow, dat i inicjalow)
         4. Przecinek lub srednik
         5. Spacja
+
+        Szczegoly w backends/chunking.py.
         """
-        chunks = []
-        current_pos = 0
-        
-        while current_pos < len(text):
-            # Okresl koniec tego chunka
-            end_pos = min(current_pos + max_size, len(text))
-            
-            # Jesli to ostatni chunk, dodaj reszte
-            if end_pos >= len(text):
-                chunks.append(text[current_pos:].strip())
-                break
-            
-            # Szukaj najlepszego punktu podzialu
-            chunk_text = text[current_pos:end_pos]
-            
-            # Priorytet 1: Podwojny enter (akapit)
-            split_pos = chunk_text.rfind("\n\n")
-            if split_pos > max_size * 0.3:
-                chunks.append(text[current_pos:current_pos + split_pos].strip())
-                current_pos = current_pos + split_pos + 2
-                continue
-            
-            # Priorytet 2: Pojedynczy enter
-            split_pos = chunk_text.rfind("\n")
-            if split_pos > max_size * 0.5:
-                chunks.append(text[current_pos:current_pos + split_pos].strip())
-                current_pos = current_pos + split_pos + 1
-                continue
-            
-            # Priorytet 3: Koniec zdania
-            for punct in [". ", "! ", "? "]:
-                split_pos = chunk_text.rfind(punct)
-                if split_pos > max_size * 0.5:
-                    chunks.append(text[current_pos:current_pos + split_pos + 1].strip())
-                    current_pos = current_pos + split_pos + 2
-                    break
-            else:
-                # Priorytet 4: Przecinek lub srednik
-                for punct in [", ", "; "]:
-                    split_pos = chunk_text.rfind(punct)
-                    if split_pos > max_size * 0.5:
-                        chunks.append(text[current_pos:current_pos + split_pos + 1].strip())
-                        current_pos = current_pos + split_pos + 2
-                        break
-                else:
-                    # Priorytet 5: Spacja
-                    split_pos = chunk_text.rfind(" ")
-                    if split_pos > 0:
-                        chunks.append(text[current_pos:current_pos + split_pos].strip())
-                        current_pos = current_pos + split_pos + 1
-                    else:
-                        # Ostatecznosc: twardy podzial
-                        chunks.append(chunk_text.strip())
-                        current_pos = end_pos
-        
-        return [c for c in chunks if c]  # Usun puste
+        return chunk_text(text, max_size)
     
     def chat(
         self, 
         user_message: str,
         conversation_history: Optional[List[Dict[str, str]]] = None,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        on_token: Optional[callable] = None
     ) -> Tuple[bool, str]:
         """
         Ogolny chat z modelem (nie tylko upraszczanie).
@@ -543,6 +2580,7 @@ class NvidiaNimBackend:
             user_message: Wiadomosc uzytkownika
             conversation_history: Opcjonalna historia konwersacji
             system_prompt: Opcjonalny prompt systemowy
+            on_token: Opcjonalny callback(fragment) dla trybu strumieniowego
         
         Returns:
             Tuple (success: bool, response: str)
@@ -557,7 +2595,7 @@ class NvidiaNimBackend:
         
         messages.append({"role": "user", "content": user_message})
         
-        return self._make_request(messages)
+        return self._make_request(messages, on_token=on_token)
     
     def test_connection(self) -> Tuple[bool, str]:
         """
@@ -588,7 +2626,21 @@ class NvidiaNimBackend:
             "endpoint": self.config['endpoint'],
             "api_key_status": masked_key,
             "rate_limit_rpm": self.config['rate_limit_rpm'],
+            "rate_limit_burst": self.config['rate_limit_burst'],
+            "rate_limit_tpm": self.config['rate_limit_tpm'],
+            "rate_limit_wait_s": round(self._rate_limiter.total_wait, 2),
+            "rate_limit_pauses": self._rate_limiter.pauses,
+            "last_ttft_s": (self.last_stream_stats or {}).get("ttft_s"),
             "request_count": self._request_count,
+            "http_connections_created": self._pool.created,
+            "http_connections_reused": self._pool.reused,
+            "endpoints": [e.info() for e in self._balancer.endpoints],
+            "chunk_token_budget": self.chunk_token_budget() if self.config['chunk_by_tokens'] else None,
+            "token_estimator_scale": round(self._token_estimator.scale, 3),
+            "pack_stats": dict(self.pack_stats),
+            "prefilter_stats": dict(self.prefilter_stats),
+            "dedup_stats": dict(self.dedup_stats),
+            "cache": self._cache.stats() if self._cache is not None else None,
         }
 
 
@@ -635,23 +2687,73 @@ def process_paragraphs(paragraphs: List[str]) -> List[str]:
         Lista uproszczonych akapitow
     """
     backend = get_backend()
-    results = []
+    results = list(paragraphs)
     
-    for para in paragraphs:
-        if not para or not para.strip():
-            results.append(para)
-            continue
-        
-        success, result = backend.simplify_text(para)
+    texts = [(i, para) for i, para in enumerate(paragraphs) if para and para.strip()]
+    # Akapity juz w prostym jezyku zostaja bez zmian (prefilter_stats)
+    plain = backend.plain_flags([para for _, para in texts])
+    texts = [item for item, skip in zip(texts, plain) if not skip]
+    
+    # Powtorzone akapity (stopki, pouczenia) - jedno zapytanie na tresc
+    copies: Dict[int, List[int]] = {}
+    if backend.config['dedupe_paragraphs']:
+        copies = duplicate_groups([para for _, para in texts])
+        repeated = {j for js in copies.values() for j in js}
+        with backend._stats_lock:
+            backend.dedup_stats["duplicates"] += len(repeated)
+        unique = [k for k in range(len(texts)) if k not in repeated]
+    else:
+        unique = list(range(len(texts)))
+    
+    if backend.config['pack_short_units']:
+        # Krotkie akapity po kilka w jednym zapytaniu
+        outcomes = backend.simplify_packed([texts[k][1] for k in unique])
+    else:
+        # Jedno zapytanie na akapit, rownolegle (simplify_batch); akapity
+        # sa juz sprawdzone przez plain_flags powyzej
+        outcomes = [
+            (item["status"] == "ok", item["text"])
+            for item in backend.simplify_batch(
+                [texts[k][1] for k in unique], plain=[False] * len(unique)
+            )
+        ]
+    
+    for k, (success, result) in zip(unique, outcomes):
+        # W przypadku bledu, zachowaj oryginal
         if success:
-            results.append(result)
-        else:
-            # W przypadku bledu, zachowaj oryginal
-            results.append(para)
+            for j in [k] + copies.get(k, []):
+                results[texts[j][0]] = result
     
     return results
 
 
+def process_paragraphs_batch(
+    paragraphs: List[str],
+    previous: Optional[List[Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Przetwarza liste akapitow, zwracajac wynik kazdego osobno.
+
+    Dla skryptow integracyjnych: w przeciwienstwie do process_paragraphs
+    blad nie jest ukrywany - kazdy element ma status, czas, liczbe
+    ponowien i komunikat bledu (patrz NvidiaNimBackend.simplify_batch).
+
+    Args:
+        paragraphs: Lista akapitow do uproszczenia
+        previous: Wynik poprzedniego wywolania - ponawiane sa tylko
+                  akapity ze statusem "failed"
+
+    Returns:
+        Lista wynikow w kolejnosci akapitow
+
+    Przyklad:
+        results = process_paragraphs_batch(paragraphs)
+        if any(r["status"] == "failed" for r in results):
+            results = process_paragraphs_batch(paragraphs, previous=results)
+    """
+    return get_backend().simplify_batch(paragraphs, previous=previous)
+
+
 # =============================================================================
 # TRYB TESTOWY
 # =============================================================================
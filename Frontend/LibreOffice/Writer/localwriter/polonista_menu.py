@@ -45,6 +45,33 @@ except ImportError:
         NvidiaNimBackend = None
         get_backend = None
 
+# Operacje na akapitach (tryb przyrostowy)
+try:
+    import writer_document
+except ImportError:
+    try:
+        from . import writer_document
+    except ImportError:
+        writer_document = None
+
+# Zadania w tle (praca poza watkiem interfejsu)
+try:
+    import background_job
+except ImportError:
+    try:
+        from . import background_job
+    except ImportError:
+        background_job = None
+
+# Sesja edycji (jeden krok cofania, zablokowany widok przy zapisie)
+try:
+    import edit_session
+except ImportError:
+    try:
+        from . import edit_session
+    except ImportError:
+        edit_session = None
+
 
 # =============================================================================
 # STALE KONFIGURACYJNE
@@ -212,6 +239,76 @@ def _get_selection():
         return None, f"Blad pobierania zaznaczenia: {str(e)}"
 
 
+class _SelectionStreamWriter:
+    """
+    Wpisuje strumieniowana odpowiedz w miejsce zaznaczenia.
+
+    Zaznaczenie jest czyszczone dopiero przy pierwszym fragmencie, wiec
+    blad przed startem strumienia nie rusza dokumentu. Kazdy fragment
+    jest dopisywany kursorem na koncu (bez przepisywania calosci).
+    """
+
+    def __init__(self, text_range, original_text):
+        self.text_range = text_range
+        self.original_text = original_text
+        self.text = text_range.getText()
+        self.cursor = None
+        self.span = None
+        self.toolkit = None
+        try:
+            ctx = XSCRIPTCONTEXT.getComponentContext()
+            self.toolkit = ctx.getServiceManager().createInstanceWithContext(
+                "com.sun.star.awt.Toolkit", ctx
+            )
+        except Exception:
+            pass
+
+    def on_token(self, token):
+        """Callback dla backend.simplify_text(..., on_token=...)."""
+        if self.cursor is None:
+            self.text_range.setString("")
+            self.cursor = self.text.createTextCursorByRange(self.text_range.getStart())
+            self.cursor.setString(token)
+            # Poczatek calego wyniku = poczatek pierwszego fragmentu
+            self.span = self.text.createTextCursorByRange(self.cursor)
+        else:
+            self.cursor.collapseToEnd()
+            self.cursor.setString(token)
+
+        if self.toolkit is not None:
+            self.toolkit.processEventsToIdle()
+
+    def finish(self, success, result):
+        """Ustawia tekst koncowy albo przywraca oryginal po bledzie."""
+        if self.cursor is None:
+            if success:
+                self.text_range.setString(result)
+            return
+
+        self.span.gotoRange(self.cursor.getEnd(), True)
+        self.span.setString(result if success else self.original_text)
+
+
+def _edit_session(doc, backend=None, background=False):
+    """
+    Sesja edycji dokumentu dla jednego makra.
+
+    W zadaniu w tle (background) kontekst cofania obejmuje jedna partie
+    zapisow - zmiany uzytkownika w trakcie zadania nie trafiaja do niego;
+    partie skladaja sie na jeden krok, dopoki uzytkownik nie edytuje
+    miedzy nimi.
+
+    Returns:
+        edit_session.EditSession albo None (brak edit_session.py)
+    """
+    if edit_session is None or doc is None:
+        return None
+    flush_writes = 0
+    if backend is not None:
+        flush_writes = backend.config.get("edit_flush_writes", 0)
+    return edit_session.EditSession(doc, POLONISTA_NAME, flush_writes, background)
+
+
 def _get_backend_instance():
     """Zwraca instancje backendu NVIDIA NIM."""
     if get_backend is not None:
@@ -263,15 +360,20 @@ def RedagujZaznaczenie(*args):
         )
         return
     
-    # Wywolaj API
-    success, result = backend.simplify_text(text)
-    
-    if success:
-        # Zamien tekst na uproszczony
-        text_range.setString(result)
-        # Opcjonalnie: pokaz potwierdzenie
-        # _show_message(POLONISTA_NAME, "Tekst zostal uproszczony!", 0)
-    else:
+    # Wywolaj API - odpowiedz pojawia sie w dokumencie na biezaco; wszystkie
+    # fragmenty i tekst koncowy to jeden krok cofania
+    session = _edit_session(_get_document(), backend)
+    if session is not None:
+        session.open()
+    try:
+        writer = _SelectionStreamWriter(text_range, text)
+        success, result = backend.simplify_text(text, on_token=writer.on_token)
+        writer.finish(success, result)
+    finally:
+        if session is not None:
+            session.close()
+    
+    if not success:
         _show_message(POLONISTA_NAME + " - Blad", result, 2)
 
 
@@ -304,8 +406,74 @@ def RedagujCayDokument(*args):
         _show_message(POLONISTA_NAME + " - Konfiguracja", msg, 1)
         return
     
-    # Pobierz caly tekst
     try:
+        if writer_document is not None:
+            # Akapity czytane i zapisywane grupami - bez getString() calego
+            # dokumentu; juz uproszczone (odciski) sa pomijane
+            known = writer_document.load_fingerprints(doc)
+            char_count = writer_document.document_char_count(doc)
+            
+            # Ostrzezenie przed dluga operacja
+            if not known and char_count and char_count > 5000:
+                _show_message(
+                    POLONISTA_NAME,
+                    f"Dokument ma {char_count} znakow.\n"
+                    "Przetwarzanie moze zajac kilka minut.\n\n"
+                    "Kliknij OK aby kontynuowac.",
+                    0
+                )
+            
+            def finished(result, error):
+                if error is not None:
+                    _show_message(
+                        POLONISTA_NAME + " - Blad",
+                        f"Blad przetwarzania dokumentu:\n{str(error)}",
+                        2
+                    )
+                    return
+                success, summary = result
+                if not (summary["changed"] or summary["skipped"] or summary["plain"] or summary["stale"]
+                        or summary["failed"]):
+                    _show_message(POLONISTA_NAME, "Dokument jest pusty", 1)
+                elif success and not known and not summary["stale"]:
+                    _show_message(POLONISTA_NAME, "Caly dokument zostal uproszczony!", 0)
+                else:
+                    _show_message(
+                        POLONISTA_NAME,
+                        writer_document.format_summary(summary),
+                        0 if success else 2
+                    )
+            
+            if background_job is None:
+                # Caly wynik to jeden krok cofania, zapis partii przy
+                # zablokowanym widoku
+                try:
+                    finished(writer_document.simplify_document_streaming(
+                        doc, backend, known, session=_edit_session(doc, backend)
+                    ), None)
+                except Exception as e:
+                    finished(None, e)
+                return
+            
+            # Zapytania w watku roboczym - LibreOffice dziala dalej, postep
+            # i czas do konca na pasku stanu dokumentu
+            ctx = XSCRIPTCONTEXT.getComponentContext()
+            job = background_job.BackgroundJob(ctx, doc, POLONISTA_NAME)
+            session = _edit_session(doc, backend, background=True)
+            summary = {}
+            
+            def work(job):
+                def progress(done, submitted, result):
+                    job.progress(summary["chars"], char_count or 0, "znakow")
+                return writer_document.simplify_document_streaming(
+                    doc, backend, known, progress, job.call, summary, session
+                )
+            
+            if not job.start(work, finished):
+                _show_message(POLONISTA_NAME, "Ten dokument jest juz upraszczany.", 1)
+            return
+        
+        # Pobierz caly tekst
         text = doc.getText()
         full_text = text.getString()
         
@@ -364,10 +532,14 @@ UZYCIE:
     
     if backend is not None:
         backend_info = backend.get_info()
+        cache_info = backend_info.get('cache') or {}
+        cache_hits = cache_info.get('memory_hits', 0) + cache_info.get('disk_hits', 0)
         info_text += f"""KONFIGURACJA:
 Model: {backend_info.get('model', 'N/A')}
 Klucz API: {backend_info.get('api_key_status', 'N/A')}
 Zapytan wykonanych: {backend_info.get('request_count', 0)}
+Czas do pierwszego tokenu: {backend_info.get('last_ttft_s') or '-'} s
+Cache: {cache_hits} trafien / {cache_info.get('misses', 0)} chybien
 
 """
     else:
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+localwriter/tests
+=================
+
+Testy funkcji pomocniczych bez LibreOffice i bez API NVIDIA (pytest):
+- test_helpers.py - dzielenie tekstu, granice zdan, paczki, filtr prostego
+  jezyka, przypisanie wierszy wyniku akapitom, czas do konca
+
+UZYCIE (z katalogu localwriter/):
+    python -m pytest tests
+"""
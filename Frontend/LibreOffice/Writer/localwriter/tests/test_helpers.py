@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+test_helpers.py - Testy czystych funkcji pomocniczych
+=====================================================
+
+UZYCIE (z katalogu localwriter/):
+    python -m pytest tests
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import absolute_import
+
+import os
+import sys
+
+import pytest
+
+# Katalog localwriter/ na sciezce (import backends)
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from background_job import estimate_eta, format_eta
+from backends.chunking import SENTENCE_END, chunk_text, last_boundary
+from backends.packing import can_pack, format_pack, pack_units, parse_pack
+from backends.readability import fold, is_plain, plain_flags, score_paragraph
+from writer_document import map_result_lines, paragraph_offsets
+from backends.sentences import last_sentence_end, sentence_ends, split_sentences
+
+
+# =============================================================================
+# DZIELENIE TEKSTU (backends/chunking.py)
+# =============================================================================
+
+def test_chunk_text_short_text_is_one_chunk():
+    assert chunk_text("  Krotki tekst.  ", 100) == ["Krotki tekst."]
+
+
+def test_chunk_text_prefers_paragraph_break():
+    text = "A" * 40 + ".\n\n" + "B" * 40 + ". " + "C" * 30
+    assert chunk_text(text, 100) == ["A" * 40 + ".", "B" * 40 + ". " + "C" * 30]
+
+
+def test_chunk_text_cuts_after_sentence():
+    first = "Wniosek zlozono w terminie w urzedzie gminy."
+    second = " Organ rozpatrzy go niezwlocznie po wplynieciu dokumentow"
+    assert chunk_text(first + second, len(first) + 10)[0] == first
+
+
+def test_chunk_text_does_not_cut_after_abbreviation():
+    # "np. Urzad" to nie koniec zdania - podzial na przecinku przed nim
+    text = "Wniosek zlozono w terminie w urzedzie, np. Urzad Gminy Lipno przyjal go bez uwag."
+    assert chunk_text(text, 60)[0] == "Wniosek zlozono w terminie w urzedzie,"
+
+
+def test_chunk_text_falls_back_to_space_and_hard_cut():
+    assert chunk_text("aaaa bbbb cccc", 10) == ["aaaa bbbb", "cccc"]
+    assert chunk_text("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_chunk_text_chunks_fit_and_keep_words():
+    text = " ".join("slowo%d" % i for i in range(500))
+    chunks = chunk_text(text, 120)
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_chunk_text_rejects_non_positive_size():
+    with pytest.raises(ValueError):
+        chunk_text("tekst", 0)
+
+
+def test_last_boundary_matches_window_rfind():
+    text = "ab, cd; ef, gh\nij, kl"
+    for start in range(len(text)):
+        for end in range(start, len(text) + 1):
+            found = text[start:end].rfind(", ")
+            expected = start + found if found >= 0 else -1
+            assert last_boundary(text, ", ", start, end) == expected
+
+
+def test_last_boundary_sentence_end():
+    text = 'Zdanie. Powiedzial: "Tak." Np. Dalej'
+    assert last_boundary(text, SENTENCE_END, 0, len(text)) == text.index('"T') + 5
+    assert last_boundary(text, SENTENCE_END, 0, 8) == 6
+    assert last_boundary(text, SENTENCE_END, 8, 20) == -1
+
+
+# =============================================================================
+# GRANICE ZDAN (backends/sentences.py)
+# =============================================================================
+
+@pytest.mark.parametrize("text", [
+    "Dotyczy to m.in. Wnioskodawcy i jego rodziny.",
+    "Dokumenty, np. Zaswiadczenie o dochodach, nalezy dolaczyc.",
+    "Tzw. Karta Duzej Rodziny nie jest wymagana.",
+    "Stosuje sie art. 5 ust. 2 ustawy.",
+    "Decyzje podpisal J. Kowalski z urzedu.",
+    "Termin uplynal 12. 03. 2024 roku.",
+])
+def test_abbreviations_do_not_end_sentence(text):
+    assert split_sentences(text) == [text]
+
+
+def test_split_sentences_on_real_boundaries():
+    text = "Wniosek przyjeto. Czy jest kompletny? Tak! Organ wyda decyzje..."
+    assert split_sentences(text) == [
+        "Wniosek przyjeto.", "Czy jest kompletny?", "Tak!", "Organ wyda decyzje..."
+    ]
+
+
+def test_final_abbreviation_ends_sentence_before_capital():
+    assert split_sentences("Oplaty, podatki itd. Organ czeka.") == [
+        "Oplaty, podatki itd.", "Organ czeka."
+    ]
+    assert split_sentences("Oplaty itd. wplaca sie w terminie.") == [
+        "Oplaty itd. wplaca sie w terminie."
+    ]
+
+
+def test_numbered_points_at_line_start_are_not_boundaries():
+    text = "1. Wniosek\nII. Przepisy ogolne"
+    assert list(sentence_ends(text)) == []
+
+
+def test_sentence_ends_positions_point_at_terminator():
+    # Pozycja zamkniecia cudzyslowu; koniec tekstu nie jest zwracany
+    text = 'Ala ma kota. Powiedzial: "Tak." Potem wyszedl.'
+    assert [text[i] for i in sentence_ends(text)] == [".", '"']
+
+
+def test_last_sentence_end_matches_forward_scan():
+    text = " ".join(["Zdanie numer %d, art. 5 ust. 2 np. Dz.U. obowiazuje." % i for i in range(40)])
+    ends = list(sentence_ends(text))
+    for start, end in [(0, len(text)), (100, 700), (0, 30), (250, 900), (1500, len(text))]:
+        inside = [p for p in ends if start <= p <= end - 2]
+        assert last_sentence_end(text, start, end) == (inside[-1] if inside else -1)
+
+
+# =============================================================================
+# PACZKI KROTKICH TEKSTOW (backends/packing.py)
+# =============================================================================
+
+def test_parse_pack_round_trip():
+    texts = ["Pierwszy tekst.", "Drugi\nw dwoch wierszach.", "Trzeci."]
+    assert parse_pack(format_pack(texts), 3) == texts
+
+
+def test_parse_pack_tolerates_marker_spacing():
+    assert parse_pack("  <<< 1 >>>\nA\n<<<2>>>  \nB", 2) == ["A", "B"]
+
+
+def test_parse_pack_missing_marker_drops_neighbour():
+    # Bez <<<2>>> tresc 2 mogla trafic do fragmentu 1
+    assert parse_pack("<<<1>>>\nA\nB\n<<<3>>>\nC", 3) == [None, None, "C"]
+
+
+def test_parse_pack_rejects_empty_duplicated_and_unknown():
+    assert parse_pack("<<<1>>>\n\n<<<2>>>\nB", 2) == [None, "B"]
+    assert parse_pack("<<<1>>>\nA\n<<<1>>>\nA2\n<<<2>>>\nB", 2) == [None, "B"]
+    assert parse_pack("<<<1>>>\nA\n<<<2>>>\nB\n<<<7>>>\nX", 2) == ["A", None]
+
+
+def test_parse_pack_without_markers():
+    assert parse_pack("Model odpowiedzial bez znacznikow.", 2) == [None, None]
+    assert parse_pack("tekst <<<1>>> w srodku wiersza", 1) == [None]
+
+
+def test_can_pack_refuses_marker_text():
+    assert can_pack("Zwykly tekst")
+    assert not can_pack("Tekst z <<<1>>> w srodku")
+
+
+def test_pack_units_respects_budget_and_count():
+    assert pack_units([3, 3, 3, 3], 10, 10, marker_size=1) == [[0, 1], [2, 3]]
+    assert pack_units([1] * 5, 100, 2) == [[0, 1], [2, 3], [4]]
+
+
+def test_pack_units_oversized_text_gets_own_pack():
+    assert pack_units([2, 50, 2], 10, 10) == [[0], [1], [2]]
+    assert pack_units([], 10, 10) == []
+
+
+# =============================================================================
+# FILTR PROSTEGO JEZYKA (backends/readability.py)
+# =============================================================================
+
+def test_fold_strips_polish_letters():
+    assert fold("Należy ZŁOŻYĆ") == "nalezy zlozyc"
+
+
+def test_score_paragraph_counts():
+    score = score_paragraph("Tzw. wniosek zlozyl Jan. Decyzja zostala wydana wczoraj.")
+    assert score["sentences"] == 2
+    assert score["words"] == 8
+    assert score["longest_sentence"] == 4
+    assert score["passive"] == 1
+    assert score["jargon"] == 1
+
+
+def test_score_paragraph_abbreviation_does_not_split_sentence():
+    score = score_paragraph("Przyjdz np. Jutro albo w piatek po poludniu.")
+    assert score["sentences"] == 1
+    assert score["longest_sentence"] == 8
+
+
+@pytest.mark.parametrize("text", [
+    "Mozesz zlozyc wniosek w urzedzie. Pomozemy Ci go wypelnic.",
+    "Zadzwon do nas. Odpowiemy szybko.",
+])
+def test_is_plain_accepts_plain_language(text):
+    assert is_plain(text)
+
+
+@pytest.mark.parametrize("text", [
+    # zargon
+    "Nalezy zlozyc wniosek w urzedzie.",
+    # strona bierna
+    "Wniosek zostal rozpatrzony wczoraj.",
+    "Przyznano Ci zasilek.",
+    # skrot z listy
+    "Przynies dokumenty, np. dowod osobisty.",
+    # slowa obce
+    "Deadline mija jutro.",
+    # zdanie dluzsze niz 15 slow
+    " ".join(["slowo"] * 16) + ".",
+])
+def test_is_plain_rejects(text):
+    assert not is_plain(text)
+
+
+def test_is_plain_limits_are_configurable():
+    text = " ".join(["slowo"] * 16) + "."
+    assert is_plain(text, max_sentence_words=20)
+
+
+def test_plain_flags_keeps_order():
+    texts = ["Zadzwon do nas.", "Nalezy zadzwonic.", "Odpowiemy szybko."]
+    assert plain_flags(texts) == [True, False, True]
+
+
+# =============================================================================
+# WIERSZE WYNIKU -> AKAPITY (writer_document.py)
+# =============================================================================
+
+def test_paragraph_offsets():
+    texts = ["abc", "", "de"]
+    assert paragraph_offsets(texts) == [0, 4, 5]
+    joined = "\n".join(texts)
+    assert [joined[o:o + len(t)] for o, t in zip(paragraph_offsets(texts), texts)] == texts
+
+
+def test_map_result_lines_one_to_one_keeps_empty_paragraphs():
+    texts = ["Pierwszy akapit.", "", "Drugi akapit."]
+    assert map_result_lines(texts, "Jeden.\n\nDwa.") == ["Jeden.", "", "Dwa."]
+
+
+def test_map_result_lines_split_paragraph_stays_in_place():
+    texts = ["A" * 10, "B" * 90]
+    result = "a" * 10 + "\n" + "b" * 40 + "\n" + "b" * 40
+    assert map_result_lines(texts, result) == ["a" * 10, "b" * 40 + "\n" + "b" * 40]
+
+
+def test_map_result_lines_merged_paragraphs_leave_none():
+    texts = ["A" * 30, "B" * 30, "C" * 30]
+    result = "x" * 40 + "\n" + "y" * 20
+    assert map_result_lines(texts, result) == ["x" * 40, None, "y" * 20]
+
+
+def test_map_result_lines_first_line_goes_to_first_paragraph():
+    texts = ["", "A" * 5, "B" * 200]
+    result = "z" * 300 + "\n" + "w" * 10 + "\n" + "v" * 10
+    mapped = map_result_lines(texts, result)
+    assert mapped[0] == ""
+    assert mapped[1] == "z" * 300
+
+
+def test_map_result_lines_empty_result():
+    assert map_result_lines(["Tekst."], "\n  \n") is None
+    assert map_result_lines(["", " "], "Wynik.") is None
+
+
+# =============================================================================
+# CZAS DO KONCA (background_job.py)
+# =============================================================================
+
+def test_estimate_eta_from_throughput():
+    assert estimate_eta(25, 100, 10.0) == pytest.approx(30.0)
+    assert estimate_eta(100, 100, 10.0) == 0.0
+    assert estimate_eta(120, 100, 10.0) == 0.0
+
+
+def test_estimate_eta_without_measurement():
+    assert estimate_eta(0, 100, 5.0) is None
+    assert estimate_eta(10, 100, 0) is None
+    assert estimate_eta(10, 0, 5.0) is None
+
+
+def test_format_eta():
+    assert format_eta(None) == ""
+    assert format_eta(4.6) == "ok. 5 s"
+    assert format_eta(130) == "ok. 2 min 10 s"
+    assert format_eta(3990) == "ok. 1 h 6 min"
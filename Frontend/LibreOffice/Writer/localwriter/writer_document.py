@@ -0,0 +1,580 @@
+# -*- coding: utf-8 -*-
+"""
+localwriter/writer_document.py
+==============================
+
+Operacje na akapitach dokumentu Writer wspolne dla makr POLONISTA
+(polonista_menu.py) i localwriter (localwriter.py).
+
+STRUMIENIOWANIE (simplify_document_streaming):
+Zamiast pobierac caly dokument jednym getString() i skladac drugi rownie
+duzy napis z wynikiem, akapity sa czytane po kolei z enumeracji dokumentu
+i laczone w grupy o rozmiarze jednej czesci zapytania. Do backendu trafia
+tylko kilka grup naraz, a kazdy wynik trafia do dokumentu zaraz po
+nadejsciu - w pamieci sa tylko grupy w trakcie przetwarzania.
+
+ZAPIS AKAPIT PO AKAPICIE (write_paragraphs):
+Wiersze wyniku sa przypisywane akapitom zrodlowym przez indeks
+przesuniec (map_result_lines) i zapisywane do kazdego akapitu osobno -
+styl akapitu zostaje, a akapity bez zmian nie sa w ogole zapisywane.
+
+ODCISKI AKAPITOW (tryb przyrostowy):
+Po uproszczeniu dokumentu zapisujemy w jego wlasciwosciach uzytkownika
+(Plik > Wlasciwosci > Wlasciwosci uzytkownika) skroty tresci akapitow,
+ktore sa juz uproszczone. Przy ponownym uruchomieniu do API trafiaja
+tylko akapity nowe lub zmienione od ostatniego razu.
+
+Autor: Stowarzyszenie Zwykle "Neuroatypowi"
+Strona: https://neuroatypowi.org
+Licencja: MIT
+"""
+
+from __future__ import print_function, absolute_import
+
+import bisect
+import hashlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+try:
+    from backends.nvidia_nim_backend import RetryBudget, is_fatal_error, normalize_text
+except ImportError:
+    from .backends.nvidia_nim_backend import RetryBudget, is_fatal_error, normalize_text
+
+
+# =============================================================================
+# STALE
+# =============================================================================
+
+# Nazwa wlasciwosci uzytkownika z odciskami uproszczonych akapitow
+FINGERPRINTS_PROPERTY = "POLONISTA.Odciski"
+
+# Dlugosc odcisku w znakach hex (48 bitow - kolizje pomijalne w skali dokumentu)
+FINGERPRINT_LENGTH = 12
+
+# com.sun.star.beans.PropertyAttribute.REMOVEABLE
+_PROPERTY_REMOVEABLE = 128
+
+# Ile grup na watek backendu moze czekac w kolejce (reszta dokumentu
+# nie jest jeszcze czytana)
+IN_FLIGHT_PER_WORKER = 2
+
+
+# =============================================================================
+# ODCISKI AKAPITOW
+# =============================================================================
+
+def paragraph_fingerprint(text):
+    """Zwraca krotki skrot znormalizowanej tresci akapitu."""
+    digest = hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+    return digest[:FINGERPRINT_LENGTH]
+
+
+def load_fingerprints(doc):
+    """
+    Wczytuje odciski zapisane w dokumencie.
+
+    Returns:
+        Zbior odciskow (pusty, jesli dokument nie byl jeszcze upraszczany)
+    """
+    try:
+        props = doc.getDocumentProperties().getUserDefinedProperties()
+        if not props.getPropertySetInfo().hasPropertyByName(FINGERPRINTS_PROPERTY):
+            return set()
+        value = props.getPropertyValue(FINGERPRINTS_PROPERTY) or ""
+    except Exception:
+        return set()
+
+    return set(fp for fp in value.split(",") if fp)
+
+
+def save_fingerprints(doc, fingerprints):
+    """
+    Zapisuje odciski we wlasciwosciach uzytkownika dokumentu.
+
+    Zmiana trafia do pliku przy nastepnym zapisie dokumentu.
+
+    Returns:
+        True jesli zapis sie udal
+    """
+    value = ",".join(sorted(fingerprints))
+    try:
+        props = doc.getDocumentProperties().getUserDefinedProperties()
+        if props.getPropertySetInfo().hasPropertyByName(FINGERPRINTS_PROPERTY):
+            props.setPropertyValue(FINGERPRINTS_PROPERTY, value)
+        else:
+            props.addProperty(FINGERPRINTS_PROPERTY, _PROPERTY_REMOVEABLE, value)
+        return True
+    except Exception:
+        return False
+
+
+def fingerprints_for_text(text):
+    """Odciski wszystkich niepustych akapitow (linii) tekstu."""
+    return set(
+        paragraph_fingerprint(line)
+        for line in text.split("\n")
+        if line.strip()
+    )
+
+
+# =============================================================================
+# AKAPITY DOKUMENTU
+# =============================================================================
+
+def iter_paragraphs(doc):
+    """
+    Zwraca kolejne akapity glownego tekstu dokumentu.
+
+    Tabele i inne obiekty sa pomijane (nie sa akapitami).
+    """
+    enumeration = doc.getText().createEnumeration()
+    while enumeration.hasMoreElements():
+        element = enumeration.nextElement()
+        try:
+            if element.supportsService("com.sun.star.text.Paragraph"):
+                yield element
+        except Exception:
+            continue
+
+
+def document_char_count(doc):
+    """Liczba znakow dokumentu ze statystyk Writera (bez czytania tekstu) lub None."""
+    try:
+        return int(doc.getPropertyValue("CharacterCount"))
+    except Exception:
+        return None
+
+
+def iter_paragraph_groups(doc, budget, measure=len, known=None, summary=None, fingerprints=None,
+                          is_plain=None):
+    """
+    Zwraca kolejne grupy sasiednich akapitow do jednego zapytania.
+
+    Grupa to (akapity, tekst, liczba_niepustych, rozmiar, teksty): tekst
+    akapitow polaczony "\n" (jak w getString() dokumentu) i teksty
+    poszczegolnych akapitow (dla write_paragraphs), o rozmiarze (suma
+    measure() akapitow) nie wiekszym niz budget - chyba ze sam akapit jest
+    wiekszy (wtedy tworzy wlasna grupe). Grupe koncza tabele i inne obiekty (nie moga trafic
+    do zakresu zastepowanego tekstem) oraz pomijane akapity: z odciskiem
+    w known albo juz w prostym jezyku (is_plain).
+
+    Akapity sa czytane leniwie - generator nie wybiega przed pobrana grupe.
+
+    Args:
+        doc: Dokument Writer
+        budget: Rozmiar czesci (patrz NvidiaNimBackend.request_budget)
+        measure: Funkcja mierzaca tekst w jednostkach budget
+        known: Odciski akapitow juz uproszczonych (pomijane)
+        summary: Slownik z licznikami "skipped", "plain" i "chars" (znaki
+                 pominietych akapitow) - zwiekszane
+        fingerprints: Zbior, do ktorego trafiaja odciski pominietych akapitow
+        is_plain: Funkcja(tekst) -> bool; akapity, dla ktorych zwraca True,
+                  zostaja bez zmian (patrz NvidiaNimBackend.is_plain)
+    """
+    paragraphs = []
+    texts = []
+    size = 0
+    filled = 0
+
+    enumeration = doc.getText().createEnumeration()
+    while enumeration.hasMoreElements():
+        element = enumeration.nextElement()
+        try:
+            is_paragraph = element.supportsService("com.sun.star.text.Paragraph")
+        except Exception:
+            is_paragraph = False
+
+        text = element.getString() if is_paragraph else ""
+        fingerprint = None
+        if known and text.strip():
+            fingerprint = paragraph_fingerprint(text)
+            if fingerprint not in known:
+                fingerprint = None
+
+        plain = (is_paragraph and fingerprint is None and is_plain is not None
+                 and text.strip() and is_plain(text))
+
+        if not is_paragraph or fingerprint is not None or plain:
+            # Granica grupy: obiekt niebedacy akapitem lub akapit pominiety
+            if filled:
+                yield _trimmed_group(paragraphs, texts, filled, size)
+            paragraphs, texts, size, filled = [], [], 0, 0
+            if (fingerprint is not None or plain) and summary is not None:
+                summary["chars"] += len(text)
+            if fingerprint is not None:
+                if summary is not None:
+                    summary["skipped"] += 1
+                if fingerprints is not None:
+                    fingerprints.add(fingerprint)
+            elif plain and summary is not None:
+                # Bez odcisku - przy kolejnym uruchomieniu ocena jest ponawiana
+                summary["plain"] += 1
+            continue
+
+        text_size = measure(text) + 1
+        if filled and size + text_size > budget:
+            yield _trimmed_group(paragraphs, texts, filled, size)
+            paragraphs, texts, size, filled = [], [], 0, 0
+
+        if not filled and not text.strip():
+            # Puste akapity na poczatku grupy zostaja bez zmian
+            continue
+
+        paragraphs.append(element)
+        texts.append(text)
+        size += text_size
+        filled += bool(text.strip())
+
+    if filled:
+        yield _trimmed_group(paragraphs, texts, filled, size)
+
+
+def _trimmed_group(paragraphs, texts, filled, size):
+    # Puste akapity na koncu grupy zostaja w dokumencie bez zmian
+    while not texts[-1].strip():
+        paragraphs.pop()
+        texts.pop()
+    return paragraphs, "\n".join(texts), filled, size, texts
+
+
+def batched_groups(groups, budget, max_groups):
+    """
+    Laczy kolejne grupy w partie o lacznym rozmiarze do budget.
+
+    Grupy rozdzielone akapitami pominietymi sa krotkie - partia idzie
+    jednym zapytaniem przez simplify_packed. Czyta najwyzej jedna grupe
+    naprzod.
+    """
+    batch, used = [], 0
+    for group in groups:
+        size = group[3]
+        if batch and (used + size > budget or len(batch) >= max_groups):
+            yield batch
+            batch, used = [], 0
+        batch.append(group)
+        used += size
+    if batch:
+        yield batch
+
+
+def replace_paragraphs(paragraphs, text):
+    """Zastepuje tresc zakresu od pierwszego do ostatniego akapitu grupy."""
+    if len(paragraphs) == 1:
+        paragraphs[0].setString(text)
+        return
+    first = paragraphs[0]
+    cursor = first.getText().createTextCursorByRange(first.getStart())
+    cursor.gotoRange(paragraphs[-1].getEnd(), True)
+    cursor.setString(text)
+
+
+def paragraph_offsets(texts):
+    """Indeks przesuniec: poczatek kazdego tekstu w "\n".join(texts)."""
+    offsets = []
+    position = 0
+    for text in texts:
+        offsets.append(position)
+        position += len(text) + 1
+    return offsets
+
+
+def map_result_lines(texts, result):
+    """
+    Przypisuje niepuste wiersze wyniku niepustym akapitom grupy.
+
+    Przy tej samej liczbie wierszy i akapitow - po kolei. Gdy model
+    polaczyl lub podzielil akapity, srodek kazdego wiersza jest
+    przeskalowany na dlugosc tekstu zrodlowego i wyszukany (bisect)
+    w indeksie przesuniec akapitow; pierwszy wiersz zawsze trafia do
+    pierwszego niepustego akapitu.
+
+    Returns:
+        Lista nowych tekstow akapitow: tekst (wiele wierszy laczy "\n"),
+        None dla akapitu, ktoremu nie przypadl zaden wiersz (do usuniecia),
+        a dla pustych akapitow ich dotychczasowy tekst. None zamiast listy,
+        gdy wynik nie ma niepustych wierszy.
+    """
+    lines = [line for line in result.split("\n") if line.strip()]
+    sources = [i for i, text in enumerate(texts) if text.strip()]
+    if not lines or not sources:
+        return None
+
+    assigned = {i: [] for i in sources}
+    if len(lines) == len(sources):
+        for i, line in zip(sources, lines):
+            assigned[i].append(line)
+    else:
+        source_offsets = paragraph_offsets([texts[i] for i in sources])
+        source_length = source_offsets[-1] + len(texts[sources[-1]])
+        line_offsets = paragraph_offsets(lines)
+        result_length = line_offsets[-1] + len(lines[-1])
+        for offset, line in zip(line_offsets, lines):
+            middle = (offset + len(line) / 2.0) * source_length / max(1, result_length)
+            k = max(0, bisect.bisect_right(source_offsets, middle) - 1) if offset else 0
+            assigned[sources[k]].append(line)
+
+    return [
+        ("\n".join(assigned[i]) or None) if i in assigned else text
+        for i, text in enumerate(texts)
+    ]
+
+
+def paragraphs_unchanged(paragraphs, texts):
+    """
+    Czy akapity grupy maja nadal tekst wyslany do backendu.
+
+    Dokument jest edytowalny w trakcie zadania w tle - akapit zmieniony
+    (albo usuniety) przez uzytkownika nie moze byc nadpisany wynikiem
+    starszego tekstu.
+    """
+    try:
+        return all(paragraph.getString() == text for paragraph, text in zip(paragraphs, texts))
+    except Exception:
+        return False
+
+
+def write_paragraphs(paragraphs, texts, result):
+    """
+    Zapisuje wynik grupy akapit po akapicie.
+
+    Zamiast jednego setString() na calym zakresie (nowe akapity dostaja
+    styl pierwszego, a Writer przelicza uklad calej grupy) kazdy akapit
+    dostaje swoj wiersz wyniku (map_result_lines) przez wlasny setString()
+    - styl akapitu zostaje. Akapity bez zmian nie sa zapisywane, akapity
+    bez wiersza wyniku sa dolaczane do poprzedniego (usuwane). Zapis idzie
+    od konca grupy, wiec wczesniejsze akapity pozostaja na miejscu.
+
+    Args:
+        paragraphs: Akapity grupy (jak z iter_paragraph_groups)
+        texts: Ich teksty sprzed zapytania
+        result: Wynik backendu dla tekstu grupy
+
+    Returns:
+        Liczba wywolan zapisu UNO
+    """
+    new_texts = map_result_lines(texts, result)
+    if new_texts is None:
+        replace_paragraphs(paragraphs, result)
+        return 1
+
+    writes = 0
+    for i in range(len(paragraphs) - 1, -1, -1):
+        new_text = new_texts[i]
+        if new_text is None:
+            # Pierwszy niepusty akapit zawsze ma wiersz, wiec i > 0
+            previous = paragraphs[i - 1]
+            cursor = previous.getText().createTextCursorByRange(previous.getEnd())
+            cursor.gotoRange(paragraphs[i].getEnd(), True)
+            cursor.setString("")
+            writes += 1
+        elif new_text != texts[i]:
+            paragraphs[i].setString(new_text)
+            writes += 1
+    return writes
+
+
+def _call(function, *args):
+    return function(*args)
+
+
+def simplify_document_streaming(doc, backend, known=None, progress_callback=None,
+                                dispatch=None, summary=None, session=None):
+    """
+    Upraszcza dokument grupami akapitow bez wczytywania go w calosci.
+
+    Grupy (iter_paragraph_groups) sa wysylane do backendu rownolegle, ale
+    czytane z dokumentu dopiero, gdy zwolni sie miejsce w kolejce
+    (IN_FLIGHT_PER_WORKER grup na watek). Wynik kazdej grupy zastepuje jej
+    akapity zaraz po nadejsciu (write_paragraphs - akapit po akapicie,
+    z zachowaniem stylow, tylko akapity zmienione); grupy z bledem zostaja
+    w wersji oryginalnej. Grupy, ktorych akapity uzytkownik zmienil od
+    wyslania (paragraphs_unchanged), nie sa zapisywane.
+    Wszystkie grupy dziela jeden budzet ponowien, a blad klucza/dostepu
+    konczy czytanie dokumentu.
+
+    Zapis do dokumentu odbywa sie w watku wywolujacym (watki backendu
+    nie dotykaja UNO) albo - z dispatch - w watku, do ktorego dispatch
+    przekazuje wywolania: funkcja moze wtedy dzialac w watku roboczym
+    (background_job.BackgroundJob.call), a czytanie akapitow, zapis
+    i odciski ida do watku glownego LibreOffice.
+
+    Z session (edit_session.EditSession) wyniki kazdej partii sa
+    zapisywane przy zablokowanym widoku (jedno przeliczenie ukladu na
+    partie) i sa jednym krokiem cofania na zadanie; w zadaniu w tle
+    (undo_per_burst) partie dolaczaja do tego kroku, dopoki uzytkownik
+    nie edytuje ani nie cofa miedzy nimi.
+
+    Akapity juz w prostym jezyku (backend.is_plain) nie sa wysylane.
+    Krotkie grupy miedzy pominietymi akapitami sa laczone w partie
+    (batched_groups) i wysylane po kilka w zapytaniu, gdy backend ma
+    wlaczone pack_short_units.
+
+    Po zakonczeniu zapisywane sa odciski akapitow uproszczonych i
+    pominietych; grupy z bledem nie dostaja odcisku, wiec kolejne
+    uruchomienie sprobuje ponownie.
+
+    Args:
+        doc: Dokument Writer
+        backend: Instancja NvidiaNimBackend
+        known: Odciski akapitow do pominiecia (None - upraszczaj wszystko)
+        progress_callback: callback(done, submitted, group_result) po kazdej
+                           partii grup; submitted to liczba partii wyslanych
+                           do tej pory (dlugosc dokumentu nie jest znana z gory)
+        dispatch: dispatch(funkcja, *args) - wywoluje operacje na dokumencie
+                  i zwraca wynik (domyslnie wprost)
+        summary: Slownik na liczniki, np. do sledzenia postepu z innego
+                 watku (domyslnie nowy)
+        session: Sesja edycji (edit_session.EditSession) otwierana na czas
+                 zadania i zamykana takze po bledzie (domyslnie bez sesji)
+
+    Returns:
+        Tuple (success: bool, summary: dict) - summary zawiera liczniki
+        "changed", "skipped", "plain", "stale" (akapity zmienione w trakcie,
+        bez zapisu), "failed", "requests" (partie),
+        "writes" (zapisy UNO), "chars" (znaki akapitow juz obsluzonych,
+        do porownania z document_char_count) i liste "errors"
+    """
+    counters = {"changed": 0, "skipped": 0, "plain": 0, "stale": 0, "failed": 0, "requests": 0,
+                "writes": 0, "chars": 0, "errors": []}
+    if summary is None:
+        summary = counters
+    else:
+        summary.update(counters)
+    dispatch = dispatch or _call
+    new_fingerprints = set()
+
+    budget, measure = backend.request_budget()
+    groups = iter_paragraph_groups(
+        doc, budget, measure, known, summary, new_fingerprints, backend.is_plain
+    )
+    max_groups = 1
+    if backend.config.get('pack_short_units'):
+        max_groups = max(1, int(backend.config.get('pack_max_units', 1)))
+    batches = batched_groups(groups, budget, max_groups)
+    workers = max(1, int(backend.config.get('max_concurrency', 1)))
+    retry_budget = RetryBudget(backend.config.get('retry_budget', 0))
+
+    def simplify(batch):
+        if len(batch) > 1:
+            return backend.simplify_packed([group[1] for group in batch], None, None, retry_budget)
+        _, text, _, size, _ = batch[0]
+        if size > budget:
+            return [backend.simplify_long_text(text, None, None, retry_budget)]
+        return [backend.simplify_text(text, None, None, retry_budget)]
+
+    def apply(batch, outcomes):
+        # Zapis wynikow partii; True po bledzie klucza/dostepu
+        if session is not None and any(success for success, _ in outcomes):
+            with session.burst():
+                return write_batch(batch, outcomes)
+        return write_batch(batch, outcomes)
+
+    def write_batch(batch, outcomes):
+        fatal = False
+        for (paragraphs, texts, filled), (success, result) in zip(batch, outcomes):
+            summary["chars"] += sum(len(text) for text in texts)
+            if success and not paragraphs_unchanged(paragraphs, texts):
+                # Bez odcisku - kolejne uruchomienie uprosci nowa tresc
+                summary["stale"] += filled
+            elif success:
+                writes = write_paragraphs(paragraphs, texts, result)
+                summary["writes"] += writes
+                if session is not None:
+                    session.wrote(writes)
+                new_fingerprints.update(fingerprints_for_text(result))
+                summary["changed"] += filled
+            else:
+                summary["failed"] += filled
+                summary["errors"].append(result)
+                fatal = fatal or is_fatal_error(result)
+        return fatal
+
+    in_flight = {}
+    done = 0
+    exhausted = False
+
+    if session is not None:
+        dispatch(session.open)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                while not exhausted and len(in_flight) < workers * IN_FLIGHT_PER_WORKER:
+                    batch = dispatch(next, batches, None)
+                    if batch is None:
+                        exhausted = True
+                        break
+                    in_flight[executor.submit(simplify, batch)] = [
+                        (paragraphs, texts, filled) for paragraphs, _, filled, _, texts in batch
+                    ]
+                    summary["requests"] += 1
+
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    batch = in_flight.pop(future)
+                    try:
+                        outcomes = future.result()
+                    except Exception as e:
+                        outcomes = [(False, f"[BLAD] {type(e).__name__}: {str(e)}")] * len(batch)
+
+                    if dispatch(apply, batch, outcomes):
+                        exhausted = True
+                        for pending in in_flight:
+                            pending.cancel()
+
+                    done += 1
+                    if progress_callback:
+                        try:
+                            progress_callback(done, summary["requests"], outcomes[-1][1])
+                        except:
+                            pass
+
+                # Anulowane zadania nie wroca z wait() jako zakonczone z wynikiem
+                for future in [f for f in in_flight if f.cancelled()]:
+                    batch = in_flight.pop(future)
+                    summary["failed"] += sum(filled for _, _, filled in batch)
+
+        dispatch(batches.close)
+        dispatch(groups.close)
+        dispatch(save_fingerprints, doc, new_fingerprints)
+    finally:
+        if session is not None:
+            dispatch(session.close)
+    return not summary["errors"], summary
+
+
+def simplify_document_incremental(doc, backend, progress_callback=None):
+    """
+    Upraszcza tylko akapity nowe lub zmienione od ostatniego uruchomienia.
+
+    Akapity, ktorych odcisk jest zapisany w dokumencie, zostaja bez zmian;
+    pozostale przechodza przez simplify_document_streaming.
+
+    Args:
+        doc: Dokument Writer
+        backend: Instancja NvidiaNimBackend
+        progress_callback: callback(done, submitted, group_result)
+
+    Returns:
+        Tuple (success: bool, summary: dict) - jak simplify_document_streaming
+    """
+    return simplify_document_streaming(
+        doc, backend, load_fingerprints(doc), progress_callback
+    )
+
+
+def format_summary(summary):
+    """Krotki opis wyniku trybu przyrostowego dla okna dialogowego."""
+    text = (
+        f"Uproszczone akapity: {summary['changed']}\n"
+        f"Pominiete (bez zmian od ostatniego razu): {summary['skipped']}"
+    )
+    if summary.get("plain"):
+        text += f"\nPominiete (juz w prostym jezyku): {summary['plain']}"
+    if summary.get("stale"):
+        text += f"\nPominiete (zmienione w trakcie): {summary['stale']}"
+    if summary["failed"]:
+        text += f"\nBledy: {summary['failed']}\n\n" + "\n".join(summary["errors"][:5])
+    return text